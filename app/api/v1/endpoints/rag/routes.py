@@ -1,34 +1,55 @@
-from fastapi import APIRouter, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi.responses import StreamingResponse
 from app.schemas.rag.schemas import (
     SearchRequest, SymptomSearchRequest, IngredientSearchRequest,
     TimingRecommendationRequest, APIResponse, IntelligentSearchRequest,
-    GeminiRecommendationRequest
+    GeminiRecommendationRequest, ProductBulkRequest,
+    HybridSearchResponse, IntelligentSearchResponse
 )
-from app.services.rag.recommendation_service import RecommendationService
-from app.services.rag.timing_service import TimingService
-from app.search.rag_search import RAGSearchEngine
-from app.search.query_analyzer import QueryAnalyzer
-from app.search.smart_router import SmartRouter
-from app.search.fallback_system import FallbackSystem
-from app.search.reranker import ResultReRanker
+from app.search.query_analyzer import QueryAnalysis
+from app.services.rag.materialized_answers import MaterializedAnswerStore
+from app.services.rag.precomputed_store import request_params
+from app.core.config import settings
+from app.core.container import container, component
+from app.utils.deadline import current_deadline, deadline_scope, within_deadline
 from app.utils.logger import get_logger
+from app.utils.metrics import get_request_timings, record_stage, stage
+from app.utils.responses import ORJSONResponse
+from app.utils.single_flight import get_single_flight_stats
+from app.utils.bulkhead import get_bulkhead_stats
 from typing import Dict, Any
+import asyncio
+import orjson
+import time
 
 logger = get_logger(__name__)
 
 # 라우터 생성
 router = APIRouter()
 
-# 서비스 초기화
-search_engine = RAGSearchEngine()
-recommendation_service = RecommendationService()
-timing_service = TimingService()
+# 검색 엔진/모델 등 RAG 컴포넌트는 app.core.container에서 지연 생성 후 Depends로 주입
+# (import 시점에 torch/임베딩 모델을 로드하지 않음)
 
-# 새로운 지능형 검색 컴포넌트 초기화
-query_analyzer = QueryAnalyzer()
-smart_router = SmartRouter()
-fallback_system = FallbackSystem()
-reranker = ResultReRanker()
+# 카테고리별 사전 계산 응답 (warm-up 완료 후/인덱스 변경 시 백그라운드 갱신)
+_DEFAULT_INTELLIGENT_REQUEST = IntelligentSearchRequest(query="-")
+
+container.register(
+    "materialized_answers",
+    lambda c: MaterializedAnswerStore(
+        build_fn=_materialize_keyword,
+        version_fn=c.get("search_engine").get_index_version
+    )
+)
+
+
+async def start_materialization():
+    """사전 계산 응답 백그라운드 갱신 시작 (컴포넌트 warm-up 완료 후 실행)"""
+    if settings.MATERIALIZED_ANSWERS_ENABLED:
+        materialized_answers = await asyncio.to_thread(container.get, "materialized_answers")
+        container.spawn(materialized_answers.run_refresh_loop())
+
+
+container.on_ready(start_materialization)
 
 @router.get('/health', response_model=Dict[str, Any])
 async def health_check():
@@ -38,13 +59,23 @@ async def health_check():
         'message': 'API 서버가 정상 작동 중입니다.'
     }
 
-@router.post('/search/hybrid', response_model=Dict[str, Any])
-async def hybrid_search(request: SearchRequest):
-    """하이브리드 검색"""
+@router.post(
+    '/search/hybrid',
+    response_model=HybridSearchResponse,
+    response_model_exclude_none=True,
+    response_class=ORJSONResponse
+)
+async def hybrid_search(
+    request: SearchRequest,
+    search_engine=Depends(component("search_engine"))
+):
+    """하이브리드 검색 (목록 응답용 필드만 조회)"""
     try:
-        results = search_engine.hybrid_search(
+        results = await asyncio.to_thread(
+            search_engine.hybrid_search,
             query=request.query,
-            top_k=request.top_k
+            top_k=request.top_k,
+            fields=search_engine.COMPACT_FIELDS
         )
 
         return {
@@ -65,10 +96,14 @@ async def hybrid_search(request: SearchRequest):
         )
 
 @router.post('/search/symptom', response_model=Dict[str, Any])
-async def search_by_symptom(request: SymptomSearchRequest):
+async def search_by_symptom(
+    request: SymptomSearchRequest,
+    search_engine=Depends(component("search_engine"))
+):
     """증상 기반 검색"""
     try:
-        results = search_engine.search_by_symptom(
+        results = await asyncio.to_thread(
+            search_engine.search_by_symptom,
             symptom=request.symptom,
             top_k=request.top_k
         )
@@ -91,10 +126,14 @@ async def search_by_symptom(request: SymptomSearchRequest):
         )
 
 @router.post('/search/ingredient', response_model=Dict[str, Any])
-async def search_by_ingredient(request: IngredientSearchRequest):
+async def search_by_ingredient(
+    request: IngredientSearchRequest,
+    search_engine=Depends(component("search_engine"))
+):
     """성분 기반 검색"""
     try:
-        results = search_engine.search_by_ingredient(
+        results = await asyncio.to_thread(
+            search_engine.search_by_ingredient,
             ingredient=request.ingredient,
             top_k=request.top_k
         )
@@ -117,10 +156,14 @@ async def search_by_ingredient(request: IngredientSearchRequest):
         )
 
 @router.post('/recommend/symptom', response_model=Dict[str, Any])
-async def recommend_by_symptom(request: SymptomSearchRequest):
+async def recommend_by_symptom(
+    request: SymptomSearchRequest,
+    recommendation_service=Depends(component("recommendation_service"))
+):
     """증상 기반 추천"""
     try:
-        result = recommendation_service.recommend_by_symptom(
+        result = await asyncio.to_thread(
+            recommendation_service.recommend_by_symptom,
             symptom=request.symptom,
             top_k=request.top_k
         )
@@ -139,7 +182,10 @@ async def recommend_by_symptom(request: SymptomSearchRequest):
         )
 
 @router.post('/recommend/timing', response_model=Dict[str, Any])
-async def recommend_timing(request: TimingRecommendationRequest):
+async def recommend_timing(
+    request: TimingRecommendationRequest,
+    timing_service=Depends(component("timing_service"))
+):
     """복용 시간 추천 (복수형 통일)"""
     try:
         ingredients = request.ingredients
@@ -190,11 +236,12 @@ async def recommend_timing(request: TimingRecommendationRequest):
 
 @router.get('/product/{product_id}', response_model=Dict[str, Any])
 async def get_product_detail(
-    product_id: str = Path(..., description="제품 ID")
+    product_id: str = Path(..., description="제품 ID"),
+    search_engine=Depends(component("search_engine"))
 ):
     """제품 상세 조회"""
     try:
-        result = search_engine.get_product_by_id(product_id)
+        result = await asyncio.to_thread(search_engine.get_product_by_id, product_id)
 
         if result:
             return {
@@ -218,113 +265,340 @@ async def get_product_detail(
             detail='제품 조회 중 오류가 발생했습니다.'
         )
 
-@router.post('/search/intelligent', response_model=Dict[str, Any])
-async def intelligent_search(request: IntelligentSearchRequest):
-    """
-    지능형 검색 (Intelligent Search)
+
+async def _run_intelligent_search(request: IntelligentSearchRequest, analysis: QueryAnalysis) -> Dict:
+    """지능형 검색 파이프라인 실행 (SERP → 라우팅 → Fallback → Re-ranking → 보강)"""
     
-    쿼리 분석, 의도 파악, 스마트 라우팅, Fallback, Re-ranking, SERP 검색을 통합한
-    고급 검색 엔드포인트입니다.
-    """
-    try:
-        logger.info(f"지능형 검색 요청: '{request.query}'")
-        
-        # 1. 쿼리 분석
-        analysis = query_analyzer.analyze(request.query)
-        
-        logger.info(f"쿼리 분석 완료: 의도={analysis['intent']}")
-        
-        # 2. SERP 검색 (비동기, 원본 쿼리 사용)
-        serp_results = []
-        serp_enabled = False
-        
-        if request.enable_serp:
-            logger.info("SERP 검색 시작 (원본 쿼리)")
-            try:
-                # 비동기로 SERP 검색 실행
-                from app.services.rag.serp_service import serp_service
+    # 2. SERP 검색 (비동기, 원본 쿼리 사용)
+    serp_results = []
+    
+    if request.enable_serp:
+        logger.info("SERP 검색 시작 (원본 쿼리)")
+        try:
+            # 비동기로 SERP 검색 실행
+            from app.services.rag.serp_service import serp_service
+            with stage("serp"):
                 serp_results = await serp_service.search(
                     query=request.query,  # 원본 쿼리 사용 (개체명 추출 전)
                     max_results=request.serp_max_results,
                     enabled=request.enable_serp
                 )
-                serp_enabled = len(serp_results) > 0
-                logger.info(f"SERP 검색 완료: {len(serp_results)}개 결과")
-            except Exception as e:
-                logger.error(f"SERP 검색 오류 (계속 진행): {e}")
-        
-        # 3. 스마트 라우팅 및 RAG 검색 실행
+            logger.info(f"SERP 검색 완료: {len(serp_results)}개 결과")
+        except Exception as e:
+            logger.error(f"SERP 검색 오류 (계속 진행): {e}")
+            deadline = current_deadline()
+            if deadline is not None:
+                deadline.degrade("serp")
+    
+    # 동기 검색 단계는 워커 스레드에서 실행 (동일 검색은 single-flight로 병합)
+    return await asyncio.to_thread(_execute_search_pipeline, request, analysis, serp_results)
+
+
+def _execute_search_pipeline(
+    request: IntelligentSearchRequest,
+    analysis: QueryAnalysis,
+    serp_results: list
+) -> Dict:
+    """지능형 검색 동기 단계 (라우팅 → Fallback → Re-ranking → 보강 → 응답 구성)"""
+    
+    serp_enabled = len(serp_results) > 0
+    
+    # 3. 스마트 라우팅 및 RAG 검색 실행
+    # (2단계 Re-ranking 사용 시 후보를 N×k개로 넉넉히 가져옴)
+    candidate_k = None
+    if request.enable_cross_encoder:
+        candidate_k = request.top_k * settings.CROSS_ENCODER_CANDIDATE_MULTIPLIER
+    
+    search_engine = container.get("search_engine")
+    smart_router = container.get("smart_router")
+    fallback_system = container.get("fallback_system")
+    reranker = container.get("reranker")
+    
+    with stage("route"):
         api_name, routing_info, results = smart_router.route(
             analysis=analysis,
-            top_k=request.top_k
+            top_k=request.top_k,
+            diversify=request.enable_diversity,
+            candidate_k=candidate_k,
+            fields=search_engine.COMPACT_FIELDS
         )
-        
-        logger.info(f"라우팅 완료: API={api_name}")
-        
-        # 4. Fallback 처리
-        fallback_used = False
-        fallback_info = None
-        
-        if request.enable_fallback:
-            if fallback_system.should_use_fallback(results):
-                logger.info("Fallback 응답 생성")
+    
+    logger.info(f"라우팅 완료: API={api_name}")
+    
+    # 4. Fallback 처리
+    fallback_used = False
+    fallback_info = None
+    
+    if request.enable_fallback:
+        if fallback_system.should_use_fallback(results):
+            logger.info("Fallback 응답 생성")
+            with stage("fallback"):
                 fallback_info = fallback_system.generate_fallback_response(
                     request.query,
                     analysis
                 )
-                fallback_used = True
+            fallback_used = True
+    
+    # 5. Re-ranking (리스트 결과인 경우만)
+    if request.enable_reranking and isinstance(results, list) and len(results) > 0:
+        logger.info("Re-ranking 적용")
         
-        # 5. Re-ranking (리스트 결과인 경우만)
-        if request.enable_reranking and isinstance(results, list) and len(results) > 0:
-            logger.info("Re-ranking 적용")
-            
+        with stage("rerank"):
             if request.enable_diversity:
-                results = reranker.rerank_with_diversity(results)
+                results = reranker.rerank_with_diversity(
+                    results,
+                    max_per_group=settings.DIVERSITY_MAX_PER_GROUP,
+                    top_k=None if candidate_k else request.top_k
+                )
             else:
                 results = reranker.rerank(results, request.query)
-        
-        # 6. 추가 정보 보강
-        additional_info = None
-        if not fallback_used:
+    
+    # 5-1. Cross-Encoder 2단계 Re-ranking (예산 초과 시 1단계 순서 유지)
+    rerank_info = None
+    if candidate_k and isinstance(results, list) and len(results) > 0:
+        # 모델 로드(첫 사용 시 생성)보다 남은 예산 확인을 먼저 함
+        if within_deadline("cross_encoder", settings.CROSS_ENCODER_LATENCY_BUDGET_MS):
+            cross_encoder = container.get("cross_encoder_reranker")
+            with stage("cross_encoder"):
+                results, rerank_info = cross_encoder.rerank(
+                    request.query,
+                    results,
+                    top_k=request.top_k
+                )
+        else:
+            # 생략 시에도 채점용 텍스트는 응답에서 제거
+            for result in results:
+                result.pop('embedding_text', None)
+    
+    # 다양성/2단계 검색은 후보를 넉넉히 가져오므로 최종 개수로 자름
+    if (request.enable_diversity or candidate_k) and isinstance(results, list):
+        results = results[:request.top_k]
+    
+    # 6. 추가 정보 보강
+    additional_info = None
+    if not fallback_used:
+        with stage("enhance"):
             enhanced = fallback_system.enhance_results(
                 results,
                 request.query,
                 analysis
             )
-            additional_info = enhanced.get("additional_info")
-        
-        # 7. 응답 구성
-        response = {
+        additional_info = enhanced.get("additional_info")
+    
+    # 7. 응답 구성
+    response = {
+        'success': True,
+        'message': f'검색 완료 (API: {api_name})',
+        'query_analysis': _query_analysis_view(analysis),
+        'routing_info': {
+            'selected_api': api_name,
+            **routing_info
+        },
+        'results': results,
+        'fallback_used': fallback_used,
+        'serp_enabled': serp_enabled
+    }
+    
+    if fallback_info:
+        response['fallback_info'] = fallback_info
+    
+    if additional_info:
+        response['additional_info'] = additional_info
+    
+    if serp_results:
+        response['serp_results'] = serp_results
+    
+    if rerank_info:
+        response['rerank_info'] = rerank_info
+    
+    return response
+
+
+def _query_analysis_view(analysis: QueryAnalysis) -> Dict:
+    """응답용 쿼리 분석 정보"""
+    return analysis.to_dict()
+
+
+def _materialize_keyword(keyword: str) -> Dict:
+    """증상 키워드 하나의 기본 옵션 지능형 검색 응답 계산 (SERP 제외)"""
+    
+    request = IntelligentSearchRequest(query=keyword, enable_serp=False)
+    analysis = container.get("query_analyzer").analyze(keyword)
+    
+    return _execute_search_pipeline(request, analysis, [])
+
+
+def _is_materialized_request(request: IntelligentSearchRequest) -> bool:
+    """사전 계산 응답과 같은 옵션의 요청인지 여부"""
+    return (
+        settings.MATERIALIZED_ANSWERS_ENABLED
+        and request.use_cache
+        and not request.enable_serp
+        and request.top_k == _DEFAULT_INTELLIGENT_REQUEST.top_k
+    )
+
+
+def _semantic_cache_partition(request: IntelligentSearchRequest, analysis: QueryAnalysis) -> tuple:
+    """시맨틱 캐시 파티션 (라우팅을 정하는 쿼리 의도 + 응답에 영향을 주는 요청 옵션)"""
+    return (
+        analysis.intent,
+        request.top_k,
+        request.enable_fallback,
+        request.enable_reranking,
+        request.enable_diversity,
+        request.enable_cross_encoder,
+        request.enable_serp,
+        request.serp_max_results
+    )
+
+
+@router.post('/products', response_model=Dict[str, Any])
+async def get_products_bulk(
+    request: ProductBulkRequest,
+    search_engine=Depends(component("search_engine"))
+):
+    """
+    제품 일괄 조회
+
+    여러 제품 ID를 한 번의 _mget 요청으로 조회합니다.
+    자주 조회되는 제품은 인기 제품 캐시에서 바로 반환됩니다.
+    """
+    if len(request.product_ids) > settings.PRODUCT_BULK_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f'한 번에 최대 {settings.PRODUCT_BULK_MAX_IDS}개까지 조회할 수 있습니다.'
+        )
+
+    try:
+        products = await asyncio.to_thread(search_engine.get_products_by_ids, request.product_ids)
+
+        ordered_ids = list(dict.fromkeys(request.product_ids))
+        missing = [product_id for product_id in ordered_ids if product_id not in products]
+
+        return {
             'success': True,
-            'message': f'검색 완료 (API: {api_name})',
-            'query_analysis': {
-                'original_query': analysis['original_query'],
-                'entities': analysis['entities'],
-                'intent': analysis['intent'],
-                'expanded_query': analysis['expanded_query'],
-                'knowledge_match': analysis.get('knowledge_match')
-            },
-            'routing_info': {
-                'selected_api': api_name,
-                **routing_info
-            },
-            'results': results,
-            'fallback_used': fallback_used,
-            'serp_enabled': serp_enabled
+            'message': f'{len(products)}개 제품 정보를 조회했습니다.',
+            'data': {
+                'products': [products[product_id] for product_id in ordered_ids if product_id in products],
+                'missing_ids': missing,
+                'count': len(products)
+            }
         }
+
+    except Exception as e:
+        logger.error(f"제품 일괄 조회 오류: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail='제품 조회 중 오류가 발생했습니다.'
+        )
+
+
+@router.post(
+    '/search/intelligent',
+    response_model=IntelligentSearchResponse,
+    response_model_exclude_none=True,
+    response_class=ORJSONResponse
+)
+async def intelligent_search(
+    request: IntelligentSearchRequest,
+    query_analyzer=Depends(component("query_analyzer")),
+    search_engine=Depends(component("search_engine")),
+    semantic_cache=Depends(component("semantic_cache"))
+):
+    """
+    지능형 검색 (Intelligent Search)
+    
+    쿼리 분석, 의도 파악, 스마트 라우팅, Fallback, Re-ranking, SERP 검색을 통합한
+    고급 검색 엔드포인트입니다.
+    표현만 다른 유사 쿼리는 시맨틱 캐시에서 이전 응답을 재사용합니다.
+    요청 전체에 시간 예산(deadline_ms, 기본값 DEADLINE_DEFAULT_MS)을 두고, 남은 시간이 부족하면
+    SERP/다양성 검색/Cross-Encoder/추가 정보 보강을 생략하거나 ES에 timeout을 넘깁니다.
+    (생략된 단계는 응답의 deadline.degraded 로 알리고, 이런 응답은 시맨틱 캐시에 저장하지 않음)
+    """
+    try:
+        with deadline_scope(request.deadline_ms) as deadline:
+            logger.info(f"지능형 검색 요청: '{request.query}'")
+        
+            # 1. 쿼리 임베딩 (시맨틱 캐시 조회와 모호한 쿼리의 의도 분류에 함께 사용, 이후 검색에서도 재사용됨)
+            use_semantic_cache = settings.SEMANTIC_CACHE_ENABLED and request.use_cache
+            query_vector = None
+            if use_semantic_cache:
+                query_vector = await asyncio.to_thread(
+                    search_engine.embedding_generator.generate_single,
+                    request.query
+                )
         
-        if fallback_info:
-            response['fallback_info'] = fallback_info
-        
-        if additional_info:
-            response['additional_info'] = additional_info
-        
-        if serp_results:
-            response['serp_results'] = serp_results
+            # 쿼리 분석 (의도 분류가 임베딩 모델을 호출할 수 있으므로 워커 스레드에서 실행)
+            with stage("analyze"):
+                analysis = await asyncio.to_thread(query_analyzer.analyze, request.query, query_vector)
+        
+            logger.info(f"쿼리 분석 완료: 의도={analysis.intent}")
+        
+            # 2. 알려진 증상 카테고리면 사전 계산 응답 사용
+            materialized_answers = container.peek("materialized_answers")
+            if materialized_answers and _is_materialized_request(request):
+                materialized = materialized_answers.lookup(analysis)
+                if materialized:
+                    logger.info(f"사전 계산 응답 사용: '{request.query}'")
+                    return {
+                        **materialized,
+                        'query_analysis': _query_analysis_view(analysis),
+                        'materialized': {
+                            'index_version': materialized_answers.version,
+                            'built_at': materialized_answers.built_at
+                        }
+                    }
+        
+            # 3. 시맨틱 캐시 조회
+            cached = None
+            partition = _semantic_cache_partition(request, analysis)
+        
+            if use_semantic_cache:
+                with stage("semantic_cache"):
+                    cached = semantic_cache.lookup(query_vector, partition)
+            
+                if cached and not semantic_cache.should_audit():
+                    # 결과는 유사 쿼리의 응답을 쓰되, 쿼리 분석은 이번 요청 기준
+                    cached_response = cached['response']
+                    routing_info = cached_response['routing_info']
+                    if 'original_query' in routing_info:
+                        routing_info = {**routing_info, 'original_query': request.query}
+                    return {
+                        **cached_response,
+                        'query_analysis': _query_analysis_view(analysis),
+                        'routing_info': routing_info,
+                        'semantic_cache': {
+                            'hit': True,
+                            'cached_query': cached['query'],
+                            'similarity': round(cached['similarity'], 4)
+                        }
+                    }
+        
+            # 4. 검색 파이프라인
+            response = await _run_intelligent_search(request, analysis)
+        
+            if cached:
+                # 적중 감사: 표본 요청은 실제 검색 결과와 비교 후 최신 결과 반환
+                semantic_cache.record_audit(
+                    request.query,
+                    cached['query'],
+                    cached['response'],
+                    response
+                )
+            elif (
+                use_semantic_cache
+                and not response['fallback_used']
+                and response['results']
+                and not deadline.degraded
+            ):
+                semantic_cache.store(request.query, query_vector, partition, response)
+            
+            if deadline.degraded:
+                response['deadline'] = deadline.summary()
         
-        logger.info(f"지능형 검색 완료: fallback={fallback_used}, serp={serp_enabled}")
+            logger.info(f"지능형 검색 완료: fallback={response['fallback_used']}, serp={response['serp_enabled']}")
         
-        return response
+            return response
         
     except Exception as e:
         logger.error(f"지능형 검색 오류: {e}", exc_info=True)
@@ -333,6 +607,98 @@ async def intelligent_search(request: IntelligentSearchRequest):
             detail=f'검색 중 오류가 발생했습니다: {str(e)}'
         )
 
+
+@router.get('/cache/materialized', response_model=Dict[str, Any])
+async def materialized_answer_stats():
+    """카테고리별 사전 계산 응답 통계"""
+    materialized_answers = container.peek("materialized_answers")
+    return {
+        'success': True,
+        'message': '사전 계산 응답 통계',
+        'data': materialized_answers.get_stats() if materialized_answers else {'enabled': False}
+    }
+
+
+@router.get('/cache/analysis', response_model=Dict[str, Any])
+async def query_analysis_cache_stats(query_analyzer=Depends(component("query_analyzer"))):
+    """쿼리 분석 메모 캐시 통계"""
+    return {
+        'success': True,
+        'message': '쿼리 분석 캐시 통계',
+        'data': query_analyzer.get_stats()
+    }
+
+
+@router.get('/cache/products', response_model=Dict[str, Any])
+async def product_cache_stats(search_engine=Depends(component("search_engine"))):
+    """인기 제품 캐시 통계"""
+    return {
+        'success': True,
+        'message': '제품 캐시 통계',
+        'data': search_engine.get_product_cache_stats()
+    }
+
+
+@router.get('/elasticsearch/pool', response_model=Dict[str, Any])
+async def elasticsearch_pool_stats():
+    """Elasticsearch 공용 커넥션 풀 사용률"""
+    from app.core.elasticsearch_config import get_pool_stats
+    return {
+        'success': True,
+        'message': 'Elasticsearch 커넥션 풀 통계',
+        'data': get_pool_stats()
+    }
+
+
+@router.get('/cache/semantic', response_model=Dict[str, Any])
+async def semantic_cache_stats(semantic_cache=Depends(component("semantic_cache"))):
+    """시맨틱 쿼리 캐시 통계 (적중률, 임계값, 오적중 감사 결과)"""
+    return {
+        'success': True,
+        'message': '시맨틱 캐시 통계',
+        'data': semantic_cache.get_stats()
+    }
+
+@router.get('/singleflight', response_model=Dict[str, Any])
+async def single_flight_stats():
+    """동일 요청 병합 통계 (SERP/Gemini/검색별 실제 호출 수와 병합된 요청 수)"""
+    return {
+        'success': True,
+        'message': '동일 요청 병합 통계',
+        'data': get_single_flight_stats()
+    }
+
+@router.get('/bulkheads', response_model=Dict[str, Any])
+async def bulkhead_stats():
+    """외부 API 격벽 상태 (동시 호출 한도, 대기열, 서킷 상태, 거절 수)"""
+    return {
+        'success': True,
+        'message': '외부 API 격벽 상태',
+        'data': get_bulkhead_stats()
+    }
+
+@router.get('/cache/gemini', response_model=Dict[str, Any])
+async def gemini_cache_stats():
+    """Gemini 응답 캐시 통계 (메모리/sqlite 적중 현황)"""
+    from app.services.rag.gemini_service import gemini_service
+    
+    return {
+        'success': True,
+        'message': 'Gemini 응답 캐시 통계',
+        'data': gemini_service.response_cache.get_stats() if gemini_service.response_cache else {'enabled': False}
+    }
+
+@router.get('/cache/precomputed', response_model=Dict[str, Any])
+async def precomputed_recommendation_stats(
+    precomputed_recommendations=Depends(component("precomputed_recommendations"))
+):
+    """사전 계산 Gemini 추천 통계 (버전, 질의 수, 적중률)"""
+    return {
+        'success': True,
+        'message': '사전 계산 추천 통계',
+        'data': precomputed_recommendations.get_stats()
+    }
+
 @router.post('/search/serp', response_model=Dict[str, Any])
 async def serp_search(request: SearchRequest):
     """
@@ -375,21 +741,56 @@ async def serp_search(request: SearchRequest):
         )
 
 @router.post('/recommend/gemini', response_model=Dict[str, Any])
-async def gemini_recommendation(request: GeminiRecommendationRequest):
+async def gemini_recommendation(
+    request: GeminiRecommendationRequest,
+    search_engine=Depends(component("search_engine")),
+    precomputed_recommendations=Depends(component("precomputed_recommendations"))
+):
     """
     Gemini 기반 통합 추천
     
     RAG + SERP 결과를 Gemini LLM으로 융합하여 최종 추천 생성
+    (배치로 미리 생성한 추천이 있으면 검색/LLM 호출 없이 반환)
     """
     try:
         logger.info(f"Gemini 추천 요청: '{request.query}'")
         
+        from app.services.rag.gemini_service import gemini_service
+        
+        # 0. 사전 계산 추천
+        if settings.PRECOMPUTED_ENABLED:
+            precomputed = precomputed_recommendations.lookup(
+                request.query,
+                request_params(request, gemini_service.model_name)
+            )
+            if precomputed is not None:
+                entry, cache_status = precomputed
+                logger.info(f"사전 계산 추천 반환: '{request.query}' (version={cache_status['version']})")
+                
+                return {
+                    'success': True,
+                    'message': 'Gemini 추천 완료 (사전 계산)',
+                    'query': request.query,
+                    'recommendation': entry['recommendation'],
+                    'sources': entry['sources'],
+                    'metadata': {
+                        'max_length': request.max_length,
+                        'actual_length': len(entry['recommendation'].get('text', '')),
+                        'model': gemini_service.model_name,
+                        'temperature': gemini_service.temperature,
+                        'cache': cache_status
+                    }
+                }
+        
         # 1. RAG 검색
         logger.info("RAG 검색 시작")
-        rag_results = search_engine.hybrid_search(
-            query=request.query,
-            top_k=request.top_k
-        )
+        with stage("rag"):
+            rag_results = await asyncio.to_thread(
+                search_engine.hybrid_search,
+                query=request.query,
+                top_k=request.top_k,
+                fields=search_engine.COMPACT_FIELDS
+            )
         logger.info(f"RAG 검색 완료: {len(rag_results)}개 결과")
         
         # 2. SERP 검색
@@ -397,38 +798,42 @@ async def gemini_recommendation(request: GeminiRecommendationRequest):
         if request.enable_serp:
             logger.info("SERP 검색 시작")
             from app.services.rag.serp_service import serp_service
-            serp_results = await serp_service.search(
-                query=request.query,
-                max_results=request.serp_max_results,
-                enabled=True
-            )
+            with stage("serp"):
+                serp_results = await serp_service.search(
+                    query=request.query,
+                    max_results=request.serp_max_results,
+                    enabled=True
+                )
             logger.info(f"SERP 검색 완료: {len(serp_results)}개 결과")
         
         # 3. Gemini로 융합
         logger.info("Gemini 추천 생성 시작")
-        from app.services.rag.gemini_service import gemini_service
         
-        recommendation = await gemini_service.generate_recommendation(
-            query=request.query,
-            rag_results=rag_results,
-            serp_results=serp_results,
-            rag_weight=request.rag_weight,
-            max_length=request.max_length,
-            custom_prompt=request.custom_prompt,
-            output_options={
-                'include_product_name': request.include_product_name,
-                'include_ingredients': request.include_ingredients,
-                'include_timing': request.include_timing,
-                'include_precautions': request.include_precautions
-            }
-        )
+        with stage("llm"):
+            recommendation = await gemini_service.generate_recommendation(
+                query=request.query,
+                rag_results=rag_results,
+                serp_results=serp_results,
+                rag_weight=request.rag_weight,
+                max_length=request.max_length,
+                custom_prompt=request.custom_prompt,
+                output_options={
+                    'include_product_name': request.include_product_name,
+                    'include_ingredients': request.include_ingredients,
+                    'include_timing': request.include_timing,
+                    'include_precautions': request.include_precautions
+                },
+                use_cache=request.use_cache
+            )
+        cache_status = recommendation.pop('cache', None)
+        prompt_stats = recommendation.pop('prompt', None)
         
         logger.info("Gemini 추천 생성 완료")
         
         # 4. 응답 구성
         return {
             'success': True,
-            'message': 'Gemini 추천 완료',
+            'message': _gemini_message(recommendation),
             'query': request.query,
             'recommendation': recommendation,
             'sources': {
@@ -441,7 +846,9 @@ async def gemini_recommendation(request: GeminiRecommendationRequest):
                 'max_length': request.max_length,
                 'actual_length': len(recommendation.get('text', '')),
                 'model': gemini_service.model_name,
-                'temperature': gemini_service.temperature
+                'temperature': gemini_service.temperature,
+                'cache': cache_status,
+                'prompt': prompt_stats
             }
         }
         
@@ -457,3 +864,126 @@ async def gemini_recommendation(request: GeminiRecommendationRequest):
             status_code=500,
             detail=f'추천 생성 중 오류가 발생했습니다: {str(e)}'
         )
+
+
+def _gemini_message(recommendation: Dict[str, Any]) -> str:
+    """격벽/서킷 거절로 RAG 결과만 사용한 경우 구분"""
+    if recommendation.get('fallback'):
+        return 'RAG 기반 추천 완료 (Gemini 일시 사용 불가)'
+    return 'Gemini 추천 완료'
+
+def _sse(event: str, data: Dict[str, Any]) -> bytes:
+    """Server-Sent Events 메시지 한 건"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+@router.post('/recommend/gemini/stream')
+async def gemini_recommendation_stream(
+    request: GeminiRecommendationRequest,
+    search_engine=Depends(component("search_engine"))
+):
+    """
+    Gemini 기반 통합 추천 (SSE 스트리밍)
+    
+    RAG 제품 카드를 먼저 보내고, LLM 생성 텍스트를 토큰 단위로 이어서 보냅니다.
+    이벤트 순서: products → token/section (반복) → done (오류 시 error)
+    
+    Server-Timing 헤더는 products 이벤트 전(응답 시작 시점)에 보내므로 rag 단계만 담기며,
+    serp/llm을 포함한 전체 단계 시간은 done 이벤트의 metadata.timings로 보냅니다.
+    """
+    from app.services.rag.gemini_service import gemini_service
+    
+    if not gemini_service.provider:
+        raise HTTPException(status_code=400, detail="Gemini API 키가 설정되지 않았습니다.")
+    
+    try:
+        logger.info(f"Gemini 스트리밍 추천 요청: '{request.query}'")
+        
+        with stage("rag"):
+            rag_results = await asyncio.to_thread(
+                search_engine.hybrid_search,
+                query=request.query,
+                top_k=request.top_k,
+                fields=search_engine.COMPACT_FIELDS
+            )
+    except Exception as e:
+        logger.error(f"Gemini 스트리밍 추천 오류: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f'추천 생성 중 오류가 발생했습니다: {str(e)}'
+        )
+    
+    async def event_stream():
+        # 1. 제품 카드 (LLM 생성 전에 먼저 표시)
+        yield _sse("products", {'query': request.query, 'products': rag_results})
+        
+        try:
+            # 2. SERP 검색
+            serp_results = []
+            if request.enable_serp:
+                from app.services.rag.serp_service import serp_service
+                with stage("serp"):
+                    serp_results = await serp_service.search(
+                        query=request.query,
+                        max_results=request.serp_max_results,
+                        enabled=True
+                    )
+            
+            # 3. Gemini 스트리밍 생성
+            llm_started = time.perf_counter()
+            async for event, data in gemini_service.stream_recommendation(
+                query=request.query,
+                rag_results=rag_results,
+                serp_results=serp_results,
+                rag_weight=request.rag_weight,
+                max_length=request.max_length,
+                custom_prompt=request.custom_prompt,
+                output_options={
+                    'include_product_name': request.include_product_name,
+                    'include_ingredients': request.include_ingredients,
+                    'include_timing': request.include_timing,
+                    'include_precautions': request.include_precautions
+                },
+                use_cache=request.use_cache
+            ):
+                if event == "done":
+                    if settings.METRICS_ENABLED:
+                        record_stage("llm", (time.perf_counter() - llm_started) * 1000)
+                    recommendation = data['recommendation']
+                    data = {
+                        'success': True,
+                        'message': _gemini_message(recommendation),
+                        'query': request.query,
+                        'recommendation': recommendation,
+                        'sources': {
+                            'rag_count': len(rag_results),
+                            'serp_count': len(serp_results),
+                            'rag_weight': request.rag_weight,
+                            'gemini_weight': 1 - request.rag_weight
+                        },
+                        'metadata': {
+                            'max_length': request.max_length,
+                            'actual_length': len(recommendation.get('text', '')),
+                            'model': gemini_service.model_name,
+                            'temperature': gemini_service.temperature,
+                            'cache': data['cache'],
+                            'prompt': data.get('prompt'),
+                            'timings': get_request_timings()
+                        }
+                    }
+                yield _sse(event, data)
+            
+            logger.info("Gemini 스트리밍 추천 완료")
+            
+        except Exception as e:
+            logger.error(f"Gemini 스트리밍 추천 오류: {e}", exc_info=True)
+            yield _sse("error", {'success': False, 'message': f'추천 생성 중 오류가 발생했습니다: {str(e)}'})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # 프록시(nginx) 버퍼링 없이 바로 전달
+            "X-Accel-Buffering": "no"
+        }
+    )
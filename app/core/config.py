@@ -22,6 +22,36 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Startup (컴포넌트 백그라운드 warm-up, False면 첫 요청 시 생성)
+    COMPONENT_WARMUP: bool = True
+    COMPONENT_WARMUP_RETRY_SECONDS: float = 10.0
+
+    # Metrics (단계별 지연 시간 히스토그램 /metrics, Server-Timing 응답 헤더)
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = True
+    SINGLE_FLIGHT_ENABLED: bool = True  # 동일 SERP/Gemini/검색 동시 호출 병합
+    SINGLE_FLIGHT_TIMEOUT_SECONDS: float = 60.0
+    SINGLE_FLIGHT_DEADLINE_BUCKET_MS: float = 250.0  # 요청 시간 예산이 있는 호출은 남은 예산 구간별로만 병합
+
+    # Admission Control (엔드포인트 종류별 레인, 경로는 API_V1_STR 기준 - 해당 경로와 그 하위 경로)
+    # 제품 조회(/rag/product/{id}, /rag/products)는 캐시 미스 시 ES 조회이므로 default 레인
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_CHEAP_PATHS: List[str] = [
+        '/rag/recommend/timing', '/rag/cache', '/rag/health',
+        '/rag/bulkheads', '/rag/singleflight', '/rag/elasticsearch/pool'
+    ]
+    ADMISSION_EXPENSIVE_PATHS: List[str] = ['/rag/search/intelligent', '/rag/recommend/gemini', '/rag/search/serp']
+    ADMISSION_CHEAP_CONCURRENCY: int = 256
+    ADMISSION_CHEAP_QUEUE_SIZE: int = 256
+    ADMISSION_CHEAP_MAX_WAIT_MS: float = 200.0
+    ADMISSION_DEFAULT_CONCURRENCY: int = 64
+    ADMISSION_DEFAULT_QUEUE_SIZE: int = 128
+    ADMISSION_DEFAULT_MAX_WAIT_MS: float = 1000.0
+    ADMISSION_EXPENSIVE_CONCURRENCY: int = 32
+    ADMISSION_EXPENSIVE_QUEUE_SIZE: int = 64
+    ADMISSION_EXPENSIVE_MAX_WAIT_MS: float = 2000.0
+    ADMISSION_MAX_RETRY_AFTER_SECONDS: int = 30
+
     # RAG Settings
     FOOD_SAFETY_API_KEY: str = ""
     FOOD_SAFETY_BASE_URL: str = 'http://openapi.foodsafetykorea.go.kr/api'
@@ -31,16 +61,89 @@ class Settings(BaseSettings):
     ES_HOST: str = 'localhost'
     ES_PORT: int = 9200
     ES_INDEX_NAME: str = 'health_supplements'
+
+    # ElasticSearch Client (프로세스 공용 커넥션 풀)
+    ES_CONNECTIONS_PER_NODE: int = 16
+    ES_HTTP_COMPRESS: bool = True
+    ES_MAX_RETRIES: int = 3
+    ES_SNIFF_ON_START: bool = False
+    ES_SNIFF_ON_NODE_FAILURE: bool = False
+    ES_MIN_DELAY_BETWEEN_SNIFFING: float = 60.0
+    ES_SEARCH_TIMEOUT: float = 5.0
+    ES_BULK_TIMEOUT: float = 120.0
+    ES_ADMIN_TIMEOUT: float = 30.0
+
+    # Search Backend ('elasticsearch' 또는 외부 서비스 없는 'memory')
+    SEARCH_BACKEND: str = 'elasticsearch'
+    MEMORY_INDEX_DIR: str = 'data/memory_index'
+
+    # Product Lookup (제품 일괄 조회 / 인기 제품 캐시)
+    PRODUCT_CACHE_SIZE: int = 5000
+    PRODUCT_CACHE_VERSION_CHECK_SECONDS: float = 30.0
+    PRODUCT_BULK_MAX_IDS: int = 100
     
     # Embeddings
     EMBEDDING_MODEL: str = 'jhgan/ko-sroberta-multitask'
     EMBEDDING_DIM: int = 768
+    EMBEDDING_CACHE_SIZE: int = 2048
+    EMBEDDING_QUANTIZE: bool = False  # CPU 추론용 동적 int8 양자화 (Linear 레이어)
     
     # Search
     DEFAULT_TOP_K: int = 5
     VECTOR_WEIGHT: float = 0.8
     KEYWORD_WEIGHT: float = 0.2
-    
+    SEARCH_VECTOR_MODE: str = 'script_score'  # 'script_score'(전수 코사인) 또는 'knn'(HNSW)
+    KNN_NUM_CANDIDATES_FACTOR: int = 10  # knn num_candidates = k * factor
+
+    # Query Analysis (정규화 쿼리 + 지식 베이스 버전 기준 분석 결과 메모)
+    QUERY_ANALYSIS_CACHE_SIZE: int = 10000
+
+    # Intent Classification (키워드 규칙으로 정해지지 않는 쿼리만 임베딩 유사도로 분류)
+    INTENT_EMBEDDING_ENABLED: bool = True
+    INTENT_EMBEDDING_MIN_SIMILARITY: float = 0.5  # 최고 의도 중심 벡터 유사도 하한
+    INTENT_EMBEDDING_MIN_MARGIN: float = 0.03  # 1위와 2위 의도 유사도 차이 하한
+
+    # Diversity (ES field collapsing)
+    DIVERSITY_FIELD: str = 'company_name.keyword'
+    DIVERSITY_MAX_PER_GROUP: int = 2
+    DIVERSITY_CANDIDATE_MULTIPLIER: int = 3
+
+    # Cross-Encoder (2단계 Re-ranking)
+    CROSS_ENCODER_MODEL: str = 'bongsoo/albert-small-kor-cross-encoder-v1'
+    CROSS_ENCODER_MAX_LENGTH: int = 256
+    CROSS_ENCODER_CANDIDATE_MULTIPLIER: int = 4
+    CROSS_ENCODER_LATENCY_BUDGET_MS: float = 300.0
+    CROSS_ENCODER_CACHE_SIZE: int = 10000
+    CROSS_ENCODER_PROBE_SECONDS: float = 30.0  # 추정치로 생략 중일 때 시험 채점 주기
+    CROSS_ENCODER_WARMUP: bool = False  # 시작 시 모델 미리 로드 (요청 중 첫 로드 지연 방지)
+
+    # Semantic Query Cache (지능형 검색 근접 중복 쿼리)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92
+    SEMANTIC_CACHE_CAPACITY: int = 2048
+    SEMANTIC_CACHE_TTL_SECONDS: float = 1800.0
+    SEMANTIC_CACHE_AUDIT_RATE: float = 0.02
+    SEMANTIC_CACHE_AUDIT_MIN_OVERLAP: float = 0.5
+
+    # Materialized Answers (DEFAULT_RECOMMENDATIONS 카테고리 사전 계산)
+    MATERIALIZED_ANSWERS_ENABLED: bool = True
+    MATERIALIZED_REFRESH_INTERVAL_SECONDS: float = 300.0
+
+    # Precomputed Recommendations (배치 생성 Gemini 추천, scripts/precompute_recommendations.py)
+    PRECOMPUTED_ENABLED: bool = True
+    PRECOMPUTED_DIR: str = 'data/precomputed'
+    PRECOMPUTED_RELOAD_INTERVAL_SECONDS: float = 60.0  # CURRENT 버전 확인 주기
+    PRECOMPUTED_MAX_AGE_SECONDS: float = 604800.0  # 생성 후 이 시간이 지나면 반환하지 않음 (7일)
+
+    # Request Deadline (지능형 검색 전체 시간 예산, 부족하면 선택 단계 생략)
+    DEADLINE_DEFAULT_MS: float = 2000.0
+    DEADLINE_SERP_MIN_MS: float = 300.0  # SERP 호출에 필요한 최소 잔여 시간
+    DEADLINE_SEARCH_RESERVE_MS: float = 300.0  # SERP 이후 RAG 검색/응답 구성용으로 남겨둘 시간
+    DEADLINE_DIVERSITY_MIN_MS: float = 150.0  # 다양성 검색/재정렬에 필요한 최소 잔여 시간
+    DEADLINE_ENHANCE_MIN_MS: float = 20.0  # 추가 정보 보강에 필요한 최소 잔여 시간
+    DEADLINE_ES_MIN_TIMEOUT_MS: float = 100.0  # ES에 넘기는 timeout 하한
+    DEADLINE_ES_NETWORK_MARGIN_MS: float = 50.0  # ES 검색 timeout 대비 클라이언트 대기 여유
+
     # Data Collection
     API_BATCH_SIZE: int = 1000
     API_REQUEST_DELAY: float = 0.5
@@ -50,6 +153,26 @@ class Settings(BaseSettings):
     SERP_API_ENABLED: bool = False
     SERP_MAX_RESULTS: int = 5
     SERP_TIMEOUT: int = 5
+    SERP_API_BASE_URL: str = 'https://serpapi.com'
+    SERP_MAX_CONNECTIONS: int = 20
+    SERP_CACHE_SIZE: int = 1000
+    SERP_CACHE_TTL_SECONDS: float = 3600.0
+    SERP_CONCURRENCY_INITIAL: int = 10
+    SERP_CONCURRENCY_MIN: int = 2
+    SERP_CONCURRENCY_MAX: int = 20
+    SERP_QUEUE_SIZE: int = 100
+    SERP_QUEUE_TIMEOUT_SECONDS: float = 0.5
+    SERP_LATENCY_TARGET_SECONDS: float = 2.0
+
+    # LLM Provider (gemini | mock: 부하 테스트/벤치마크용 로컬 모의 응답)
+    LLM_PROVIDER: str = 'gemini'
+    LLM_MOCK_LATENCY_DISTRIBUTION: str = 'lognormal'  # fixed | uniform | lognormal
+    LLM_MOCK_LATENCY_MS: float = 800.0  # 첫 토큰 지연 (lognormal은 중앙값)
+    LLM_MOCK_LATENCY_JITTER: float = 0.5  # uniform ±비율 / lognormal sigma
+    LLM_MOCK_TOKENS_PER_SECOND: float = 60.0
+    LLM_MOCK_ERROR_RATE: float = 0.0
+    LLM_MOCK_OVERLOAD_RATE: float = 0.0  # 429 응답 비율
+    LLM_MOCK_SEED: int = 42
 
     # Google Gemini LLM
     GEMINI_API_KEY: str = ""
@@ -57,6 +180,30 @@ class Settings(BaseSettings):
     GEMINI_TEMPERATURE: float = 0.7
     GEMINI_MAX_OUTPUT_TOKENS: int = 500
 
+    # Gemini Prompt (토큰 예산 안에서 RAG/SERP 컨텍스트 선택)
+    PROMPT_TOKEN_BUDGET: int = 1200
+    PROMPT_FIELD_MAX_TOKENS: int = 60  # 결과 한 건의 원재료/기능/내용 필드별 최대 토큰
+    PROMPT_MIN_ITEM_TOKENS: int = 30  # 줄여서라도 포함할 결과 한 건의 최소 토큰
+    PROMPT_DEDUP_THRESHOLD: float = 0.6  # 이미 포함된 내용과 겹치는 비율이 이 이상이면 SERP 결과 제외
+
+    # Gemini Response Cache (정규화 프롬프트 해시 키)
+    GEMINI_CACHE_ENABLED: bool = True
+    GEMINI_CACHE_SIZE: int = 1000
+    GEMINI_CACHE_TTL_SECONDS: float = 21600.0
+    GEMINI_CACHE_SQLITE_PATH: str = ''  # 예: data/gemini_cache.sqlite3 (빈 값이면 메모리만)
+
+    # Gemini Bulkhead (동시 호출 한도 AIMD 조절, 대기열, 전용 스레드 풀 크기 = 최대 한도)
+    GEMINI_CONCURRENCY_INITIAL: int = 8
+    GEMINI_CONCURRENCY_MIN: int = 1
+    GEMINI_CONCURRENCY_MAX: int = 32
+    GEMINI_QUEUE_SIZE: int = 64
+    GEMINI_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    GEMINI_LATENCY_TARGET_SECONDS: float = 8.0
+
+    # Circuit Breaker (외부 API 공통)
+    BULKHEAD_FAILURE_THRESHOLD: int = 5
+    BULKHEAD_OPEN_SECONDS: float = 30.0
+
     # Weights
     RAG_WEIGHT: float = 0.5
     GEMINI_WEIGHT: float = 0.5
@@ -69,6 +216,12 @@ class Settings(BaseSettings):
     LOG_FILE: str = "logs/app.log"
     LOG_TO_ELASTICSEARCH: bool = True  # Elasticsearch로 로그 전송 여부
     LOG_ES_INDEX: str = "yakkobak-logs"  # Elasticsearch 로그 인덱스명
+    LOG_QUEUE_SIZE: int = 10000  # 로그 큐 크기 (가득 차면 버림)
+    LOG_BATCH_SIZE: int = 500  # 리스너 배치/ES bulk 크기
+    LOG_FLUSH_INTERVAL_SECONDS: float = 1.0  # ES 전송 최대 지연
+    LOG_ES_BUFFER_SIZE: int = 5000  # ES 전송 대기 버퍼 크기 (가득 차면 오래된 로그부터 버림)
+    LOG_ES_RETRY_SECONDS: float = 30.0  # ES 전송 실패 후 재시도 대기
+    LOG_ES_REQUEST_TIMEOUT_SECONDS: float = 5.0  # 로그 bulk 요청 타임아웃
 
     class Config:
         case_sensitive = True
@@ -0,0 +1,274 @@
+"""
+컴포넌트 컨테이너 (Component Container)
+
+검색 엔진/임베딩 모델처럼 생성 비용이 큰 컴포넌트를 모듈 import 시점이 아니라
+처음 필요할 때 생성합니다. (heavy 모듈 import도 factory 안에서 수행)
+
+- 라우트: Depends(component("search_engine")) 형태로 주입
+- lifespan: 포트 바인딩을 막지 않도록 백그라운드에서 미리 생성(warm-up)하고,
+  완료되면 readiness probe가 준비 상태로 바뀜
+- 컴포넌트별 초기화 시간/오류를 기록하여 probe 응답에 포함
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import threading
+import time
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+config = settings
+logger = get_logger(__name__)
+
+
+class ComponentContainer:
+    """지연 생성 컴포넌트 컨테이너"""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[["ComponentContainer"], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._init_ms: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+        self.warmup_components: List[str] = []
+        self._ready_hooks: List[Callable[[], Awaitable]] = []
+        self._shutdown_hooks: List[Callable[[], Awaitable]] = []
+        self._tasks: List[asyncio.Task] = []
+
+        self.warmup_done = False
+        self.started_at: Optional[float] = None
+
+    def register(self, name: str, factory: Callable[["ComponentContainer"], Any], warmup: bool = False):
+        """
+        컴포넌트 등록
+
+        Args:
+            name: 컴포넌트 이름
+            factory: 컨테이너를 받아 인스턴스를 만드는 함수 (의존 컴포넌트는 container.get으로 조회)
+            warmup: 시작 시 백그라운드에서 미리 생성할지 여부 (등록 순서대로 생성)
+        """
+        self._factories[name] = factory
+        if warmup and name not in self.warmup_components:
+            self.warmup_components.append(name)
+
+    def get(self, name: str) -> Any:
+        """컴포넌트 조회 (최초 조회 시 생성, 스레드 안전)"""
+
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        factory = self._factories.get(name)
+        if factory is None:
+            raise KeyError(f"등록되지 않은 컴포넌트입니다: {name}")
+
+        # 컴포넌트별 잠금: 모델 로드 중에도 다른 컴포넌트 조회는 막지 않음
+        with self._locks_guard:
+            lock = self._locks.setdefault(name, threading.Lock())
+
+        with lock:
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+
+            started = time.perf_counter()
+            try:
+                instance = factory(self)
+            except Exception as e:
+                self._errors[name] = str(e)
+                logger.error(f"컴포넌트 초기화 실패: {name} ({e})")
+                raise
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._init_ms[name] = round(elapsed_ms, 1)
+            self._errors.pop(name, None)
+            self._instances[name] = instance
+
+            logger.info(f"컴포넌트 초기화 완료: {name} ({elapsed_ms:.0f}ms)")
+
+            return instance
+
+    def peek(self, name: str) -> Optional[Any]:
+        """이미 생성된 컴포넌트만 반환 (생성하지 않음)"""
+        return self._instances.get(name)
+
+    def on_ready(self, hook: Callable[[], Awaitable]):
+        """warm-up 완료 후 실행할 비동기 함수 등록"""
+        self._ready_hooks.append(hook)
+
+    def on_shutdown(self, hook: Callable[[], Awaitable]):
+        """종료 시 실행할 비동기 함수 등록"""
+        self._shutdown_hooks.append(hook)
+
+    def spawn(self, coro: Awaitable) -> asyncio.Task:
+        """종료 시 함께 취소될 백그라운드 작업 실행"""
+        task = asyncio.create_task(coro)
+        self._tasks.append(task)
+        return task
+
+    async def startup(self):
+        """lifespan 시작: warm-up을 백그라운드로 시작하고 즉시 반환"""
+
+        self.started_at = time.monotonic()
+
+        if config.COMPONENT_WARMUP:
+            self.spawn(self._warm_up())
+        else:
+            # 지연 모드: 각 컴포넌트는 첫 요청에서 생성
+            self.warmup_done = True
+            await self._run_ready_hooks()
+
+    async def shutdown(self):
+        """lifespan 종료: 백그라운드 작업 취소 후 종료 hook 실행"""
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+        for hook in self._shutdown_hooks:
+            try:
+                await hook()
+            except Exception as e:
+                logger.error(f"종료 처리 오류: {e}")
+
+    async def _warm_up(self):
+        """warm-up 대상 컴포넌트를 워커 스레드에서 순서대로 생성 (실패 시 재시도)"""
+
+        total_started = time.perf_counter()
+
+        for name in self.warmup_components:
+            while True:
+                try:
+                    await asyncio.to_thread(self.get, name)
+                    break
+                except Exception:
+                    logger.warning(
+                        f"컴포넌트 warm-up 재시도 예정: {name} "
+                        f"({config.COMPONENT_WARMUP_RETRY_SECONDS}초 후)"
+                    )
+                    await asyncio.sleep(config.COMPONENT_WARMUP_RETRY_SECONDS)
+
+        self.warmup_done = True
+
+        logger.info(
+            f"컴포넌트 warm-up 완료: {len(self.warmup_components)}개 "
+            f"({(time.perf_counter() - total_started) * 1000:.0f}ms)"
+        )
+
+        await self._run_ready_hooks()
+
+    async def _run_ready_hooks(self):
+        for hook in self._ready_hooks:
+            try:
+                await hook()
+            except Exception as e:
+                logger.error(f"준비 완료 처리 오류: {e}", exc_info=True)
+
+    def is_ready(self) -> bool:
+        """readiness: warm-up 대상이 모두 생성되었는지 여부 (지연 모드는 시작 즉시 준비)"""
+        if not config.COMPONENT_WARMUP:
+            return self.warmup_done
+        return self.warmup_done and all(name in self._instances for name in self.warmup_components)
+
+    def status(self) -> Dict:
+        """probe용 상태 (컴포넌트별 초기화 시간/오류 포함)"""
+
+        return {
+            "ready": self.is_ready(),
+            "warmup_done": self.warmup_done,
+            "uptime_seconds": round(time.monotonic() - self.started_at, 1) if self.started_at else 0.0,
+            "components": {
+                name: {
+                    "initialized": name in self._instances,
+                    "warmup": name in self.warmup_components,
+                    "init_ms": self._init_ms.get(name),
+                    "error": self._errors.get(name)
+                }
+                for name in self._factories
+            }
+        }
+
+
+def _search_engine(container: ComponentContainer):
+    from app.search.rag_search import RAGSearchEngine
+    return RAGSearchEngine()
+
+
+def _recommendation_service(container: ComponentContainer):
+    from app.services.rag.recommendation_service import RecommendationService
+    return RecommendationService(container.get("search_engine"))
+
+
+def _timing_service(container: ComponentContainer):
+    from app.services.rag.timing_service import TimingService
+    return TimingService()
+
+
+def _query_analyzer(container: ComponentContainer):
+    # 의도 분류 임베딩은 검색 엔진의 임베딩 모델/쿼리 캐시를 공유
+    from app.search.query_analyzer import QueryAnalyzer
+    return QueryAnalyzer(container.get("search_engine").embedding_generator)
+
+
+def _smart_router(container: ComponentContainer):
+    # 검색 엔진/임베딩 모델은 다른 컴포넌트와 공유
+    from app.search.smart_router import SmartRouter
+    return SmartRouter(
+        container.get("search_engine"),
+        container.get("recommendation_service"),
+        container.get("timing_service")
+    )
+
+
+def _fallback_system(container: ComponentContainer):
+    from app.search.fallback_system import FallbackSystem
+    return FallbackSystem()
+
+
+def _reranker(container: ComponentContainer):
+    from app.search.reranker import ResultReRanker
+    return ResultReRanker()
+
+
+def _cross_encoder_reranker(container: ComponentContainer):
+    from app.search.cross_encoder_reranker import CrossEncoderReRanker
+    return CrossEncoderReRanker()
+
+
+def _semantic_cache(container: ComponentContainer):
+    from app.search.semantic_cache import SemanticQueryCache
+    return SemanticQueryCache()
+
+
+def _precomputed_recommendations(container: ComponentContainer):
+    from app.services.rag.precomputed_store import PrecomputedRecommendationStore
+    return PrecomputedRecommendationStore()
+
+
+container = ComponentContainer()
+
+# warm-up 순서 = 등록 순서 (의존 대상 먼저)
+container.register("search_engine", _search_engine, warmup=True)
+container.register("timing_service", _timing_service, warmup=True)
+container.register("recommendation_service", _recommendation_service, warmup=True)
+container.register("query_analyzer", _query_analyzer, warmup=True)
+container.register("smart_router", _smart_router, warmup=True)
+container.register("fallback_system", _fallback_system, warmup=True)
+container.register("reranker", _reranker, warmup=True)
+container.register("semantic_cache", _semantic_cache, warmup=True)
+container.register("precomputed_recommendations", _precomputed_recommendations, warmup=True)
+# Cross-Encoder는 요청 옵션으로만 사용하므로 기본은 첫 사용 시 생성 (CROSS_ENCODER_WARMUP으로 미리 로드)
+container.register("cross_encoder_reranker", _cross_encoder_reranker, warmup=config.CROSS_ENCODER_WARMUP)
+
+
+def component(name: str) -> Callable[[], Any]:
+    """FastAPI 의존성: Depends(component("search_engine"))"""
+
+    def _dependency():
+        return container.get(name)
+
+    _dependency.__name__ = f"get_{name}"
+    return _dependency
@@ -1,3 +1,5 @@
+from typing import Dict, Optional
+import threading
 from elasticsearch import Elasticsearch
 from app.core.config import settings
 import logging
@@ -5,26 +7,124 @@ import logging
 config = settings
 logger = logging.getLogger(__name__)
 
-def get_elasticsearch_client():
-    """ElasticSearch 클라이언트 생성"""
+# 프로세스 공용 클라이언트 (커넥션 풀을 모든 호출자가 공유)
+_client: Optional[Elasticsearch] = None
+_client_lock = threading.Lock()
+
+# 작업 유형별 요청 타임아웃(초)이 적용된 클라이언트 뷰 (transport/풀은 공용 클라이언트와 공유)
+_operation_clients: Dict[str, Elasticsearch] = {}
+
+
+def _operation_timeouts() -> Dict[str, float]:
+    return {
+        "search": config.ES_SEARCH_TIMEOUT,
+        "bulk": config.ES_BULK_TIMEOUT,
+        "admin": config.ES_ADMIN_TIMEOUT
+    }
+
+
+def _create_client() -> Elasticsearch:
+    """ElasticSearch 클라이언트 생성 (풀 크기/압축/스니핑/재시도 설정 적용)"""
 
     # URL 구성
     es_url = f"http://{config.ES_HOST}:{config.ES_PORT}"
 
-    print(f"[DEBUG] ElasticSearch URL: {es_url}")
+    logger.info(
+        f"ElasticSearch 클라이언트 생성: {es_url} "
+        f"(connections_per_node={config.ES_CONNECTIONS_PER_NODE}, http_compress={config.ES_HTTP_COMPRESS})"
+    )
 
     # Elasticsearch 8.x 서버와 호환되도록 설정
-    client = Elasticsearch(
+    # 노드별 urllib3 풀의 연결은 keep-alive로 재사용되므로 요청마다 TCP 연결을 새로 맺지 않음
+    return Elasticsearch(
         [es_url],
-        request_timeout=30,
-        max_retries=3,
+        connections_per_node=config.ES_CONNECTIONS_PER_NODE,
+        http_compress=config.ES_HTTP_COMPRESS,
+        request_timeout=config.ES_ADMIN_TIMEOUT,
+        max_retries=config.ES_MAX_RETRIES,
         retry_on_timeout=True,
+        sniff_on_start=config.ES_SNIFF_ON_START,
+        sniff_on_node_failure=config.ES_SNIFF_ON_NODE_FAILURE,
+        min_delay_between_sniffing=config.ES_MIN_DELAY_BETWEEN_SNIFFING,
         # 버전 8과 호환되도록 헤더 설정
         headers={"Accept": "application/vnd.elasticsearch+json; compatible-with=8"}
     )
 
+
+def get_elasticsearch_client(operation: Optional[str] = None) -> Elasticsearch:
+    """
+    ElasticSearch 클라이언트 반환 (프로세스 내 1회 생성 후 재사용)
+
+    Args:
+        operation: 'search' / 'bulk' / 'admin' 지정 시 해당 작업의 요청 타임아웃이 적용된
+                   클라이언트 반환 (같은 커넥션 풀 사용). None이면 공용 클라이언트.
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _create_client()
+
+    if operation is None:
+        return _client
+
+    client = _operation_clients.get(operation)
+    if client is None:
+        timeouts = _operation_timeouts()
+        if operation not in timeouts:
+            raise ValueError(f"지원하지 않는 작업 유형입니다: {operation}")
+        client = _client.options(request_timeout=timeouts[operation])
+        _operation_clients[operation] = client
+
     return client
 
+
+def close_elasticsearch_client():
+    """공용 클라이언트 종료 (커넥션 풀 정리)"""
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+            _operation_clients.clear()
+
+
+def get_pool_stats() -> Dict:
+    """노드별 커넥션 풀 사용률 (사용 중/유휴 연결 수, 누적 요청 수)"""
+
+    if _client is None:
+        return {"initialized": False, "nodes": []}
+
+    nodes = []
+    for node in _client.transport.node_pool.all():
+        pool = getattr(node, "pool", None)
+        if pool is None:
+            continue
+
+        maxsize = pool.pool.maxsize
+        available = pool.pool.qsize()
+        idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        in_use = max(maxsize - available, 0)
+
+        nodes.append({
+            "node": node.base_url,
+            "maxsize": maxsize,
+            "in_use": in_use,
+            "idle": idle,
+            "utilization": round(in_use / maxsize, 4) if maxsize else 0.0,
+            "connections_created": pool.num_connections,
+            "requests": pool.num_requests
+        })
+
+    return {
+        "initialized": True,
+        "timeouts": _operation_timeouts(),
+        "http_compress": config.ES_HTTP_COMPRESS,
+        "nodes": nodes
+    }
+
 def check_nori_plugin(es_client):
     """Nori 플러그인 설치 여부 확인"""
     try:
@@ -49,8 +149,7 @@ def get_index_settings(use_nori=None, kibana_optimized=True):
 
     # Nori 사용 여부가 지정되지 않은 경우, 자동으로 확인
     if use_nori is None:
-        es_client = get_elasticsearch_client()
-        use_nori = check_nori_plugin(es_client)
+        use_nori = check_nori_plugin(get_elasticsearch_client("admin"))
 
     # Analysis 설정 구성
     analysis_settings = {
@@ -2,27 +2,13 @@
 개선된 Elasticsearch 인덱스 설정
 C003 API 데이터 구조를 완전히 반영
 """
-from elasticsearch import Elasticsearch
 from app.core.config import settings
+from app.core.elasticsearch_config import get_elasticsearch_client
 import logging
 
 config = settings
 logger = logging.getLogger(__name__)
 
-def get_elasticsearch_client():
-    """ElasticSearch 클라이언트 생성"""
-    es_url = f"http://{config.ES_HOST}:{config.ES_PORT}"
-    
-    client = Elasticsearch(
-        [es_url],
-        request_timeout=30,
-        max_retries=3,
-        retry_on_timeout=True,
-        headers={"Accept": "application/vnd.elasticsearch+json; compatible-with=8"}
-    )
-    
-    return client
-
 def check_nori_plugin(es_client):
     """Nori 플러그인 설치 여부 확인"""
     try:
@@ -46,8 +32,7 @@ def get_improved_index_settings(use_nori=None):
     
     # Nori 사용 여부 확인
     if use_nori is None:
-        es_client = get_elasticsearch_client()
-        use_nori = check_nori_plugin(es_client)
+        use_nori = check_nori_plugin(get_elasticsearch_client("admin"))
     
     # Analysis 설정
     analysis_settings = {
@@ -1,9 +1,32 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.core.config import settings
+from app.core.container import container
 from app.api.v1.api import api_router
+from app.utils.admission import AdmissionControlMiddleware
+from app.utils.metrics import ServerTimingMiddleware, render_prometheus
 
-app = FastAPI(title=settings.PROJECT_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 무거운 컴포넌트는 백그라운드에서 생성하고 바로 요청 수신 시작
+    await container.startup()
+    yield
+    await container.shutdown()
+
+    from app.services.rag.serp_service import serp_service
+    await serp_service.aclose()
+
+    from app.core.elasticsearch_config import close_elasticsearch_client
+    close_elasticsearch_client()
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
+
+# 엔드포인트 종류별 레인 수용 제어 (과부하 시 503 + Retry-After, 거절 응답에도 CORS/Server-Timing 적용)
+app.add_middleware(AdmissionControlMiddleware)
 
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
@@ -15,8 +38,44 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# 요청별 단계 시간 기록 (Server-Timing 헤더, 요청 지연 히스토그램)
+app.add_middleware(ServerTimingMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/")
 def root():
     return {"message": "Welcome to Yakkobak API"}
+
+
+@app.get("/health/live")
+def liveness():
+    """liveness probe: 프로세스가 요청을 받을 수 있는지 여부"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+def readiness():
+    """readiness probe: 컴포넌트 warm-up 완료 여부 (미완료 시 503, 컴포넌트별 초기화 시간 포함)"""
+    status = container.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+@app.get("/health/logging")
+def logging_stats():
+    """로그 파이프라인 상태 (큐 적재/버림 카운터, Elasticsearch 전송 현황)"""
+    from app.utils.log_pipeline import get_log_stats
+    return get_log_stats()
+
+
+@app.get("/health/admission")
+def admission_stats():
+    """요청 수용 제어 레인별 상태 (처리 중/대기 요청 수, 평균 처리 시간, 거절 수)"""
+    from app.utils.admission import get_admission_stats
+    return get_admission_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus 형식 단계별/요청별 지연 시간 히스토그램"""
+    return render_prometheus()
@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from pydantic import BaseModel, Field, field_validator
 
 class SearchRequest(BaseModel):
@@ -43,6 +43,10 @@ class ProductDetailRequest(BaseModel):
     """제품 상세 조회 요청"""
     product_id: str = Field(..., description="제품 ID")
 
+class ProductBulkRequest(BaseModel):
+    """제품 일괄 조회 요청"""
+    product_ids: List[str] = Field(..., min_length=1, description="제품 ID 목록")
+
 class APIResponse(BaseModel):
     """API 응답 기본 스키마"""
     success: bool
@@ -56,9 +60,43 @@ class IntelligentSearchRequest(BaseModel):
     top_k: Optional[int] = Field(5, ge=1, le=20, description="결과 개수")
     enable_fallback: Optional[bool] = Field(True, description="Fallback 응답 사용 여부")
     enable_reranking: Optional[bool] = Field(True, description="Re-ranking 사용 여부")
-    enable_diversity: Optional[bool] = Field(False, description="다양성 필터링 사용 여부")
+    enable_diversity: Optional[bool] = Field(False, description="제조사 다양성 검색 사용 여부 (ES field collapsing)")
+    enable_cross_encoder: Optional[bool] = Field(False, description="Cross-Encoder 2단계 Re-ranking 사용 여부")
     enable_serp: Optional[bool] = Field(False, description="Google SERP 검색 사용 여부")
     serp_max_results: Optional[int] = Field(5, ge=1, le=10, description="SERP 결과 개수")
+    use_cache: Optional[bool] = Field(True, description="유사 쿼리 시맨틱 캐시 사용 여부")
+    deadline_ms: Optional[int] = Field(None, ge=100, le=30000, description="전체 시간 예산(ms), 없으면 DEADLINE_DEFAULT_MS")
+
+class ProductClassificationSummary(BaseModel):
+    """제품 분류 정보 (목록 응답용)"""
+    category: Optional[str] = None
+    intake_method: Optional[str] = None
+    intake_caution: Optional[str] = None
+
+class ProductSummary(BaseModel):
+    """검색 결과 제품 (목록 응답용 축약 형태)"""
+    score: Optional[float] = None
+    product_id: Optional[str] = None
+    product_name: Optional[str] = None
+    company_name: Optional[str] = None
+    primary_function: Optional[str] = None
+    raw_materials: Optional[str] = None
+    classification: Optional[ProductClassificationSummary] = None
+    rerank_score: Optional[float] = None
+    score_breakdown: Optional[Dict[str, float]] = None
+    cross_encoder_score: Optional[float] = None
+
+class HybridSearchData(BaseModel):
+    """하이브리드 검색 결과"""
+    query: str
+    results: List[ProductSummary]
+    count: int
+
+class HybridSearchResponse(BaseModel):
+    """하이브리드 검색 응답"""
+    success: bool
+    message: str
+    data: HybridSearchData
 
 class QueryAnalysisResponse(BaseModel):
     """쿼리 분석 결과"""
@@ -74,12 +112,17 @@ class IntelligentSearchResponse(BaseModel):
     message: str
     query_analysis: Dict[str, Any]
     routing_info: Dict[str, Any]
-    results: Any
+    # 검색 API는 제품 목록, 추천/복용 시간 API는 dict 결과
+    results: Union[List[ProductSummary], Dict[str, Any]]
     fallback_used: bool = False
     fallback_info: Optional[Dict] = None
     serp_results: Optional[List[Dict]] = None
     serp_enabled: bool = False
     additional_info: Optional[Dict] = None
+    rerank_info: Optional[Dict] = None
+    semantic_cache: Optional[Dict] = None
+    materialized: Optional[Dict] = None
+    deadline: Optional[Dict] = None
 
 # Gemini LLM 스키마
 class GeminiRecommendationRequest(BaseModel):
@@ -100,4 +143,7 @@ class GeminiRecommendationRequest(BaseModel):
     include_precautions: bool = Field(True, description="주의사항 포함")
     
     # 커스텀 프롬프트
-    custom_prompt: Optional[str] = Field(None, description="사용자 정의 프롬프트")
\ No newline at end of file
+    custom_prompt: Optional[str] = Field(None, description="사용자 정의 프롬프트")
+    
+    # 응답 캐시
+    use_cache: bool = Field(True, description="동일 프롬프트 응답 캐시 사용 (False면 새로 생성)")
\ No newline at end of file
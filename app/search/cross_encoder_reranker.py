@@ -0,0 +1,207 @@
+"""
+Cross-Encoder 2단계 Re-ranking
+
+1단계(Elasticsearch)에서 넉넉히 가져온 후보를 (쿼리, embedding_text) 쌍 단위로
+CPU Cross-Encoder가 한 번의 배치 호출로 채점하여 재정렬합니다.
+지연 시간 예산을 넘기면 1단계 순서를 그대로 사용합니다.
+추정치로 채점을 생략하는 동안에도 일정 주기마다 시험 채점을 하여 추정치를 갱신합니다.
+"""
+from typing import Dict, List, Optional, Tuple
+import time
+from sentence_transformers import CrossEncoder
+from app.core.config import settings
+from app.utils.cache import LRUCache
+from app.utils.logger import get_logger
+
+config = settings
+logger = get_logger(__name__)
+
+
+class CrossEncoderReRanker:
+    """Cross-Encoder 기반 2단계 재정렬기"""
+
+    # 처리 시간 추정치(EWMA) 평활 계수
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        model_name: str = None,
+        latency_budget_ms: float = None,
+        cache_size: int = None,
+        probe_seconds: float = None
+    ):
+        self.model_name = model_name or config.CROSS_ENCODER_MODEL
+        self.latency_budget_ms = latency_budget_ms or config.CROSS_ENCODER_LATENCY_BUDGET_MS
+        self.probe_seconds = probe_seconds if probe_seconds is not None else config.CROSS_ENCODER_PROBE_SECONDS
+
+        logger.info(f"Cross-Encoder 모델 로드 중: {self.model_name}")
+        self.model = CrossEncoder(
+            self.model_name,
+            max_length=config.CROSS_ENCODER_MAX_LENGTH,
+            device='cpu'
+        )
+
+        # (쿼리, 제품) 쌍 점수 캐시
+        self.pair_cache = LRUCache(maxsize=cache_size or config.CROSS_ENCODER_CACHE_SIZE)
+
+        # 쌍당 평균 채점 시간(ms) 추정치
+        self.ms_per_pair: Optional[float] = None
+        # 마지막 실측(채점) 시각 - 추정치로 생략만 계속되면 추정치가 갱신되지 않으므로 시험 채점 주기 판단에 사용
+        self.last_measured: float = 0.0
+
+        self.stats = {
+            "applied": 0,
+            "skipped_by_estimate": 0,
+            "probes": 0,
+            "budget_exceeded": 0
+        }
+
+        logger.info("Cross-Encoder Re-ranking 초기화 완료")
+
+    def rerank(
+        self,
+        query: str,
+        results: List[Dict],
+        top_k: Optional[int] = None
+    ) -> Tuple[List[Dict], Dict]:
+        """
+        후보 재정렬
+
+        Returns:
+            (재정렬된 결과, 적용 정보)
+            예산 초과 시 1단계 순서를 유지한 결과와 fallback 사유를 반환합니다.
+        """
+
+        if not results:
+            return results, {"applied": False, "reason": "no_results"}
+
+        start = time.perf_counter()
+
+        keys = [self._pair_key(query, result) for result in results]
+        scores: List[Optional[float]] = [self.pair_cache.get(key) for key in keys]
+        missing = [idx for idx, score in enumerate(scores) if score is None]
+
+        info = {
+            "applied": False,
+            "model": self.model_name,
+            "candidates": len(results),
+            "cached_pairs": len(results) - len(missing),
+            "scored_pairs": 0,
+            "budget_ms": self.latency_budget_ms
+        }
+
+        # 이전 배치 기준 추정치로 예산 초과가 확실하면 채점 생략
+        # (마지막 실측 후 probe_seconds가 지났으면 이번 요청으로 시험 채점하여 추정치 갱신)
+        if missing and self.ms_per_pair is not None:
+            estimated_ms = self.ms_per_pair * len(missing)
+            if estimated_ms > self.latency_budget_ms:
+                now = time.monotonic()
+                if now - self.last_measured < self.probe_seconds:
+                    self.stats["skipped_by_estimate"] += 1
+                    info["reason"] = "budget_estimate"
+                    info["estimated_ms"] = round(estimated_ms, 1)
+                    return self._first_stage(results, top_k), info
+
+                # 동시 요청이 모두 시험 채점하지 않도록 먼저 시각 갱신
+                self.last_measured = now
+                self.stats["probes"] += 1
+                info["probe"] = True
+                logger.info(
+                    f"Cross-Encoder 시험 채점: 추정 {estimated_ms:.1f}ms > 예산 {self.latency_budget_ms}ms"
+                )
+
+        if missing:
+            pairs = [(query, self._passage(results[idx])) for idx in missing]
+
+            batch_start = time.perf_counter()
+            try:
+                predicted = self.model.predict(
+                    pairs,
+                    batch_size=len(pairs),
+                    show_progress_bar=False,
+                    convert_to_numpy=True
+                )
+            except Exception as e:
+                logger.error(f"Cross-Encoder 채점 오류 (1단계 순서 사용): {e}")
+                info["reason"] = "error"
+                return self._first_stage(results, top_k), info
+            batch_ms = (time.perf_counter() - batch_start) * 1000
+
+            self._update_estimate(batch_ms / len(pairs))
+            self.last_measured = time.monotonic()
+
+            for idx, score in zip(missing, predicted):
+                scores[idx] = float(score)
+                self.pair_cache.set(keys[idx], float(score))
+
+            info["scored_pairs"] = len(pairs)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        info["elapsed_ms"] = round(elapsed_ms, 1)
+
+        # 채점은 끝났지만 예산을 넘긴 경우: 점수는 캐시에 남기고 이번 응답은 1단계 순서 사용
+        if elapsed_ms > self.latency_budget_ms:
+            self.stats["budget_exceeded"] += 1
+            info["reason"] = "budget_exceeded"
+            logger.warning(f"Cross-Encoder 예산 초과: {elapsed_ms:.1f}ms > {self.latency_budget_ms}ms")
+            return self._first_stage(results, top_k), info
+
+        for result, score in zip(results, scores):
+            result['cross_encoder_score'] = score
+            result.pop('embedding_text', None)
+
+        reranked = sorted(results, key=lambda x: x['cross_encoder_score'], reverse=True)
+
+        if top_k:
+            reranked = reranked[:top_k]
+
+        self.stats["applied"] += 1
+        info["applied"] = True
+
+        logger.info(f"Cross-Encoder Re-ranking 완료: {len(results)}개 후보, {elapsed_ms:.1f}ms")
+
+        return reranked, info
+
+    def get_stats(self) -> Dict:
+        """Re-ranking 통계"""
+        return {
+            **self.stats,
+            "ms_per_pair": round(self.ms_per_pair, 3) if self.ms_per_pair is not None else None,
+            "pair_cache": self.pair_cache.stats()
+        }
+
+    def _first_stage(self, results: List[Dict], top_k: Optional[int]) -> List[Dict]:
+        """1단계 순서 유지 (채점용 텍스트만 제거)"""
+
+        for result in results:
+            result.pop('embedding_text', None)
+
+        return results[:top_k] if top_k else results
+
+    def _update_estimate(self, ms_per_pair: float):
+        """쌍당 처리 시간 EWMA 갱신"""
+
+        if self.ms_per_pair is None:
+            self.ms_per_pair = ms_per_pair
+        else:
+            self.ms_per_pair = (
+                self.EWMA_ALPHA * ms_per_pair + (1 - self.EWMA_ALPHA) * self.ms_per_pair
+            )
+
+    def _pair_key(self, query: str, result: Dict) -> Tuple[str, str]:
+        """캐시 키: (쿼리, 제품 ID 또는 채점 텍스트)"""
+        return (query, result.get('product_id') or self._passage(result))
+
+    def _passage(self, result: Dict) -> str:
+        """채점 대상 텍스트 (embedding_text가 없으면 주요 필드로 구성)"""
+
+        text = result.get('embedding_text')
+        if text:
+            return text
+
+        parts = [
+            result.get('product_name') or '',
+            result.get('primary_function') or '',
+            result.get('raw_materials') or ''
+        ]
+        return ' '.join(part for part in parts if part)
@@ -18,9 +18,10 @@ class ElasticsearchManager:
         logger.info(f"호스트: {config.ES_HOST}:{config.ES_PORT}")
         
         try:
-            # 연결 객체 생성
-            self.es = get_elasticsearch_client()
-            logger.info("ElasticSearch 클라이언트 객체 생성 완료")
+            # 공용 클라이언트 사용 (인덱스 관리/대량 색인은 작업별 타임아웃 적용)
+            self.es = get_elasticsearch_client("admin")
+            self.bulk_es = get_elasticsearch_client("bulk")
+            logger.info("ElasticSearch 클라이언트 준비 완료")
             
             # 인덱스 이름 설정
             self.index_name = config.ES_INDEX_NAME
@@ -167,7 +168,7 @@ class ElasticsearchManager:
             # 배치 단위로 색인
             if len(actions) >= batch_size:
                 success, failed = helpers.bulk(
-                    self.es,
+                    self.bulk_es,
                     actions,
                     raise_on_error=False
                 )
@@ -182,7 +183,7 @@ class ElasticsearchManager:
         # 나머지 문서 색인
         if actions:
             success, failed = helpers.bulk(
-                self.es,
+                self.bulk_es,
                 actions,
                 raise_on_error=False
             )
@@ -224,7 +225,7 @@ class ElasticsearchManager:
             batch_actions = actions[i:i + batch_size]
             
             success, failed = helpers.bulk(
-                self.es,
+                self.bulk_es,
                 batch_actions,
                 stats_only=True,
                 raise_on_error=False
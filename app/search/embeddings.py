@@ -2,6 +2,8 @@ from sentence_transformers import SentenceTransformer
 from typing import List
 import numpy as np
 from app.core.config import settings
+from app.utils.cache import LRUCache
+from app.utils.metrics import stage
 from app.utils.logger import get_logger
 
 config = settings
@@ -10,12 +12,24 @@ logger = get_logger(__name__)
 class EmbeddingGenerator:
     """임베딩 생성 클래스"""
     
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, quantize: bool = None):
         self.model_name = model_name or config.EMBEDDING_MODEL
-        logger.info(f"임베딩 모델 로드 중: {self.model_name}")
+        self.quantize = config.EMBEDDING_QUANTIZE if quantize is None else quantize
+        logger.info(f"임베딩 모델 로드 중: {self.model_name} (quantize={self.quantize})")
         self.model = SentenceTransformer(self.model_name)
+        if self.quantize:
+            self.model = self._quantize(self.model)
+        # 같은 쿼리 텍스트의 재인코딩 방지 (시맨틱 캐시 조회와 검색이 같은 벡터를 재사용)
+        self.query_cache = LRUCache(maxsize=config.EMBEDDING_CACHE_SIZE)
         logger.info("임베딩 모델 로드 완료")
     
+    @staticmethod
+    def _quantize(model: SentenceTransformer) -> SentenceTransformer:
+        """Linear 레이어 동적 int8 양자화 (CPU 추론 전용, 정확도 영향은 평가 스크립트로 확인)"""
+        import torch
+        
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    
     def generate(
         self, 
         texts: List[str], 
@@ -38,5 +52,13 @@ class EmbeddingGenerator:
         return embeddings
     
     def generate_single(self, text: str) -> np.ndarray:
-        """단일 텍스트 임베딩"""
-        return self.model.encode([text], convert_to_numpy=True)[0]
\ No newline at end of file
+        """단일 텍스트 임베딩 (캐시된 벡터는 읽기 전용)"""
+        
+        vector = self.query_cache.get(text)
+        if vector is None:
+            with stage("embed"):
+                vector = self.model.encode([text], convert_to_numpy=True)[0]
+            vector.flags.writeable = False
+            self.query_cache.set(text, vector)
+        
+        return vector
\ No newline at end of file
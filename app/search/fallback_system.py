@@ -3,10 +3,15 @@ Fallback 응답 시스템
 
 검색 결과가 없거나 부족할 때 카테고리별 기본 추천을 제공합니다.
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, TYPE_CHECKING
+from app.core.config import settings
 from app.utils.knowledge_base import HealthKnowledgeBase
+from app.utils.deadline import within_deadline
 from app.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from app.search.query_analyzer import QueryAnalysis
+
 logger = get_logger(__name__)
 
 
@@ -42,7 +47,7 @@ class FallbackSystem:
     def generate_fallback_response(
         self, 
         query: str, 
-        analysis: Dict
+        analysis: "QueryAnalysis"
     ) -> Dict:
         """Fallback 응답 생성"""
         
@@ -71,7 +76,7 @@ class FallbackSystem:
             return response
         
         # 2. 추출된 개체명 기반 추천
-        entities = analysis.get("entities", {})
+        entities = analysis.entities
         
         if entities.get("symptoms"):
             symptom = entities["symptoms"][0]
@@ -125,17 +130,20 @@ class FallbackSystem:
         self,
         results: any,
         query: str,
-        analysis: Dict
+        analysis: "QueryAnalysis"
     ) -> Dict:
-        """결과에 추가 정보 보강"""
+        """결과에 추가 정보 보강 (요청 시간 예산이 부족하면 보강 없이 반환)"""
         
         enhanced = {
             "original_results": results,
             "additional_info": {}
         }
         
+        if not within_deadline("enhance", settings.DEADLINE_ENHANCE_MIN_MS):
+            return enhanced
+        
         # 증상 관련 추가 정보
-        entities = analysis.get("entities", {})
+        entities = analysis.entities
         
         if entities.get("symptoms"):
             symptom = entities["symptoms"][0]
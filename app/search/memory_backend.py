@@ -0,0 +1,602 @@
+"""
+인메모리 검색 백엔드 (In-Memory Search Backend)
+
+외부 서비스 없이 수천 건 규모의 제품을 검색하기 위한 인프로세스 백엔드입니다.
+
+- 벡터: 디스크의 float32 행렬(vectors.npy)을 memory-map으로 열고,
+  쿼리마다 행렬-벡터 곱 한 번으로 코사인 유사도를 계산한 뒤 top-k를 고릅니다.
+- 키워드: multi_match 대상 필드에 대해 numpy 배열로 압축한 역색인(BM25)을 사용합니다.
+
+RAGSearchEngine이 만드는 Query DSL의 부분집합(bool, match, multi_match, term,
+match_all, script_score(cosineSimilarity), 최상위 knn, collapse, _source)을 해석하여
+Elasticsearch와 같은 형태의 응답을 반환합니다.
+
+색인 디렉터리 구성 (scripts/build_memory_index.py로 생성):
+    documents.jsonl  - 문서 _source (embedding_vector 제외), 행 순서 = 벡터 행 순서
+    vectors.npy      - L2 정규화된 float32 [문서 수, EMBEDDING_DIM] 행렬
+    meta.json        - 모델명, 차원, 문서 수, 생성 시각
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import defaultdict
+from datetime import datetime
+import json
+import os
+import re
+import numpy as np
+from app.search.search_backend import SearchBackend
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 역색인 대상 필드 (RAGSearchEngine의 match/multi_match 대상)
+TEXT_FIELDS = [
+    "product_name",
+    "company_name",
+    "primary_function",
+    "raw_materials",
+    "classification.function_content",
+    "embedding_text"
+]
+
+_TOKEN_PATTERN = re.compile(r"[0-9a-z가-힣]+")
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+_COSINE_SCRIPT_PATTERN = re.compile(
+    r"cosineSimilarity\(\s*params\.(\w+)\s*,\s*'embedding_vector'\s*\)\s*(\+\s*([0-9.]+))?"
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    간이 한국어 토크나이저
+
+    단어 단위 토큰에 더해, 한글 단어는 2-gram도 생성합니다.
+    (인덱스의 korean_ngram 분석기와 비슷한 부분 일치 효과)
+    """
+
+    tokens = []
+
+    for word in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2 and _HANGUL_PATTERN.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+
+    return tokens
+
+
+def _get_path(source: Dict, path: str):
+    """점 표기 경로 값 조회 (.keyword/.ngram 서브필드는 원본 필드로 간주)"""
+
+    for suffix in (".keyword", ".ngram"):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+
+    value = source
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+
+    return value
+
+
+def _as_list(value) -> List:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+class _FieldIndex:
+    """단일 필드 BM25 역색인 (토큰별 문서 번호/빈도 numpy 배열)"""
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, texts: List[str]):
+        postings = defaultdict(dict)
+        lengths = np.zeros(len(texts), dtype=np.float32)
+
+        for doc_idx, text in enumerate(texts):
+            tokens = tokenize(text) if text else []
+            lengths[doc_idx] = len(tokens)
+            for token in tokens:
+                postings[token][doc_idx] = postings[token].get(doc_idx, 0) + 1
+
+        self.n_docs = len(texts)
+        self.lengths = lengths
+        self.avg_length = float(lengths.mean()) if len(texts) and lengths.mean() > 0 else 1.0
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            token: (
+                np.fromiter(docs.keys(), dtype=np.int32, count=len(docs)),
+                np.fromiter(docs.values(), dtype=np.float32, count=len(docs))
+            )
+            for token, docs in postings.items()
+        }
+
+    def score(self, tokens: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 점수 계산
+
+        Returns:
+            (문서별 점수, 문서별 일치한 고유 쿼리 토큰 수)
+        """
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        matched_terms = np.zeros(self.n_docs, dtype=np.int32)
+
+        for token in set(tokens):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+
+            doc_ids, tfs = posting
+            df = len(doc_ids)
+            idf = np.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+            norm = self.K1 * (1 - self.B + self.B * self.lengths[doc_ids] / self.avg_length)
+
+            scores[doc_ids] += idf * tfs * (self.K1 + 1) / (tfs + norm)
+            matched_terms[doc_ids] += 1
+
+        return scores, matched_terms
+
+
+class InMemorySearchBackend(SearchBackend):
+    """numpy 기반 인프로세스 검색 백엔드"""
+
+    name = "memory"
+
+    def __init__(
+        self,
+        documents: List[Dict],
+        vectors: np.ndarray,
+        meta: Optional[Dict] = None
+    ):
+        if len(documents) != len(vectors):
+            raise ValueError(
+                f"문서 수({len(documents)})와 벡터 수({len(vectors)})가 일치하지 않습니다."
+            )
+
+        self.documents = documents
+        self.vectors = vectors
+        self.meta = meta or {}
+        self.n_docs = len(documents)
+
+        self.ids = [str(doc.get("product_id", idx)) for idx, doc in enumerate(documents)]
+        self.id_to_row = {doc_id: idx for idx, doc_id in enumerate(self.ids)}
+
+        self.field_indexes = {
+            field: _FieldIndex([self._text_value(doc, field) for doc in documents])
+            for field in TEXT_FIELDS
+        }
+
+        # term/collapse용 keyword 값 (필드별 지연 생성)
+        self._keyword_values: Dict[str, np.ndarray] = {}
+
+        logger.info(f"인메모리 검색 백엔드 초기화 완료: {self.n_docs}개 문서, dim={vectors.shape[1] if self.n_docs else 0}")
+
+    # ------------------------------------------------------------------
+    # 색인 파일 입출력
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, index_dir: str) -> "InMemorySearchBackend":
+        """색인 디렉터리 로드 (벡터 행렬은 memory-map)"""
+
+        documents_path = os.path.join(index_dir, "documents.jsonl")
+        vectors_path = os.path.join(index_dir, "vectors.npy")
+        meta_path = os.path.join(index_dir, "meta.json")
+
+        if not os.path.exists(documents_path) or not os.path.exists(vectors_path):
+            raise FileNotFoundError(
+                f"인메모리 색인이 없습니다: {index_dir} "
+                f"(scripts/build_memory_index.py로 생성하세요)"
+            )
+
+        logger.info(f"인메모리 색인 로드: {index_dir}")
+
+        with open(documents_path, encoding="utf-8") as f:
+            documents = [json.loads(line) for line in f if line.strip()]
+
+        vectors = np.load(vectors_path, mmap_mode="r")
+
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+
+        return cls(documents, vectors, meta)
+
+    @staticmethod
+    def build(
+        documents: List[Dict],
+        vectors: np.ndarray,
+        index_dir: str,
+        model_name: str = None
+    ) -> Dict:
+        """문서와 임베딩으로 색인 디렉터리 생성 (벡터는 L2 정규화하여 저장)"""
+
+        os.makedirs(index_dir, exist_ok=True)
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = np.ascontiguousarray(vectors / norms)
+
+        with open(os.path.join(index_dir, "documents.jsonl"), "w", encoding="utf-8") as f:
+            for doc in documents:
+                source = {k: v for k, v in doc.items() if k != "embedding_vector"}
+                f.write(json.dumps(source, ensure_ascii=False) + "\n")
+
+        np.save(os.path.join(index_dir, "vectors.npy"), vectors)
+
+        meta = {
+            "model": model_name,
+            "dim": int(vectors.shape[1]) if len(vectors) else 0,
+            "count": len(documents),
+            "created_at": datetime.now().isoformat()
+        }
+        with open(os.path.join(index_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        return meta
+
+    # ------------------------------------------------------------------
+    # SearchBackend 인터페이스
+    # ------------------------------------------------------------------
+
+    def search(self, index: str, body: Dict, **params) -> Dict:
+        size = body.get("size", 10)
+
+        if "query" in body or "knn" not in body:
+            matched, scores = self._evaluate(body.get("query", {"match_all": {}}))
+        else:
+            matched = np.zeros(self.n_docs, dtype=bool)
+            scores = np.zeros(self.n_docs, dtype=np.float32)
+
+        # 최상위 knn + query: 두 결과의 합집합, 점수는 합산 (Elasticsearch 하이브리드 검색과 동일)
+        if "knn" in body:
+            knn_matched, knn_scores = self._knn(body["knn"])
+            scores = np.where(matched, scores, 0).astype(np.float32) + knn_scores
+            matched = matched | knn_matched
+
+        candidates = np.flatnonzero(matched)
+        source_spec = body.get("_source", True)
+        collapse = body.get("collapse")
+
+        if collapse:
+            order = candidates[np.argsort(-scores[candidates], kind="stable")]
+            hits = self._collapse(order, scores, collapse, size, source_spec)
+        else:
+            if len(candidates) > size:
+                top = np.argpartition(-scores[candidates], size - 1)[:size] if size > 0 else []
+                candidates = candidates[top]
+            order = candidates[np.argsort(-scores[candidates], kind="stable")]
+            hits = [self._hit(int(row), scores, source_spec) for row in order]
+
+        return {
+            "timed_out": False,
+            "hits": {
+                "total": {"value": int(matched.sum()), "relation": "eq"},
+                "max_score": float(scores[order[0]]) if len(order) else None,
+                "hits": hits
+            }
+        }
+
+    def get(self, index: str, id: str, **params) -> Dict:
+        row = self.id_to_row.get(str(id))
+
+        if row is None:
+            return {"_index": index, "_id": id, "found": False}
+
+        return {
+            "_index": index,
+            "_id": id,
+            "found": True,
+            "_source": self._project(
+                self.documents[row],
+                {"excludes": _as_list(params.get("source_excludes"))}
+            )
+        }
+
+    def mget(self, index: str, ids: List[str], source_excludes: List[str] = None) -> List[Dict]:
+        return [self.get(index, doc_id, source_excludes=source_excludes) for doc_id in ids]
+
+    def ping(self) -> bool:
+        return True
+
+    def index_version(self, index: str) -> str:
+        return f"{self.n_docs}-{self.meta.get('created_at', '')}"
+
+    # ------------------------------------------------------------------
+    # Query DSL 해석
+    # ------------------------------------------------------------------
+
+    def _evaluate(self, query: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """쿼리 평가: (일치 여부 bool 배열, 점수 float32 배열)"""
+
+        if len(query) != 1:
+            raise ValueError(f"지원하지 않는 쿼리 형식입니다: {list(query.keys())}")
+
+        query_type, clause = next(iter(query.items()))
+        handler = getattr(self, f"_q_{query_type}", None)
+
+        if handler is None:
+            raise ValueError(f"인메모리 백엔드가 지원하지 않는 쿼리입니다: {query_type}")
+
+        return handler(clause)
+
+    def _q_match_all(self, clause: Dict):
+        boost = clause.get("boost", 1.0)
+        return (
+            np.ones(self.n_docs, dtype=bool),
+            np.full(self.n_docs, boost, dtype=np.float32)
+        )
+
+    def _q_match(self, clause: Dict):
+        field, spec = next(iter(clause.items()))
+
+        if isinstance(spec, dict):
+            text = spec.get("query", "")
+            operator = spec.get("operator", "or")
+            boost = spec.get("boost", 1.0)
+        else:
+            text, operator, boost = spec, "or", 1.0
+
+        tokens = set(tokenize(str(text)))
+        scores, matched_terms = self._field_index(field).score(tokens)
+
+        if operator == "and":
+            matched = matched_terms >= len(tokens) if tokens else np.zeros(self.n_docs, dtype=bool)
+        else:
+            matched = matched_terms > 0
+
+        return matched, np.where(matched, scores * boost, 0).astype(np.float32)
+
+    def _q_multi_match(self, clause: Dict):
+        tokens = set(tokenize(str(clause.get("query", ""))))
+        boost = clause.get("boost", 1.0)
+
+        best = np.zeros(self.n_docs, dtype=np.float32)
+        matched = np.zeros(self.n_docs, dtype=bool)
+
+        for field_spec in clause.get("fields", []):
+            field, _, field_boost = field_spec.partition("^")
+            field_boost = float(field_boost) if field_boost else 1.0
+
+            scores, matched_terms = self._field_index(field).score(tokens)
+            np.maximum(best, scores * field_boost, out=best)
+            matched |= matched_terms > 0
+
+        # best_fields: 필드별 점수 중 최댓값
+        return matched, np.where(matched, best * boost, 0).astype(np.float32)
+
+    def _q_term(self, clause: Dict):
+        field, spec = next(iter(clause.items()))
+
+        if isinstance(spec, dict):
+            value, boost = spec.get("value"), spec.get("boost", 1.0)
+        else:
+            value, boost = spec, 1.0
+
+        matched = self._keyword_array(field) == value
+        return matched, np.where(matched, boost, 0).astype(np.float32)
+
+    def _q_terms(self, clause: Dict):
+        field, values = next((k, v) for k, v in clause.items() if k != "boost")
+        boost = clause.get("boost", 1.0)
+
+        matched = np.isin(self._keyword_array(field), list(values))
+        return matched, np.where(matched, boost, 0).astype(np.float32)
+
+    def _q_bool(self, clause: Dict):
+        matched = np.ones(self.n_docs, dtype=bool)
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+
+        must = _as_list(clause.get("must"))
+        filters = _as_list(clause.get("filter"))
+        should = _as_list(clause.get("should"))
+
+        for sub in must:
+            sub_matched, sub_scores = self._evaluate(sub)
+            matched &= sub_matched
+            scores += sub_scores
+
+        for sub in filters:
+            matched &= self._evaluate(sub)[0]
+
+        for sub in _as_list(clause.get("must_not")):
+            matched &= ~self._evaluate(sub)[0]
+
+        if should:
+            should_counts = np.zeros(self.n_docs, dtype=np.int32)
+            for sub in should:
+                sub_matched, sub_scores = self._evaluate(sub)
+                should_counts += sub_matched
+                scores += np.where(sub_matched, sub_scores, 0)
+
+            minimum = clause.get("minimum_should_match")
+            if minimum is None:
+                minimum = 0 if (must or filters) else 1
+            matched &= should_counts >= int(minimum)
+
+        boost = clause.get("boost", 1.0)
+        return matched, np.where(matched, scores * boost, 0).astype(np.float32)
+
+    def _q_script_score(self, clause: Dict):
+        matched, _ = self._evaluate(clause.get("query", {"match_all": {}}))
+
+        script = clause.get("script", {})
+        match = _COSINE_SCRIPT_PATTERN.search(script.get("source", ""))
+        if not match:
+            raise ValueError("인메모리 백엔드는 cosineSimilarity 스크립트만 지원합니다.")
+
+        query_vector = script.get("params", {}).get(match.group(1))
+        offset = float(match.group(3)) if match.group(3) else 0.0
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        rows = np.flatnonzero(matched)
+
+        if len(rows):
+            scores[rows] = self._cosine(query_vector, rows) + offset
+
+        boost = clause.get("boost", 1.0)
+        return matched, scores * boost
+
+    def _knn(self, clause: Dict):
+        """최상위 knn 절 (정확한 top-k, 점수는 Elasticsearch cosine과 같은 (1 + cos) / 2)"""
+
+        filters = _as_list(clause.get("filter"))
+        if filters:
+            allowed, _ = self._evaluate({"bool": {"filter": filters}})
+        else:
+            allowed = np.ones(self.n_docs, dtype=bool)
+
+        matched = np.zeros(self.n_docs, dtype=bool)
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        rows = np.flatnonzero(allowed)
+
+        if len(rows):
+            similarities = (1.0 + self._cosine(clause["query_vector"], rows)) / 2
+            top = np.argsort(-similarities, kind="stable")[:clause.get("k", 10)]
+            matched[rows[top]] = True
+            scores[rows[top]] = similarities[top] * clause.get("boost", 1.0)
+
+        return matched, scores
+
+    # ------------------------------------------------------------------
+    # 내부 유틸리티
+    # ------------------------------------------------------------------
+
+    def _cosine(self, query_vector, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """정규화된 벡터 행렬과의 코사인 유사도 (행렬-벡터 곱 한 번)"""
+
+        q = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm > 0:
+            q = q / norm
+
+        if rows is None or len(rows) == self.n_docs:
+            return np.asarray(self.vectors @ q, dtype=np.float32)
+
+        return np.asarray(self.vectors[rows] @ q, dtype=np.float32)
+
+    def _field_index(self, field: str) -> _FieldIndex:
+        for suffix in (".keyword", ".ngram"):
+            if field.endswith(suffix):
+                field = field[:-len(suffix)]
+
+        if field not in self.field_indexes:
+            self.field_indexes[field] = _FieldIndex(
+                [self._text_value(doc, field) for doc in self.documents]
+            )
+
+        return self.field_indexes[field]
+
+    def _keyword_array(self, field: str) -> np.ndarray:
+        if field not in self._keyword_values:
+            values = np.empty(self.n_docs, dtype=object)
+            for idx, doc in enumerate(self.documents):
+                values[idx] = _get_path(doc, field)
+            self._keyword_values[field] = values
+
+        return self._keyword_values[field]
+
+    def _text_value(self, doc: Dict, field: str) -> str:
+        value = _get_path(doc, field)
+
+        if value is None:
+            return ""
+        if isinstance(value, list):
+            return " ".join(str(v) for v in value)
+        return str(value)
+
+    def _hit(self, row: int, scores: np.ndarray, source_spec) -> Dict:
+        return {
+            "_id": self.ids[row],
+            "_score": float(scores[row]),
+            "_source": self._project(self.documents[row], source_spec)
+        }
+
+    def _collapse(
+        self,
+        order: np.ndarray,
+        scores: np.ndarray,
+        collapse: Dict,
+        size: int,
+        source_spec
+    ) -> List[Dict]:
+        """field collapsing: 그룹별 최고 점수 문서 + inner_hits"""
+
+        group_values = self._keyword_array(collapse["field"])
+        inner = collapse.get("inner_hits")
+        inner_size = inner.get("size", 3) if inner else 0
+        inner_source = inner.get("_source", source_spec) if inner else source_spec
+
+        groups: Dict = {}
+        for row in order:
+            key = group_values[row]
+            if key not in groups:
+                if len(groups) >= size:
+                    continue
+                groups[key] = []
+            if len(groups[key]) < max(inner_size, 1):
+                groups[key].append(int(row))
+
+        hits = []
+        for rows in groups.values():
+            hit = self._hit(rows[0], scores, source_spec)
+            if inner:
+                hit["inner_hits"] = {
+                    inner.get("name", "inner_hits"): {
+                        "hits": {
+                            "total": {"value": len(rows), "relation": "eq"},
+                            "hits": [self._hit(row, scores, inner_source) for row in rows]
+                        }
+                    }
+                }
+            hits.append(hit)
+
+        return hits
+
+    def _project(self, source: Dict, spec) -> Dict:
+        """_source includes/excludes 적용"""
+
+        if spec is False:
+            return {}
+        if spec is True or spec is None:
+            return dict(source)
+
+        if isinstance(spec, (list, str)):
+            includes, excludes = _as_list(spec), []
+        else:
+            includes = _as_list(spec.get("includes"))
+            excludes = _as_list(spec.get("excludes"))
+
+        if includes:
+            projected = {}
+            for path in includes:
+                value = _get_path(source, path)
+                if value is None:
+                    continue
+                target = projected
+                parts = path.split(".")
+                for part in parts[:-1]:
+                    target = target.setdefault(part, {})
+                target[parts[-1]] = value
+        else:
+            projected = dict(source)
+
+        for path in excludes:
+            parts = path.split(".")
+            target = projected
+            for part in parts[:-1]:
+                child = target.get(part) if isinstance(target, dict) else None
+                if not isinstance(child, dict):
+                    target = None
+                    break
+                # 원본 문서가 바뀌지 않도록 중첩 dict는 복사 후 수정
+                target[part] = dict(child)
+                target = target[part]
+            if isinstance(target, dict):
+                target.pop(parts[-1], None)
+
+        return projected
@@ -3,11 +3,25 @@
 
 사용자 쿼리를 분석하여 개체명, 의도, 확장 키워드를 추출합니다.
 규칙 기반 방식으로 구현되어 있으며, 필요시 NER 모델로 확장 가능합니다.
+의도 분류는 키워드 규칙으로 정해지지 않는 쿼리만 쿼리 임베딩과 의도별 중심 벡터의 유사도로 분류합니다.
+분석 결과는 변경 불가능한 QueryAnalysis 객체이며, 정규화 쿼리 + 지식 베이스 버전 기준으로 메모이즈됩니다.
 """
-from typing import Dict, List, Set, Optional
+from typing import Any, Dict, List, Mapping, Set, Optional, Tuple, TYPE_CHECKING
+from dataclasses import dataclass, field
+from types import MappingProxyType
+import hashlib
+import json
+import numpy as np
+from app.core.config import settings
+from app.utils.cache import LRUCache
 from app.utils.knowledge_base import HealthKnowledgeBase
+from app.utils.deadline import current_deadline, within_deadline
 from app.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from app.search.embeddings import EmbeddingGenerator
+
+config = settings
 logger = get_logger(__name__)
 
 
@@ -91,7 +105,17 @@ class EntityExtractor:
 
 
 class IntentClassifier:
-    """의도 분류기"""
+    """
+    의도 분류기
+    
+    1. 키워드 규칙: 하나의 의도로 정해지면 그대로 사용 (임베딩 계산 없음)
+    2. 규칙 결과가 MIXED/GENERAL_SEARCH이면 쿼리 임베딩과 의도별 중심 벡터의 코사인 유사도를
+       행렬 곱 한 번으로 계산하여, 최고 유사도와 2위와의 차이가 기준 이상일 때 그 의도로 분류
+    
+    중심 벡터는 증상 의도는 지식 베이스 FAQ 질문, 나머지 의도는 성분 이름으로 만든
+    예시 질문(INTENT_TEMPLATES)의 임베딩 평균입니다.
+    임베딩 생성기가 없거나 INTENT_EMBEDDING_ENABLED=False이면 키워드 규칙만 사용합니다.
+    """
     
     # 의도별 키워드
     INTENT_KEYWORDS = {
@@ -102,11 +126,127 @@ class IntentClassifier:
         "PRODUCT_SEARCH": ["제품", "상품", "브랜드", "회사"]
     }
     
-    def __init__(self):
-        logger.info("의도 분류기 초기화 완료")
+    # FAQ 질문이 없는 의도의 예시 질문 ({ingredient}: 지식 베이스 성분)
+    INTENT_TEMPLATES = {
+        "INGREDIENT_SEARCH": [
+            "{ingredient} 성분이 들어있는 제품 알려주세요",
+            "{ingredient} 함유된 영양제 찾아줘",
+            "{ingredient}가 포함된 건강기능식품"
+        ],
+        "TIMING_QUERY": [
+            "{ingredient}은 언제 먹는 게 좋아요?",
+            "{ingredient} 복용 시간이 궁금해요",
+            "{ingredient}는 아침에 먹어야 하나요 저녁에 먹어야 하나요?"
+        ],
+        "EFFECT_QUERY": [
+            "{ingredient}의 효능이 뭔가요?",
+            "{ingredient} 먹으면 어떤 효과가 있나요?"
+        ],
+        "PRODUCT_SEARCH": [
+            "{ingredient} 제품 중에 인기 있는 브랜드",
+            "가성비 좋은 {ingredient} 상품 추천"
+        ]
+    }
+    
+    # 예시 질문에 사용할 성분 수 (이름순)
+    TEMPLATE_INGREDIENTS = 24
+    
+    def __init__(
+        self,
+        knowledge_base: Optional[HealthKnowledgeBase] = None,
+        embedding_generator: Optional["EmbeddingGenerator"] = None
+    ):
+        self.embedding_generator = None
+        self.intents: List[str] = []
+        self.centroids: Optional[np.ndarray] = None
+        
+        if embedding_generator is not None and config.INTENT_EMBEDDING_ENABLED:
+            self.embedding_generator = embedding_generator
+            self._build_centroids(knowledge_base or HealthKnowledgeBase())
+        
+        logger.info(f"의도 분류기 초기화 완료 (임베딩 분류: {self.centroids is not None})")
+    
+    def _build_centroids(self, kb: HealthKnowledgeBase):
+        """의도별 예시 질문 임베딩 평균 (정규화된 행렬, 행 = self.intents)"""
+        
+        examples = {
+            "SYMPTOM_SEARCH": [
+                faq["question"]
+                for recommendation in kb.DEFAULT_RECOMMENDATIONS.values()
+                for faq in recommendation.get("faqs", [])
+            ]
+        }
+        
+        ingredients = sorted(kb.get_all_ingredients())[:self.TEMPLATE_INGREDIENTS]
+        for intent, templates in self.INTENT_TEMPLATES.items():
+            examples[intent] = [
+                template.format(ingredient=ingredient)
+                for template in templates
+                for ingredient in ingredients
+            ]
+        
+        texts = [text for questions in examples.values() for text in questions]
+        vectors = self._normalize(self.embedding_generator.generate(texts, show_progress=False))
+        
+        centroids = []
+        offset = 0
+        for intent, questions in examples.items():
+            centroids.append(vectors[offset:offset + len(questions)].mean(axis=0))
+            offset += len(questions)
+        
+        self.intents = list(examples.keys())
+        self.centroids = self._normalize(np.vstack(centroids))
+        
+        logger.info(f"의도 중심 벡터 생성 완료: {len(self.intents)}개 의도, 예시 질문 {len(texts)}개")
+    
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+    
+    def classify(self, query: str, entities: Dict, query_vector: Optional[np.ndarray] = None) -> str:
+        """
+        쿼리 의도 분류
+        
+        Args:
+            query: 원본 쿼리
+            entities: 추출된 개체명
+            query_vector: 이미 계산한 쿼리 임베딩 (없으면 필요할 때 임베딩 생성기로 계산,
+                          같은 쿼리의 임베딩은 생성기 캐시를 통해 시맨틱 캐시/검색과 공유)
+        """
+        
+        intent = self._classify_by_keywords(query, entities)
+        
+        if intent not in ("MIXED", "GENERAL_SEARCH") or self.centroids is None:
+            return intent
+        
+        if query_vector is None:
+            if not within_deadline("intent_embedding"):
+                return intent
+            query_vector = self.embedding_generator.generate_single(query)
+        
+        return self._classify_by_embedding(query_vector) or intent
+    
+    def _classify_by_embedding(self, query_vector: np.ndarray) -> Optional[str]:
+        """중심 벡터 유사도 분류 (기준 미달이면 None)"""
+        
+        similarities = self.centroids @ self._normalize(np.asarray(query_vector, dtype=np.float32))
+        
+        order = np.argsort(similarities)[::-1]
+        best = float(similarities[order[0]])
+        margin = best - float(similarities[order[1]]) if len(order) > 1 else best
+        
+        logger.debug(
+            "의도 유사도: " + ", ".join(f"{self.intents[i]}={similarities[i]:.3f}" for i in order)
+        )
+        
+        if best < config.INTENT_EMBEDDING_MIN_SIMILARITY or margin < config.INTENT_EMBEDDING_MIN_MARGIN:
+            return None
+        
+        return self.intents[order[0]]
     
-    def classify(self, query: str, entities: Dict) -> str:
-        """쿼리 의도 분류"""
+    def _classify_by_keywords(self, query: str, entities: Dict) -> str:
+        """키워드/개체명 규칙 분류"""
         
         scores = {intent: 0 for intent in self.INTENT_KEYWORDS.keys()}
         
@@ -317,19 +457,155 @@ class QueryExpander:
         return boosted
 
 
+def normalize_query(query: str) -> str:
+    """분석/메모 키용 쿼리 (공백 정규화, 성분명 대소문자는 매칭에 쓰이므로 유지)"""
+    return " ".join(query.split())
+
+
+def _freeze(value: Any) -> Any:
+    """지식 베이스 매칭 결과를 읽기 전용으로 변환 (dict → MappingProxyType, list → tuple)"""
+    
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class QueryAnalysis:
+    """
+    쿼리 분석 결과 (변경 불가, 해시 가능)
+    
+    같은 정규화 쿼리와 지식 베이스 버전이면 같은 객체를 공유하므로 호출 측에서 수정하지 않습니다.
+    fingerprint는 분석 내용(쿼리, 의도, 개체명, 확장 쿼리, 지식 베이스 버전)의 해시로,
+    분석 결과에 따라 달라지는 하위 캐시의 키로 사용할 수 있습니다.
+    """
+    
+    original_query: str
+    intent: str
+    expanded_query: str
+    symptoms: Tuple[str, ...] = ()
+    ingredients: Tuple[str, ...] = ()
+    body_parts: Tuple[str, ...] = ()
+    effects: Tuple[str, ...] = ()
+    kb_version: str = ""
+    knowledge_match: Optional[Mapping] = field(default=None, compare=False)
+    fingerprint: str = field(default="", compare=False)
+    
+    ENTITY_TYPES = ("symptoms", "ingredients", "body_parts", "effects")
+    
+    @classmethod
+    def create(
+        cls,
+        original_query: str,
+        intent: str,
+        expanded_query: str,
+        entities: Dict[str, List[str]],
+        kb_version: str,
+        knowledge_match: Optional[Dict] = None
+    ) -> "QueryAnalysis":
+        # 개체명은 이름순 고정 (추출 순서가 실행마다 달라지지 않도록)
+        frozen_entities = {name: tuple(sorted(entities.get(name, []))) for name in cls.ENTITY_TYPES}
+        
+        payload = json.dumps(
+            [original_query, intent, expanded_query, frozen_entities, kb_version],
+            ensure_ascii=False
+        )
+        
+        return cls(
+            original_query=original_query,
+            intent=intent,
+            expanded_query=expanded_query,
+            kb_version=kb_version,
+            knowledge_match=_freeze(knowledge_match),
+            fingerprint=hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16],
+            **frozen_entities
+        )
+    
+    @property
+    def entities(self) -> Dict[str, List[str]]:
+        """개체명 (유형별 목록, 매번 새 dict)"""
+        return {name: list(getattr(self, name)) for name in self.ENTITY_TYPES}
+    
+    def to_dict(self) -> Dict:
+        """응답용 dict"""
+        return {
+            "original_query": self.original_query,
+            "entities": self.entities,
+            "intent": self.intent,
+            "expanded_query": self.expanded_query,
+            "knowledge_match": _thaw(self.knowledge_match),
+            "fingerprint": self.fingerprint
+        }
+
+
 class QueryAnalyzer:
-    """통합 쿼리 분석기"""
+    """
+    통합 쿼리 분석기
     
-    def __init__(self):
+    분석 결과는 (정규화 쿼리, 지식 베이스 버전) 기준으로 QUERY_ANALYSIS_CACHE_SIZE개까지 메모이즈하여
+    반복 쿼리는 개체명 추출/의도 분류/쿼리 확장을 모두 건너뜁니다.
+    요청 시간 예산 부족으로 일부 단계를 생략한 결과는 저장하지 않습니다.
+    """
+    
+    def __init__(self, embedding_generator: Optional["EmbeddingGenerator"] = None):
+        """
+        Args:
+            embedding_generator: 임베딩 기반 의도 분류에 사용할 생성기 (검색 엔진과 공유,
+                                 없으면 키워드 규칙으로만 분류)
+        """
         self.kb = HealthKnowledgeBase()
         self.entity_extractor = EntityExtractor(self.kb)
-        self.intent_classifier = IntentClassifier()
+        self.intent_classifier = IntentClassifier(self.kb, embedding_generator)
         self.query_expander = QueryExpander()
         
-        logger.info("쿼리 분석기 초기화 완료")
+        self.kb_version = self._knowledge_base_version()
+        self.memo = LRUCache(maxsize=config.QUERY_ANALYSIS_CACHE_SIZE)
+        
+        logger.info(f"쿼리 분석기 초기화 완료 (kb_version={self.kb_version})")
+    
+    def _knowledge_base_version(self) -> str:
+        """
+        분석 결과에 영향을 주는 지식 베이스/사전/분류 방식의 해시
+        
+        scripts/update_knowledge_base.py로 지식 베이스를 갱신하거나 임베딩 의도 분류 사용 여부가 바뀌면 달라집니다.
+        """
+        payload = json.dumps(
+            [
+                self.kb.DEFAULT_RECOMMENDATIONS,
+                sorted(self.entity_extractor.symptom_keywords),
+                sorted(self.entity_extractor.ingredient_keywords),
+                self.entity_extractor.body_parts,
+                IntentClassifier.INTENT_KEYWORDS,
+                QueryExpander.SYNONYM_MAP,
+                QueryExpander.CONTEXT_KEYWORDS,
+                self.intent_classifier.centroids is not None
+            ],
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
     
-    def analyze(self, query: str) -> Dict:
-        """쿼리 종합 분석"""
+    def analyze(self, query: str, query_vector: Optional[np.ndarray] = None) -> QueryAnalysis:
+        """쿼리 종합 분석 (query_vector: 이미 계산한 쿼리 임베딩, 의도 분류에 재사용)"""
+        
+        query = normalize_query(query)
+        memo_key = (query, self.kb_version)
+        
+        cached = self.memo.get(memo_key)
+        if cached is not None:
+            logger.debug(f"쿼리 분석 메모 적중: '{query}'")
+            return cached
         
         logger.info(f"쿼리 분석 시작: '{query}'")
         
@@ -337,24 +613,41 @@ class QueryAnalyzer:
         entities = self.entity_extractor.extract(query)
         
         # 2. 의도 분류
-        intent = self.intent_classifier.classify(query, entities)
+        intent = self.intent_classifier.classify(query, entities, query_vector)
         
-        # 3. 쿼리 확장
-        expanded_query = self.query_expander.expand(query, entities)
+        # 3. 쿼리 확장 (요청 시간 예산을 이미 다 쓴 경우 원본 쿼리 사용)
+        if within_deadline("query_expansion"):
+            expanded_query = self.query_expander.expand(query, entities)
+        else:
+            expanded_query = query
         
         # 4. 지식 베이스 매칭
         knowledge_match = None
         if entities["symptoms"]:
             knowledge_match = self.kb.get_nutrients_for_symptom(query)
         
-        analysis_result = {
-            "original_query": query,
-            "entities": entities,
-            "intent": intent,
-            "expanded_query": expanded_query,
-            "knowledge_match": knowledge_match
-        }
+        analysis = QueryAnalysis.create(
+            original_query=query,
+            intent=intent,
+            expanded_query=expanded_query,
+            entities=entities,
+            kb_version=self.kb_version,
+            knowledge_match=knowledge_match
+        )
+        
+        # 예산이 남아 있으면 생략된 단계가 없으므로 저장 (의도 임베딩/확장은 예산 소진 시에만 생략)
+        deadline = current_deadline()
+        if deadline is None or not deadline.expired():
+            self.memo.set(memo_key, analysis)
         
         logger.info(f"쿼리 분석 완료: 의도={intent}, 개체명={len(sum(entities.values(), []))}개")
         
-        return analysis_result
+        return analysis
+    
+    def get_stats(self) -> Dict:
+        """메모 캐시 통계"""
+        return {
+            "kb_version": self.kb_version,
+            "embedding_intent": self.intent_classifier.centroids is not None,
+            **self.memo.stats()
+        }
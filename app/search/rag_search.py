@@ -1,40 +1,121 @@
 from typing import List, Dict, Optional
-from elasticsearch import Elasticsearch
-from app.core.elasticsearch_config import get_elasticsearch_client
+import copy
+import threading
+import time
 from app.core.config import settings
+from app.search.search_backend import get_search_backend
 from app.search.embeddings import EmbeddingGenerator
+from app.utils.cache import LRUCache
+from app.utils.deadline import current_deadline, deadline_timeout_ms
+from app.utils.metrics import stage
+from app.utils.single_flight import SingleFlight, coalesce
 from app.utils.logger import get_logger
 
 config = settings
 logger = get_logger(__name__)
 
+# 같은 인자의 동시 검색은 ES 요청 한 번으로 병합
+search_flight = SingleFlight("search")
+
 class RAGSearchEngine:
     """RAG 검색 엔진"""
     
-    def __init__(self):
-        self.es = get_elasticsearch_client()
+    # 목록 응답용 필드 (classification/metadata 전체 대신 화면/추천에 쓰는 필드만 전송)
+    COMPACT_FIELDS = [
+        "product_id",
+        "product_name",
+        "company_name",
+        "primary_function",
+        "raw_materials",
+        "classification.category",
+        "classification.intake_method",
+        "classification.intake_caution"
+    ]
+    
+    # 하이브리드 검색 키워드 매칭 필드 (가중치 포함)
+    HYBRID_KEYWORD_FIELDS = [
+        "product_name^2",
+        "primary_function^5",
+        "raw_materials^1.5",
+        "classification.function_content^2",
+        "embedding_text"
+    ]
+    
+    # 검색 응답에서 결과 구성에 필요한 부분만 남김 (took/_shards/_index 등 제외)
+    HIT_FILTER_PATH = [
+        "timed_out",
+        "hits.hits._score",
+        "hits.hits._source",
+        "hits.hits.inner_hits.*.hits.hits._score",
+        "hits.hits.inner_hits.*.hits.hits._source"
+    ]
+    
+    def __init__(self, backend=None, embedding_generator: Optional[EmbeddingGenerator] = None):
+        # 검색 백엔드 (기본: SEARCH_BACKEND 설정, elasticsearch 또는 memory)
+        self.backend = backend or get_search_backend()
         self.index_name = config.ES_INDEX_NAME
-        self.embedding_generator = EmbeddingGenerator()
+        # 임베딩 모델 (평가 스크립트 등에서 다른/양자화 모델 주입 가능)
+        self.embedding_generator = embedding_generator or EmbeddingGenerator()
+        
+        # 인기 제품 문서 캐시 (인덱스 버전이 바뀌면 전체 무효화)
+        self.product_cache = LRUCache(maxsize=config.PRODUCT_CACHE_SIZE)
+        self._product_cache_version: Optional[str] = None
+        self._product_cache_checked_at = 0.0
+        self._product_cache_lock = threading.Lock()
         
-        logger.info("RAG 검색 엔진 초기화 완료")
+        logger.info(f"RAG 검색 엔진 초기화 완료 (backend={self.backend.name})")
     
+    @coalesce(search_flight, deadline_fallback=list)
     def hybrid_search(
         self, 
         query: str, 
         top_k: int = None,
         vector_weight: float = None,
-        keyword_weight: float = None
+        keyword_weight: float = None,
+        diversify: bool = False,
+        max_per_group: int = None,
+        include_text: bool = False,
+        fields: Optional[List[str]] = None,
+        vector_mode: str = None,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict]:
-        """하이브리드 검색: 벡터 + 키워드"""
+        """
+        하이브리드 검색: 벡터 + 키워드
+
+        diversify=True이면 제조사 단위로 ES field collapsing을 적용하여
+        그룹당 최대 max_per_group개씩, top_k보다 넉넉한 후보를 한 번의 요청으로 가져옵니다.
+        (최종 top_k 절단은 re-ranking 이후 호출 측에서 수행)
+        include_text=True이면 2단계 Re-ranking용 embedding_text를 결과에 포함합니다.
+        fields가 주어지면 해당 필드만 _source로 가져옵니다. (예: COMPACT_FIELDS)
+        vector_mode: 'script_score'(전체 문서 코사인 계산) 또는 'knn'(HNSW 근사 검색),
+        기본값은 SEARCH_VECTOR_MODE 설정
+        query_vector: 미리 계산한 쿼리 임베딩 (배치 인코딩 등, 없으면 여기서 생성)
+        """
         
         top_k = top_k or config.DEFAULT_TOP_K
         vector_weight = vector_weight or config.VECTOR_WEIGHT
         keyword_weight = keyword_weight or config.KEYWORD_WEIGHT
+        vector_mode = vector_mode or config.SEARCH_VECTOR_MODE
         
-        logger.info(f"하이브리드 검색: '{query}' (top_k={top_k})")
+        logger.info(f"하이브리드 검색: '{query}' (top_k={top_k}, diversify={diversify}, vector_mode={vector_mode})")
         
         # 쿼리 임베딩 생성
-        query_vector = self.embedding_generator.generate_single(query).tolist()
+        if query_vector is None:
+            query_vector = self.embedding_generator.generate_single(query).tolist()
+        
+        if vector_mode == "knn":
+            search_query = self._knn_query(query, query_vector, top_k, vector_weight, keyword_weight)
+            search_query["_source"] = self._source_filter(fields, include_text)
+            
+            if diversify:
+                self._apply_collapse(search_query, top_k, max_per_group)
+                # 그룹핑 전 후보 수만큼 최근접 이웃 확보
+                search_query["knn"]["k"] = search_query["size"]
+                search_query["knn"]["num_candidates"] = max(
+                    search_query["knn"]["num_candidates"], search_query["size"]
+                )
+            
+            return self._run_hybrid(search_query, include_text)
         
         # 검색 쿼리 구성
         search_query = {
@@ -57,13 +138,7 @@ class RAGSearchEngine:
                         {
                             "multi_match": {
                                 "query": query,
-                                "fields": [
-                                    "product_name^2",
-                                    "primary_function^5",
-                                    "raw_materials^1.5",
-                                    "classification.function_content^2",
-                                    "embedding_text"
-                                ],
+                                "fields": self.HYBRID_KEYWORD_FIELDS,
                                 "type": "best_fields",
                                 "boost": keyword_weight
                             }
@@ -71,14 +146,52 @@ class RAGSearchEngine:
                     ]
                 }
             },
-            "_source": {
-                "excludes": ["embedding_vector"]
-            }
+            "_source": self._source_filter(fields, include_text)
         }
         
+        if diversify:
+            self._apply_collapse(search_query, top_k, max_per_group)
+        
+        return self._run_hybrid(search_query, include_text)
+    
+    def _knn_query(
+        self,
+        query: str,
+        query_vector: List[float],
+        top_k: int,
+        vector_weight: float,
+        keyword_weight: float
+    ) -> Dict:
+        """
+        최상위 knn + 키워드 쿼리 (dense_vector 인덱스의 HNSW 그래프 사용)
+
+        knn 점수는 (1 + cos) / 2 이므로 script_score(cos + 1.0)와 같은 비중이 되도록
+        boost를 2배로 맞춥니다.
+        """
+        
+        return {
+            "size": top_k,
+            "query": {
+                "multi_match": {
+                    "query": query,
+                    "fields": self.HYBRID_KEYWORD_FIELDS,
+                    "type": "best_fields",
+                    "boost": keyword_weight
+                }
+            },
+            "knn": {
+                "field": "embedding_vector",
+                "query_vector": query_vector,
+                "k": top_k,
+                "num_candidates": max(top_k * config.KNN_NUM_CANDIDATES_FACTOR, top_k),
+                "boost": vector_weight * 2
+            }
+        }
+    
+    def _run_hybrid(self, search_query: Dict, include_text: bool) -> List[Dict]:
         try:
-            response = self.es.search(index=self.index_name, body=search_query)
-            results = self._format_results(response)
+            response = self._search(search_query)
+            results = self._format_results(response, include_text=include_text)
             
             logger.info(f"검색 완료: {len(results)}개 결과")
             
@@ -88,8 +201,14 @@ class RAGSearchEngine:
             logger.error(f"검색 오류: {e}")
             return []
     
-    def search_by_symptom(self, symptom: str, top_k: int = None) -> List[Dict]:
-        """증상 기반 검색"""
+    @coalesce(search_flight, deadline_fallback=list)
+    def search_by_symptom(
+        self,
+        symptom: str,
+        top_k: int = None,
+        fields: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """증상 기반 검색 (fields: hybrid_search와 동일)"""
         
         top_k = top_k or config.DEFAULT_TOP_K
         
@@ -115,13 +234,11 @@ class RAGSearchEngine:
                     }
                 }
             },
-            "_source": {
-                "excludes": ["embedding_vector"]
-            }
+            "_source": self._source_filter(fields)
         }
         
         try:
-            response = self.es.search(index=self.index_name, body=search_query)
+            response = self._search(search_query)
             results = self._format_results(response)
             
             logger.info(f"증상 검색 완료: {len(results)}개 결과")
@@ -132,12 +249,21 @@ class RAGSearchEngine:
             logger.error(f"증상 검색 오류: {e}")
             return []
     
-    def search_by_ingredient(self, ingredient: str, top_k: int = None) -> List[Dict]:
-        """원재료 기반 검색"""
+    @coalesce(search_flight, deadline_fallback=list)
+    def search_by_ingredient(
+        self,
+        ingredient: str,
+        top_k: int = None,
+        diversify: bool = False,
+        max_per_group: int = None,
+        include_text: bool = False,
+        fields: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """원재료 기반 검색 (diversify/include_text/fields: hybrid_search와 동일)"""
         
         top_k = top_k or config.DEFAULT_TOP_K * 2
         
-        logger.info(f"원재료 검색: '{ingredient}' (top_k={top_k})")
+        logger.info(f"원재료 검색: '{ingredient}' (top_k={top_k}, diversify={diversify})")
         
         search_query = {
             "size": top_k,
@@ -165,14 +291,15 @@ class RAGSearchEngine:
                     "minimum_should_match": 1
                 }
             },
-            "_source": {
-                "excludes": ["embedding_vector"]
-            }
+            "_source": self._source_filter(fields, include_text)
         }
         
+        if diversify:
+            self._apply_collapse(search_query, top_k, max_per_group)
+        
         try:
-            response = self.es.search(index=self.index_name, body=search_query)
-            results = self._format_results(response)
+            response = self._search(search_query)
+            results = self._format_results(response, include_text=include_text)
             
             logger.info(f"원재료 검색 완료: {len(results)}개 결과")
             
@@ -237,7 +364,7 @@ class RAGSearchEngine:
             }
         
         try:
-            response = self.es.search(index=self.index_name, body=search_query)
+            response = self._search(search_query)
             results = self._format_results(response)
             
             logger.info(f"카테고리 검색 완료: {len(results)}개 결과")
@@ -252,25 +379,195 @@ class RAGSearchEngine:
         """제품 ID로 단일 문서 조회"""
         
         try:
-            response = self.es.get(index=self.index_name, id=product_id)
-            
-            if response['found']:
-                result = response['_source']
-                result.pop('embedding_vector', None)
-                return result
+            return self.get_products_by_ids([product_id]).get(product_id)
             
+        except Exception as e:
+            logger.error(f"제품 조회 오류 (ID: {product_id}): {e}")
             return None
+    
+    def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Dict]:
+        """
+        제품 ID 목록 일괄 조회
+        
+        인기 제품 캐시에 없는 ID만 _mget 한 번으로 가져오며,
+        embedding_vector는 서버 측에서 제외(_source_excludes)하여 전송량을 줄입니다.
+        캐시 문서는 중첩 필드(classification 등)까지 복사해 넘기므로 호출 측에서 수정해도 캐시에 영향이 없습니다.
+        
+        Returns:
+            {product_id: 제품 문서} (찾지 못한 ID는 포함하지 않음)
+        """
+        
+        self._check_product_cache_version()
+        
+        products = {}
+        missing = []
+        
+        for product_id in dict.fromkeys(product_ids):
+            cached = self.product_cache.get(product_id)
+            if cached is not None:
+                products[product_id] = copy.deepcopy(cached)
+            else:
+                missing.append(product_id)
+        
+        if missing:
+            with stage("es_mget"):
+                docs = self.backend.mget(
+                    index=self.index_name,
+                    ids=missing,
+                    source_excludes=['embedding_vector']
+                )
             
+            for doc in docs:
+                if not doc.get('found'):
+                    continue
+                
+                source = doc['_source']
+                self.product_cache.set(doc['_id'], copy.deepcopy(source))
+                products[doc['_id']] = source
+        
+        logger.info(
+            f"제품 일괄 조회: {len(products)}/{len(product_ids)}개 "
+            f"(캐시 적중 {len(product_ids) - len(missing)}, mget {len(missing)})"
+        )
+        
+        return products
+    
+    def get_index_version(self) -> Optional[str]:
+        """인덱스 버전 토큰 조회 (색인 변경 감지용, 실패 시 None)"""
+        
+        try:
+            return self.backend.index_version(self.index_name)
         except Exception as e:
-            logger.error(f"제품 조회 오류 (ID: {product_id}): {e}")
+            logger.warning(f"인덱스 버전 조회 실패: {e}")
             return None
     
-    def _format_results(self, response: Dict) -> List[Dict]:
+    def _check_product_cache_version(self):
+        """인덱스 버전 변경 시 인기 제품 캐시 무효화 (확인 주기: PRODUCT_CACHE_VERSION_CHECK_SECONDS)"""
+        
+        now = time.monotonic()
+        
+        with self._product_cache_lock:
+            if now - self._product_cache_checked_at < config.PRODUCT_CACHE_VERSION_CHECK_SECONDS:
+                return
+            self._product_cache_checked_at = now
+        
+        version = self.get_index_version()
+        
+        if version is None:
+            return
+        
+        with self._product_cache_lock:
+            if version != self._product_cache_version:
+                if self._product_cache_version is not None:
+                    logger.info(f"인덱스 버전 변경 감지 ({self._product_cache_version} → {version}), 제품 캐시 초기화")
+                self.product_cache.clear()
+                self._product_cache_version = version
+    
+    def get_product_cache_stats(self) -> Dict:
+        """인기 제품 캐시 통계"""
+        
+        stats = self.product_cache.stats()
+        stats['index_version'] = self._product_cache_version
+        return stats
+    
+    def _apply_collapse(
+        self,
+        search_query: Dict,
+        top_k: int,
+        max_per_group: int = None
+    ) -> Dict:
+        """
+        다양성 검색을 위한 field collapsing 설정
+
+        그룹(제조사) 수는 top_k * DIVERSITY_CANDIDATE_MULTIPLIER개까지 가져오고,
+        각 그룹은 inner_hits로 최대 max_per_group개 문서만 포함합니다.
+        """
+        
+        max_per_group = max_per_group or config.DIVERSITY_MAX_PER_GROUP
+        
+        search_query["size"] = top_k * max(config.DIVERSITY_CANDIDATE_MULTIPLIER, 1)
+        search_query["collapse"] = {
+            "field": config.DIVERSITY_FIELD,
+            "inner_hits": {
+                "name": "group_hits",
+                "size": max_per_group,
+                "_source": search_query.get("_source", {"excludes": ["embedding_vector"]})
+            }
+        }
+        
+        return search_query
+    
+    def _search(self, search_query: Dict) -> Dict:
+        """
+        검색 요청 실행 (결과 구성에 필요한 응답 부분만 수신, 단계 시간 기록)
+        
+        요청 시간 예산이 ES_SEARCH_TIMEOUT보다 적게 남았으면 남은 시간을 ES 검색 timeout
+        (샤드별 제한, 초과 시 부분 결과)과 클라이언트 대기 제한으로 넘깁니다.
+        부분 결과(timed_out)를 받으면 요청 예산에 es_timeout으로 기록합니다.
+        """
+        
+        params = {"filter_path": self.HIT_FILTER_PATH}
+        
+        timeout_ms = deadline_timeout_ms(
+            cap_ms=config.ES_SEARCH_TIMEOUT * 1000,
+            floor_ms=config.DEADLINE_ES_MIN_TIMEOUT_MS
+        )
+        if timeout_ms is not None:
+            params["timeout"] = f"{int(timeout_ms)}ms"
+            params["request_timeout"] = (timeout_ms + config.DEADLINE_ES_NETWORK_MARGIN_MS) / 1000
+        
+        with stage("es"):
+            response = self.backend.search(
+                index=self.index_name,
+                body=search_query,
+                **params
+            )
+        
+        deadline = current_deadline()
+        if deadline is not None and response.get("timed_out"):
+            deadline.degrade("es_timeout")
+        
+        return response
+    
+    def _source_filter(self, fields: Optional[List[str]] = None, include_text: bool = False) -> Dict:
+        """_source 필터 (fields 지정 시 includes 방식 projection)"""
+        
+        if not fields:
+            return {"excludes": ["embedding_vector"]}
+        
+        includes = list(fields)
+        if include_text and "embedding_text" not in includes:
+            includes.append("embedding_text")
+        
+        return {"includes": includes}
+    
+    def _iter_hits(self, response: Dict):
+        """검색 응답의 hit 순회 (collapse 응답이면 그룹별 inner_hits를 점수순으로 펼침)"""
+        
+        # filter_path 적용 시 결과가 없으면 hits 키 자체가 생략됨
+        hits = response.get('hits', {}).get('hits', [])
+        
+        if not any('inner_hits' in hit for hit in hits):
+            return hits
+        
+        flattened = []
+        for hit in hits:
+            group_hits = hit.get('inner_hits', {}).get('group_hits')
+            if group_hits:
+                flattened.extend(group_hits.get('hits', {}).get('hits', []))
+            else:
+                flattened.append(hit)
+        
+        flattened.sort(key=lambda h: h.get('_score') or 0, reverse=True)
+        
+        return flattened
+    
+    def _format_results(self, response: Dict, include_text: bool = False) -> List[Dict]:
         """검색 결과 포맷팅"""
         
         results = []
         
-        for hit in response['hits']['hits']:
+        for hit in self._iter_hits(response):
             source = hit['_source']
             result = {
                 'score': hit['_score'],
@@ -282,6 +579,8 @@ class RAGSearchEngine:
                 'classification': source.get('classification', {}),
                 'metadata': source.get('metadata', {})
             }
+            if include_text:
+                result['embedding_text'] = source.get('embedding_text')
             results.append(result)
         
         return results
\ No newline at end of file
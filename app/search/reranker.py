@@ -3,8 +3,10 @@ Re-ranking 시스템
 
 검색 결과를 재정렬하여 품질을 향상시킵니다.
 """
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
+from app.core.config import settings
+from app.utils.deadline import within_deadline
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -151,17 +153,27 @@ class ResultReRanker:
         self,
         results: List[Dict],
         diversity_field: str = 'company_name',
-        max_per_group: int = 2
+        max_per_group: int = 2,
+        top_k: Optional[int] = None
     ) -> List[Dict]:
         """
         다양성을 고려한 재정렬
         
         같은 제조사 제품이 너무 많이 나오지 않도록 조정
+        
+        RAGSearchEngine의 diversify 검색(ES field collapsing)으로 받은 후보는
+        이미 그룹당 max_per_group개로 제한되어 있으므로, 여기서는 재정렬 후
+        top_k로 자르는 역할만 합니다. (일반 검색 결과가 들어오면 기존처럼 그룹 제한 적용)
+        요청 시간 예산이 부족하면 그룹 제한 없이 기본 re-ranking 결과만 반환합니다.
         """
         
         if not results:
             return results
         
+        if not within_deadline("diversity_rerank", settings.DEADLINE_DIVERSITY_MIN_MS):
+            reranked = self.rerank(results)
+            return reranked[:top_k] if top_k else reranked
+        
         logger.info(f"다양성 Re-ranking 시작: 필드={diversity_field}")
         
         # 먼저 기본 re-ranking
@@ -169,6 +181,7 @@ class ResultReRanker:
         
         # 다양성 적용
         diverse_results = []
+        overflow_results = []
         group_counts = {}
         
         for result in reranked:
@@ -177,11 +190,14 @@ class ResultReRanker:
             if group_counts.get(group_key, 0) < max_per_group:
                 diverse_results.append(result)
                 group_counts[group_key] = group_counts.get(group_key, 0) + 1
+            else:
+                overflow_results.append(result)
         
         # 남은 결과 추가 (다양성 제한 초과한 것들)
-        for result in reranked:
-            if result not in diverse_results:
-                diverse_results.append(result)
+        diverse_results.extend(overflow_results)
+        
+        if top_k:
+            diverse_results = diverse_results[:top_k]
         
         logger.info(f"다양성 Re-ranking 완료: {len(diverse_results)}개 결과")
         
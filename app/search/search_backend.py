@@ -0,0 +1,103 @@
+"""
+검색 백엔드 (Search Backend)
+
+RAGSearchEngine이 사용하는 저장소 추상화입니다.
+백엔드는 Elasticsearch Query DSL 형태의 요청을 받아 Elasticsearch 응답과
+같은 형태(hits.hits[]._source/_score)로 결과를 돌려주므로,
+RAGSearchEngine의 쿼리 구성과 _format_results는 백엔드와 무관하게 동작합니다.
+
+- elasticsearch: 운영용 (기본값)
+- memory: 외부 서비스 없이 동작하는 인프로세스 백엔드 (app/search/memory_backend.py)
+"""
+from typing import Dict, List
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+config = settings
+logger = get_logger(__name__)
+
+
+class SearchBackend:
+    """검색 백엔드 인터페이스"""
+
+    name = "base"
+
+    def search(self, index: str, body: Dict, **params) -> Dict:
+        """
+        Query DSL 검색 (Elasticsearch search 응답 형태 반환)
+
+        params의 request_timeout(초)은 이 요청만의 클라이언트 대기 제한입니다.
+        """
+        raise NotImplementedError
+
+    def get(self, index: str, id: str, **params) -> Dict:
+        """단일 문서 조회 ({'found': bool, '_id': ..., '_source': {...}} 반환)"""
+        raise NotImplementedError
+
+    def mget(self, index: str, ids: List[str], source_excludes: List[str] = None) -> List[Dict]:
+        """여러 문서 일괄 조회 (요청 순서대로 get 응답 형태의 리스트 반환)"""
+        raise NotImplementedError
+
+    def ping(self) -> bool:
+        """백엔드 사용 가능 여부"""
+        raise NotImplementedError
+
+    def index_version(self, index: str) -> str:
+        """인덱스 버전 토큰 (문서 추가/수정/삭제 시 값이 바뀜)"""
+        raise NotImplementedError
+
+
+class ElasticsearchBackend(SearchBackend):
+    """Elasticsearch 클러스터 백엔드"""
+
+    name = "elasticsearch"
+
+    def __init__(self):
+        from app.core.elasticsearch_config import get_elasticsearch_client
+        # 공용 커넥션 풀을 쓰되, 검색/조회와 관리 요청은 타임아웃을 분리
+        self.es = get_elasticsearch_client("search")
+        self.admin_es = get_elasticsearch_client("admin")
+
+    def search(self, index: str, body: Dict, **params) -> Dict:
+        request_timeout = params.pop("request_timeout", None)
+        if request_timeout:
+            # 요청 시간 예산에서 나온 제한 시간이므로 재시도 없이 한 번만 시도 (재시도 시 예산의 몇 배까지 지연)
+            es = self.es.options(request_timeout=request_timeout, max_retries=0, retry_on_timeout=False)
+        else:
+            es = self.es
+        return es.search(index=index, body=body, **params)
+
+    def get(self, index: str, id: str, **params) -> Dict:
+        return self.es.get(index=index, id=id, **params)
+
+    def mget(self, index: str, ids: List[str], source_excludes: List[str] = None) -> List[Dict]:
+        response = self.es.mget(index=index, ids=ids, source_excludes=source_excludes)
+        return response["docs"]
+
+    def ping(self) -> bool:
+        return self.admin_es.ping()
+
+    def index_version(self, index: str) -> str:
+        stats = self.admin_es.indices.stats(index=index, metric="docs,indexing")
+        primaries = stats["_all"]["primaries"]
+        return "-".join(str(value) for value in (
+            primaries["docs"]["count"],
+            primaries["docs"].get("deleted", 0),
+            primaries["indexing"]["index_total"],
+            primaries["indexing"]["delete_total"]
+        ))
+
+
+def get_search_backend(backend_name: str = None) -> SearchBackend:
+    """설정(SEARCH_BACKEND)에 따른 검색 백엔드 생성"""
+
+    backend_name = (backend_name or config.SEARCH_BACKEND).lower()
+
+    if backend_name == "memory":
+        from app.search.memory_backend import InMemorySearchBackend
+        return InMemorySearchBackend.load(config.MEMORY_INDEX_DIR)
+
+    if backend_name == "elasticsearch":
+        return ElasticsearchBackend()
+
+    raise ValueError(f"지원하지 않는 검색 백엔드입니다: {backend_name}")
@@ -0,0 +1,243 @@
+"""
+시맨틱 쿼리 캐시 (Semantic Query Cache)
+
+"눈이 피로해요", "눈 피로", "눈이 너무 피곤해요"처럼 표현만 다른 쿼리가
+이전에 답한 쿼리와 코사인 유사도 임계값 이상이면 저장된 지능형 검색 응답을 재사용합니다.
+
+최근 쿼리 벡터는 용량이 고정된 float32 행렬에 보관하고, 조회는 행렬-벡터 곱 한 번으로
+전체 항목을 비교합니다. (수천 건 규모에서는 근사 색인보다 빠르고 정확함)
+용량이 차면 만료 항목, 그다음 가장 오래 사용되지 않은 항목부터 교체합니다.
+"""
+from typing import Dict, Hashable, Optional, Set
+import random
+import threading
+import time
+import numpy as np
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+config = settings
+logger = get_logger(__name__)
+
+
+class SemanticQueryCache:
+    """쿼리 임베딩 기반 근접 중복 쿼리 캐시"""
+
+    def __init__(
+        self,
+        capacity: int = None,
+        threshold: float = None,
+        ttl: float = None,
+        audit_rate: float = None
+    ):
+        self.capacity = capacity or config.SEMANTIC_CACHE_CAPACITY
+        self.threshold = threshold if threshold is not None else config.SEMANTIC_CACHE_THRESHOLD
+        self.ttl = ttl if ttl is not None else config.SEMANTIC_CACHE_TTL_SECONDS
+        self.audit_rate = audit_rate if audit_rate is not None else config.SEMANTIC_CACHE_AUDIT_RATE
+
+        # 벡터 행렬은 첫 저장 시 임베딩 차원에 맞춰 할당
+        self.vectors: Optional[np.ndarray] = None
+        self.valid = np.zeros(self.capacity, dtype=bool)
+        self.expires_at = np.zeros(self.capacity, dtype=np.float64)
+        self.last_used = np.zeros(self.capacity, dtype=np.float64)
+        self.partitions = [None] * self.capacity
+        self.entries = [None] * self.capacity
+
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.audits = 0
+        self.false_hits = 0
+
+        logger.info(
+            f"시맨틱 캐시 초기화 완료: capacity={self.capacity}, threshold={self.threshold}"
+        )
+
+    def lookup(self, vector: np.ndarray, partition: Hashable) -> Optional[Dict]:
+        """
+        유사 쿼리 응답 조회
+
+        Args:
+            vector: 쿼리 임베딩
+            partition: 응답에 영향을 주는 요청 옵션 (같은 옵션끼리만 재사용)
+
+        Returns:
+            {'query', 'response', 'similarity'} 또는 None
+        """
+
+        query_vector = self._normalize(vector)
+
+        with self._lock:
+            if self.vectors is None or not self.valid.any():
+                self.misses += 1
+                return None
+
+            now = time.monotonic()
+            live = self.valid & (self.expires_at > now)
+            candidates = np.flatnonzero(live)
+
+            if len(candidates):
+                partition_mask = np.fromiter(
+                    (self.partitions[idx] == partition for idx in candidates),
+                    dtype=bool,
+                    count=len(candidates)
+                )
+                candidates = candidates[partition_mask]
+
+            if not len(candidates):
+                self.misses += 1
+                return None
+
+            similarities = self.vectors[candidates] @ query_vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+
+            slot = int(candidates[best])
+            self.last_used[slot] = now
+            self.hits += 1
+
+            query, response = self.entries[slot]
+
+        logger.info(f"시맨틱 캐시 적중: '{query}' (유사도 {similarity:.3f})")
+
+        return {
+            "query": query,
+            "response": response,
+            "similarity": similarity
+        }
+
+    def store(
+        self,
+        query: str,
+        vector: np.ndarray,
+        partition: Hashable,
+        response: Dict
+    ):
+        """응답 저장 (용량 초과 시 만료/LRU 항목 교체)"""
+
+        query_vector = self._normalize(vector)
+
+        with self._lock:
+            if self.vectors is None:
+                self.vectors = np.zeros((self.capacity, len(query_vector)), dtype=np.float32)
+
+            slot = self._free_slot()
+
+            self.vectors[slot] = query_vector
+            self.valid[slot] = True
+            self.expires_at[slot] = time.monotonic() + self.ttl
+            self.last_used[slot] = time.monotonic()
+            self.partitions[slot] = partition
+            self.entries[slot] = (query, response)
+
+    def should_audit(self) -> bool:
+        """적중 응답을 실제 검색과 비교할지 여부 (표본 추출)"""
+        return self.audit_rate > 0 and random.random() < self.audit_rate
+
+    def record_audit(
+        self,
+        query: str,
+        cached_query: str,
+        cached_response: Dict,
+        fresh_response: Dict
+    ) -> bool:
+        """
+        적중 감사 결과 기록
+
+        Returns:
+            오적중(false hit) 여부
+        """
+
+        cached_keys = self._result_keys(cached_response)
+        fresh_keys = self._result_keys(fresh_response)
+
+        union = cached_keys | fresh_keys
+        overlap = len(cached_keys & fresh_keys) / len(union) if union else 1.0
+        is_false_hit = overlap < config.SEMANTIC_CACHE_AUDIT_MIN_OVERLAP
+
+        with self._lock:
+            self.audits += 1
+            if is_false_hit:
+                self.false_hits += 1
+
+        if is_false_hit:
+            logger.warning(
+                f"시맨틱 캐시 오적중: '{query}' → '{cached_query}' (결과 중복률 {overlap:.2f})"
+            )
+
+        return is_false_hit
+
+    def clear(self):
+        """전체 항목 제거"""
+        with self._lock:
+            self.valid[:] = False
+            self.entries = [None] * self.capacity
+            self.partitions = [None] * self.capacity
+
+    def get_stats(self) -> Dict:
+        """캐시 통계"""
+
+        total = self.hits + self.misses
+
+        return {
+            "size": int(self.valid.sum()),
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "audit_rate": self.audit_rate,
+            "audits": self.audits,
+            "false_hits": self.false_hits,
+            "false_hit_rate": round(self.false_hits / self.audits, 4) if self.audits else 0.0
+        }
+
+    def _free_slot(self) -> int:
+        """저장할 슬롯 선택 (빈 슬롯 → 만료 슬롯 → LRU 슬롯)"""
+
+        empty = np.flatnonzero(~self.valid)
+        if len(empty):
+            return int(empty[0])
+
+        expired = np.flatnonzero(self.expires_at <= time.monotonic())
+        if len(expired):
+            return int(expired[0])
+
+        self.evictions += 1
+        return int(np.argmin(self.last_used))
+
+    def _normalize(self, vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _result_keys(self, response: Dict) -> Set[str]:
+        """응답 결과의 제품 식별자 집합 (감사용)"""
+
+        results = response.get('results')
+
+        if isinstance(results, dict):
+            items = (
+                results.get('recommendations')
+                or results.get('products')
+                or results.get('results')
+                or []
+            )
+            if not items and results.get('ingredient'):
+                return {f"timing:{results['ingredient']}"}
+        else:
+            items = results or []
+
+        return {
+            str(item.get('product_id') or item.get('product_name'))
+            for item in items
+            if isinstance(item, dict)
+        }
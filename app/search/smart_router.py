@@ -3,44 +3,81 @@
 
 분석된 쿼리를 적절한 검색 API로 라우팅합니다.
 """
-from typing import Dict, Tuple, Optional
-from app.search.rag_search import RAGSearchEngine
-from app.services.rag.recommendation_service import RecommendationService
+from typing import Dict, List, Tuple, Optional, TYPE_CHECKING
+from app.core.config import settings
 from app.services.rag.timing_service import TimingService
+from app.utils.deadline import within_deadline
 from app.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from app.search.query_analyzer import QueryAnalysis
+    from app.search.rag_search import RAGSearchEngine
+    from app.services.rag.recommendation_service import RecommendationService
+
 logger = get_logger(__name__)
 
 
 class SmartRouter:
     """지능형 쿼리 라우터"""
     
-    def __init__(self):
-        self.search_engine = RAGSearchEngine()
-        self.recommendation_service = RecommendationService()
-        self.timing_service = TimingService()
+    def __init__(
+        self,
+        search_engine: Optional["RAGSearchEngine"] = None,
+        recommendation_service: Optional["RecommendationService"] = None,
+        timing_service: Optional[TimingService] = None
+    ):
+        # 주입된 컴포넌트를 공유하면 임베딩 모델/클라이언트를 한 번만 로드
+        # (주입되지 않은 경우에만 무거운 검색 모듈을 import)
+        if search_engine is None:
+            from app.search.rag_search import RAGSearchEngine
+            search_engine = RAGSearchEngine()
+        if recommendation_service is None:
+            from app.services.rag.recommendation_service import RecommendationService
+            recommendation_service = RecommendationService(search_engine)
+        
+        self.search_engine = search_engine
+        self.recommendation_service = recommendation_service
+        self.timing_service = timing_service or TimingService()
         
         logger.info("스마트 라우터 초기화 완료")
     
     def route(
         self, 
-        analysis: Dict, 
-        top_k: int = 5
+        analysis: "QueryAnalysis", 
+        top_k: int = 5,
+        diversify: bool = False,
+        candidate_k: Optional[int] = None,
+        fields: Optional[List[str]] = None
     ) -> Tuple[str, Dict, any]:
         """
         쿼리 분석 결과를 기반으로 적절한 API로 라우팅
         
+        diversify=True이면 리스트를 반환하는 검색 API(성분/하이브리드)에
+        제조사 collapse 다양성 검색을 적용합니다.
+        candidate_k가 주어지면 리스트 검색 API는 2단계 Re-ranking용으로
+        candidate_k개 후보를 embedding_text와 함께 가져옵니다.
+        fields가 주어지면 검색 API는 해당 _source 필드만 가져옵니다.
+        요청 시간 예산이 DEADLINE_DIVERSITY_MIN_MS 이하로 남으면 다양성 검색 대신 일반 검색을 사용합니다.
+        
         Returns:
             (api_name, routing_info, results)
         """
         
-        query = analysis["original_query"]
-        intent = analysis["intent"]
-        entities = analysis["entities"]
-        expanded_query = analysis["expanded_query"]
+        query = analysis.original_query
+        intent = analysis.intent
+        entities = analysis.entities
+        expanded_query = analysis.expanded_query
         
         logger.info(f"라우팅 시작: 의도={intent}")
         
+        # collapse 검색은 후보를 넉넉히 가져오므로 시간이 부족하면 생략
+        if diversify and not within_deadline("diversity_search", settings.DEADLINE_DIVERSITY_MIN_MS):
+            diversify = False
+        
+        # 리스트 검색 API의 후보 개수
+        list_top_k = candidate_k or top_k
+        include_text = candidate_k is not None
+        
         # 1. 복용 시간 질문
         if intent == "TIMING_QUERY" and entities["ingredients"]:
             ingredient = entities["ingredients"][0]
@@ -64,7 +101,10 @@ class SmartRouter:
             
             results = self.search_engine.search_by_ingredient(
                 ingredient=ingredient,
-                top_k=top_k
+                top_k=list_top_k,
+                diversify=diversify,
+                include_text=include_text,
+                fields=fields
             )
             
             return (
@@ -83,7 +123,8 @@ class SmartRouter:
             
             result = self.recommendation_service.recommend_by_symptom(
                 symptom=symptom,
-                top_k=top_k
+                top_k=top_k,
+                fields=fields
             )
             
             return (
@@ -100,7 +141,10 @@ class SmartRouter:
         
         results = self.search_engine.hybrid_search(
             query=expanded_query,
-            top_k=top_k
+            top_k=list_top_k,
+            diversify=diversify,
+            include_text=include_text,
+            fields=fields
         )
         
         return (
@@ -116,7 +160,7 @@ class SmartRouter:
     
     def route_and_execute(
         self,
-        analysis: Dict,
+        analysis: "QueryAnalysis",
         top_k: int = 5
     ) -> Dict:
         """라우팅 및 실행 (통합 응답 형식)"""
@@ -1,14 +1,23 @@
 """
-Google Gemini LLM 서비스 (google-genai SDK 사용)
+Google Gemini LLM 서비스
 
 RAG 검색 결과와 SERP 결과를 Gemini로 융합하여 최종 추천을 생성합니다.
+LLM 호출은 LLM_PROVIDER 설정의 제공자(gemini: google-genai SDK, mock: 로컬 모의 응답)가 담당합니다.
 """
-from typing import List, Dict, Optional, Any
+from typing import AsyncIterator, Iterator, List, Dict, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import contextvars
 import re
 import os
-from google.genai import Client
+import time
 from app.core.config import settings
+from app.services.rag.llm_cache import LLMResponseCache, make_cache_key
+from app.services.rag.llm_provider import get_llm_provider
+from app.services.rag.prompt_builder import PromptBuilder
+from app.utils.bulkhead import UpstreamUnavailable, get_bulkhead
+from app.utils.metrics import record_stage
+from app.utils.single_flight import SingleFlight
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -17,20 +26,33 @@ logger = get_logger(__name__)
 class GeminiService:
     """Google Gemini LLM 서비스 (새로운 google-genai SDK)"""
     
+    DEFAULT_OUTPUT_OPTIONS = {
+        'include_product_name': True,
+        'include_ingredients': True,
+        'include_timing': True,
+        'include_precautions': True
+    }
+    
     def __init__(self):
-        self.api_key = settings.GEMINI_API_KEY
-        self.model_name = settings.GEMINI_MODEL
+        # LLM 제공자 (gemini는 API 키가 없으면 None)
+        self.provider = get_llm_provider()
+        self.model_name = self.provider.model_name if self.provider else settings.GEMINI_MODEL
         self.temperature = settings.GEMINI_TEMPERATURE
         self.max_output_tokens = settings.GEMINI_MAX_OUTPUT_TOKENS
         
-        # Gemini 클라이언트 초기화
-        if self.api_key:
-            # API 키로 클라이언트 초기화
-            self.client = Client(api_key=self.api_key)
-            logger.info(f"Gemini 클라이언트 초기화 완료: {self.model_name}")
-        else:
-            self.client = None
-            logger.warning("Gemini API 키가 설정되지 않았습니다.")
+        # 토큰 예산 기반 프롬프트 구성
+        self.prompt_builder = PromptBuilder()
+        
+        # 같은 프롬프트/모델 파라미터의 응답 재사용
+        self.response_cache = LLMResponseCache() if settings.GEMINI_CACHE_ENABLED else None
+        self.flight = SingleFlight("gemini")
+        
+        # 격벽: 동시 호출 한도/대기열/서킷 (전용 스레드 풀은 최대 한도 크기)
+        self.bulkhead = get_bulkhead("gemini")
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.GEMINI_CONCURRENCY_MAX,
+            thread_name_prefix="gemini"
+        )
     
     async def generate_recommendation(
         self,
@@ -40,7 +62,8 @@ class GeminiService:
         rag_weight: float = 0.5,
         max_length: int = 200,
         custom_prompt: Optional[str] = None,
-        output_options: Optional[Dict] = None
+        output_options: Optional[Dict] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         RAG + SERP 결과를 Gemini로 융합하여 추천 생성
@@ -53,11 +76,13 @@ class GeminiService:
             max_length: 최대 출력 길이
             custom_prompt: 사용자 정의 프롬프트
             output_options: 출력 옵션
+            use_cache: 응답 캐시 사용 여부 (False면 조회하지 않고 새 응답으로 갱신)
         
         Returns:
-            추천 결과 딕셔너리
+            추천 결과 딕셔너리 (cache: 캐시 상태 - status hit/miss/bypass/fallback, prompt: 프롬프트 토큰 통계)
+            격벽/서킷이 호출을 거절하면 RAG 결과만으로 만든 추천(fallback 포함)을 반환
         """
-        if not self.client:
+        if not self.provider:
             raise ValueError("Gemini API 키가 설정되지 않았습니다.")
         
         try:
@@ -65,15 +90,10 @@ class GeminiService:
             
             # 출력 옵션 기본값
             if output_options is None:
-                output_options = {
-                    'include_product_name': True,
-                    'include_ingredients': True,
-                    'include_timing': True,
-                    'include_precautions': True
-                }
+                output_options = self.DEFAULT_OUTPUT_OPTIONS
             
-            # 프롬프트 구성
-            prompt = self._build_prompt(
+            # 프롬프트 구성 (토큰 예산 안에서 컨텍스트 선택)
+            prompt, prompt_stats = self.prompt_builder.build(
                 query=query,
                 rag_results=rag_results,
                 serp_results=serp_results,
@@ -83,202 +103,227 @@ class GeminiService:
                 output_options=output_options
             )
             
-            # Gemini API 호출
-            response_text = await self._call_gemini(prompt)
+            cache_key = make_cache_key(prompt, self.model_name, self.temperature, self.max_output_tokens)
             
-            # 응답 파싱
-            recommendation = self._parse_response(response_text)
+            if self.response_cache is not None and use_cache:
+                cached = await self.response_cache.aget(cache_key)
+                if cached is not None:
+                    recommendation, cache_status = cached
+                    recommendation['cache'] = cache_status
+                    recommendation['prompt'] = prompt_stats
+                    logger.info(f"Gemini 추천 캐시 적중: '{query}' ({cache_status['tier']})")
+                    return recommendation
             
-            logger.info(f"Gemini 추천 생성 완료: {len(response_text)}자")
+            if use_cache:
+                # 같은 프롬프트의 동시 요청은 생성 한 번을 함께 기다림
+                recommendation = await self.flight.do(cache_key, lambda: self._generate(prompt, cache_key))
+                cache_status = 'miss'
+            else:
+                recommendation = await self._generate(prompt, cache_key)
+                cache_status = 'bypass'
+            
+            if self.response_cache is None:
+                recommendation['cache'] = {'status': 'disabled'}
+            else:
+                recommendation['cache'] = {'status': cache_status, 'key': cache_key[:16]}
+            recommendation['prompt'] = prompt_stats
+            
+            logger.info(f"Gemini 추천 생성 완료: {len(recommendation['text'])}자")
             
             return recommendation
             
+        except UpstreamUnavailable as e:
+            logger.warning(f"Gemini 호출 불가, RAG 결과로 대체: {e}")
+            recommendation = self.rag_only_recommendation(query, rag_results, e.reason)
+            recommendation['cache'] = {'status': 'fallback'}
+            recommendation['prompt'] = prompt_stats
+            return recommendation
         except Exception as e:
             logger.error(f"Gemini 추천 생성 오류: {e}", exc_info=True)
             raise
     
-    def _build_prompt(
+    async def _generate(self, prompt: str, cache_key: str) -> Dict[str, Any]:
+        """Gemini 호출 → 응답 파싱 → 캐시 저장"""
+        
+        response_text = await self._call_gemini(prompt)
+        recommendation = self._parse_response(response_text)
+        
+        if self.response_cache is not None:
+            await self.response_cache.aset(cache_key, recommendation)
+        
+        return recommendation
+    
+    async def stream_recommendation(
         self,
         query: str,
         rag_results: List[Dict],
         serp_results: List[Dict],
-        rag_weight: float,
-        max_length: int,
-        custom_prompt: Optional[str],
-        output_options: Dict
-    ) -> str:
-        """프롬프트 구성"""
+        rag_weight: float = 0.5,
+        max_length: int = 200,
+        custom_prompt: Optional[str] = None,
+        output_options: Optional[Dict] = None,
+        use_cache: bool = True
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        generate_recommendation의 스트리밍 버전
         
-        gemini_weight = 1 - rag_weight
+        생성되는 대로 (이벤트, 데이터)를 순서대로 반환합니다.
+            ("token",   {"text"})          : 생성된 텍스트 조각
+            ("section", {"name", "value"}) : 완성된 구조화 항목 (종류/제품명/원재료/복용 시기/주의사항)
+            ("done",    {"recommendation", "cache", "prompt"}) : 전체 응답 파싱 결과와 프롬프트 토큰 통계
+        캐시 적중 시에는 저장된 전체 텍스트를, 격벽/서킷 거절 시에는 RAG 결과만으로 만든 추천을
+        한 번에 보냅니다.
+        """
+        if not self.provider:
+            raise ValueError("Gemini API 키가 설정되지 않았습니다.")
         
-        # RAG 결과 포맷팅
-        rag_text = self._format_rag_results(rag_results)
+        prompt, prompt_stats = self.prompt_builder.build(
+            query=query,
+            rag_results=rag_results,
+            serp_results=serp_results,
+            rag_weight=rag_weight,
+            max_length=max_length,
+            custom_prompt=custom_prompt,
+            output_options=output_options or self.DEFAULT_OUTPUT_OPTIONS
+        )
         
-        # SERP 결과 포맷팅
-        serp_text = self._format_serp_results(serp_results)
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = make_cache_key(prompt, self.model_name, self.temperature, self.max_output_tokens)
+            if use_cache:
+                cached = await self.response_cache.aget(cache_key)
+                if cached is not None:
+                    recommendation, cache_status = cached
+                    logger.info(f"Gemini 스트리밍 캐시 적중: '{query}' ({cache_status['tier']})")
+                    
+                    for event, data in self._replay_events(recommendation, cache_status):
+                        yield self._with_prompt_stats(event, data, prompt_stats)
+                    return
         
-        # 출력 요구사항 포맷팅
-        output_requirements = self._format_output_options(output_options)
+        try:
+            async with self.bulkhead.slot():
+                async for event, data in self._stream_generate(query, prompt, cache_key, use_cache):
+                    yield self._with_prompt_stats(event, data, prompt_stats)
+        except UpstreamUnavailable as e:
+            logger.warning(f"Gemini 스트리밍 호출 불가, RAG 결과로 대체: {e}")
+            recommendation = self.rag_only_recommendation(query, rag_results, e.reason)
+            for event, data in self._replay_events(recommendation, {'status': 'fallback'}):
+                yield self._with_prompt_stats(event, data, prompt_stats)
+    
+    async def _stream_generate(
+        self,
+        query: str,
+        prompt: str,
+        cache_key: Optional[str],
+        use_cache: bool
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Gemini 스트리밍 API 호출 → token/section/done 이벤트"""
         
-        # 커스텀 프롬프트 또는 기본 프롬프트
-        if custom_prompt and custom_prompt != "string":
-            system_prompt = custom_prompt
-        else:
-            system_prompt = f"""
-당신은 건강기능식품 전문가입니다.
-사용자의 증상에 맞는 영양제와 약을 추천해주세요.
-
-**참조 데이터 비중**: {rag_weight * 100:.0f}%
-- RAG 검색 결과 (내부 DB의 실제 제품 정보)
-- SERP 검색 결과 (웹 검색 정보)
-
-**Gemini 지식 비중**: {gemini_weight * 100:.0f}%
-- 의학적 지식
-- 영양학 지식
-- 최신 연구 결과
-
-**출력 형식**:
-{output_requirements}
-
-**제약 조건**:
-- 최대 {max_length}글자 이내로 작성
-- 명확하고 간결하게
-- 의학적 근거 기반
-- 구체적인 제품명 포함
-"""
+        logger.info(f"Gemini 스트리밍 생성 시작: '{query}'")
         
-        user_prompt = f"""
-**사용자 증상**: {query}
-
-**RAG 검색 결과** (내부 DB, 참조 비중 {rag_weight * 100:.0f}%):
-{rag_text}
-
-**SERP 검색 결과** (웹 검색, 참조 비중 {rag_weight * 100:.0f}%):
-{serp_text}
-
-위 정보를 {rag_weight * 100:.0f}% 참조하고, 당신의 의학 지식을 {gemini_weight * 100:.0f}% 활용하여 
-최적의 영양제/약을 추천해주세요.
-
-**중요**: 반드시 {max_length}글자 이내로 작성하세요.
-"""
+        parser = StreamingSectionParser(self)
+        chunks = []
+        usage = {}
+        started = time.perf_counter()
         
-        return system_prompt + "\n\n" + user_prompt
-    
-    def _format_rag_results(self, results: List[Dict]) -> str:
-        """RAG 결과 포맷팅"""
-        if not results:
-            return "검색 결과 없음"
-        
-        formatted = []
-        for idx, result in enumerate(results[:5], 1):
-            product_name = result.get('product_name', 'N/A')
-            company = result.get('company_name', 'N/A')
-            materials = result.get('raw_materials', 'N/A')
-            function = result.get('primary_function', 'N/A')
-            
-            # 길이 제한
-            if len(materials) > 100:
-                materials = materials[:100] + "..."
-            if len(function) > 100:
-                function = function[:100] + "..."
+        async for chunk in self.provider.stream(prompt, self.temperature, self.max_output_tokens):
+            if chunk.get('prompt_tokens'):
+                usage = chunk
+            text = chunk['text']
+            if not text:
+                continue
             
-            formatted.append(f"""
-{idx}. {product_name}
-   - 제조사: {company}
-   - 원재료: {materials}
-   - 기능: {function}
-""")
-        
-        return "\n".join(formatted)
-    
-    def _format_serp_results(self, results: List[Dict]) -> str:
-        """SERP 결과 포맷팅"""
-        if not results:
-            return "검색 결과 없음"
-        
-        formatted = []
-        for idx, result in enumerate(results[:5], 1):
-            title = result.get('title', 'N/A')
-            snippet = result.get('snippet', 'N/A')
-            
-            # 길이 제한
-            if len(snippet) > 150:
-                snippet = snippet[:150] + "..."
+            if not chunks:
+                record_stage("llm_first_token", (time.perf_counter() - started) * 1000)
+            chunks.append(text)
             
-            formatted.append(f"""
-{idx}. {title}
-   - 내용: {snippet}
-""")
+            yield "token", {"text": text}
+            for name, value in parser.feed(text):
+                yield "section", {"name": name, "value": value}
+        
+        record_stage("llm", (time.perf_counter() - started) * 1000)
+        self._record_usage(prompt, usage.get('prompt_tokens'), usage.get('output_tokens'))
+        
+        for name, value in parser.close():
+            yield "section", {"name": name, "value": value}
         
-        return "\n".join(formatted)
+        response_text = "".join(chunks)
+        if not response_text:
+            raise ValueError("Gemini API가 빈 응답을 반환했습니다.")
+        
+        recommendation = self._parse_response(response_text)
+        
+        if cache_key is not None:
+            await self.response_cache.aset(cache_key, recommendation)
+            cache_status = {'status': 'miss' if use_cache else 'bypass', 'key': cache_key[:16]}
+        else:
+            cache_status = {'status': 'disabled'}
+        
+        logger.info(f"Gemini 스트리밍 생성 완료: {len(response_text)}자")
+        
+        yield "done", {"recommendation": recommendation, "cache": cache_status}
+    
+    @staticmethod
+    def _with_prompt_stats(event: str, data: Dict[str, Any], prompt_stats: Dict) -> Tuple[str, Dict[str, Any]]:
+        if event == "done":
+            data = {**data, "prompt": prompt_stats}
+        return event, data
     
-    def _format_output_options(self, options: Dict) -> str:
-        """출력 옵션 포맷팅"""
-        requirements = []
+    @staticmethod
+    def _replay_events(recommendation: Dict[str, Any], cache_status: Dict) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """완성된 추천을 스트리밍 이벤트로 한 번에 전송"""
         
-        if options.get('include_product_name', True):
-            requirements.append("1. 추천 약/영양제 종류")
-            requirements.append("2. 제품명 (구체적으로 2-3개)")
+        yield "token", {"text": recommendation['text']}
+        for name, value in recommendation['structured'].items():
+            if value and value != "정보 없음":
+                yield "section", {"name": name, "value": value}
+        yield "done", {"recommendation": recommendation, "cache": cache_status}
+    
+    def rag_only_recommendation(self, query: str, rag_results: List[Dict], reason: str) -> Dict[str, Any]:
+        """LLM 없이 RAG 검색 결과만으로 만든 추천 (_parse_response와 같은 구조)"""
         
-        if options.get('include_ingredients', True):
-            requirements.append("3. 주요 원재료 (핵심 성분)")
+        products = [r['product_name'] for r in rag_results[:3] if r.get('product_name')]
         
-        if options.get('include_timing', True):
-            requirements.append("4. 복용 시기 (아침/점심/저녁/취침 전)")
+        ingredients = []
+        for result in rag_results[:3]:
+            for material in re.split(r'[,，]', result.get('raw_materials') or ''):
+                material = re.sub(r'\(.*?\)', '', material).strip()
+                if material and material not in ingredients:
+                    ingredients.append(material)
         
-        if options.get('include_precautions', True):
-            requirements.append("5. 주의사항 (간단히)")
+        text = "\n".join([
+            f"'{query}'에 대해 내부 DB 검색 결과로 안내합니다. (AI 추천 일시 사용 불가)",
+            "1. 추천 약/영양제 종류: 건강기능식품",
+            f"2. 제품명: {', '.join(products) if products else '검색 결과 없음'}",
+            f"3. 주요 원재료: {', '.join(ingredients[:5]) if ingredients else '정보 없음'}",
+            "4. 복용 시기: 제품 표시 사항의 섭취 방법 참고",
+            "5. 주의사항: 복용 중인 약이 있으면 전문가와 상담"
+        ])
         
-        return "\n".join(requirements)
+        recommendation = self._parse_response(text)
+        recommendation['fallback'] = {'type': 'rag_only', 'reason': reason}
+        return recommendation
     
     async def _call_gemini(self, prompt: str) -> str:
-        """Gemini API 호출 (새로운 google-genai SDK)"""
+        """LLM 제공자 호출 (동기 SDK 호출은 전용 스레드 풀에서 실행)"""
         try:
-            logger.info(f"Gemini API 호출: model={self.model_name}")
+            logger.info(f"Gemini API 호출: provider={self.provider.name}, model={self.model_name}")
             
-            # 비동기 실행
-            def _sync_generate():
-                logger.debug(f"프롬프트 길이: {len(prompt)}자")
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    contents=prompt,
-                    config={
-                        'temperature': self.temperature,
-                        'max_output_tokens': self.max_output_tokens
-                    }
+            # 전용 스레드 풀에서 실행 (동시 호출 수는 gemini 격벽 한도 이내)
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            async with self.bulkhead.slot():
+                response = await loop.run_in_executor(
+                    self.executor,
+                    context.run,
+                    self.provider.generate,
+                    prompt,
+                    self.temperature,
+                    self.max_output_tokens
                 )
-                
-                logger.info(f"응답 객체 타입: {type(response)}")
-                
-                # 1. response.text 속성 시도 (가장 일반적)
-                try:
-                    if hasattr(response, 'text') and response.text:
-                        logger.info("response.text에서 텍스트 추출 성공")
-                        return response.text
-                except Exception as e:
-                    logger.debug(f"response.text 접근 실패: {e}")
-
-                # 2. candidates 구조 순회
-                if hasattr(response, 'candidates') and response.candidates:
-                    for i, candidate in enumerate(response.candidates):
-                        logger.debug(f"Candidate {i} 확인 중")
-                        if hasattr(candidate, 'content') and candidate.content:
-                            # parts 확인
-                            if hasattr(candidate.content, 'parts') and candidate.content.parts:
-                                for part in candidate.content.parts:
-                                    if hasattr(part, 'text') and part.text:
-                                        logger.info("candidate.content.parts에서 텍스트 추출 성공")
-                                        return part.text
-                            # content.text 확인
-                            if hasattr(candidate.content, 'text') and candidate.content.text:
-                                logger.info("candidate.content.text에서 텍스트 추출 성공")
-                                return candidate.content.text
-                
-                # 3. 최후의 수단: 문자열 변환
-                logger.warning(f"텍스트 추출 실패. 응답 객체 구조: {dir(response)}")
-                return str(response)
             
-            response_text = await asyncio.to_thread(_sync_generate)
+            self._record_usage(prompt, response['prompt_tokens'], response['output_tokens'])
+            response_text = response['text']
             
             if not response_text:
                 raise ValueError("Gemini API가 빈 응답을 반환했습니다.")
@@ -286,10 +331,21 @@ class GeminiService:
             logger.info(f"응답 텍스트 길이: {len(response_text)}자")
             return response_text
             
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Gemini API 호출 오류: {e}", exc_info=True)
             raise
     
+    def _record_usage(self, prompt: str, prompt_tokens: Optional[int], output_tokens: Optional[int]):
+        """실제 토큰 사용량 로그 + 프롬프트 토큰 추정 보정"""
+        
+        if not prompt_tokens:
+            return
+        
+        logger.info(f"Gemini 토큰 사용량: prompt={prompt_tokens}, output={output_tokens}")
+        self.prompt_builder.calibrate(prompt, prompt_tokens)
+    
     def _parse_response(self, response_text: str) -> Dict[str, Any]:
         """응답 파싱"""
         # 구조화된 데이터 추출
@@ -359,6 +415,54 @@ class GeminiService:
             precautions = re.split(r'[,;]', precautions_text)
             return [p.strip() for p in precautions if p.strip()]
         return []
+    
+    def _parse_section(self, line: str) -> Optional[Tuple[str, Any]]:
+        """한 줄에서 번호 항목(1~5) 추출 (해당 없으면 None)"""
+        extractors = (
+            ('type', self._extract_type),
+            ('products', self._extract_products),
+            ('ingredients', self._extract_ingredients),
+            ('timing', self._extract_timing),
+            ('precautions', self._extract_precautions)
+        )
+        
+        for name, extractor in extractors:
+            value = extractor(line)
+            if value and value != "정보 없음":
+                return name, value
+        return None
+
+
+class StreamingSectionParser:
+    """스트리밍 텍스트에서 줄이 완성될 때마다 구조화 항목을 추출"""
+    
+    def __init__(self, service: GeminiService):
+        self.service = service
+        self.buffer = ""
+        self.emitted = set()
+    
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        self.buffer += text
+        if "\n" not in self.buffer:
+            return []
+        
+        *lines, self.buffer = self.buffer.split("\n")
+        return self._parse_lines(lines)
+    
+    def close(self) -> List[Tuple[str, Any]]:
+        """마지막 줄(개행 없이 끝난 경우) 처리"""
+        lines, self.buffer = [self.buffer], ""
+        return self._parse_lines(lines)
+    
+    def _parse_lines(self, lines: List[str]) -> List[Tuple[str, Any]]:
+        sections = []
+        for line in lines:
+            section = self.service._parse_section(line)
+            # 항목별 첫 번째 값만 사용 (_parse_response와 동일)
+            if section and section[0] not in self.emitted:
+                self.emitted.add(section[0])
+                sections.append(section)
+        return sections
 
 
 # 싱글톤 인스턴스
@@ -0,0 +1,231 @@
+"""
+LLM 응답 캐시 (LLM Response Cache)
+
+같은 증상 질문에 대해 RAG/SERP 결과, 참조 비중, 출력 옵션이 사실상 같으면
+완성된 프롬프트도 같으므로, 공백을 정규화한 프롬프트와 모델 파라미터의 해시를 키로
+Gemini 응답을 재사용합니다.
+
+- 1차: 프로세스 내 LRU 캐시 (GEMINI_CACHE_SIZE, GEMINI_CACHE_TTL_SECONDS)
+- 2차(선택): sqlite 파일 (GEMINI_CACHE_SQLITE_PATH) - 재시작/다중 워커 간 공유
+  2차 적중 시 1차로 올림
+"""
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from app.core.config import settings
+from app.utils.cache import LRUCache
+from app.utils.logger import get_logger
+
+config = settings
+logger = get_logger(__name__)
+
+
+def make_cache_key(prompt: str, model: str, temperature: float, max_output_tokens: int) -> str:
+    """프롬프트(공백 정규화)와 모델 파라미터의 정규화 해시"""
+
+    payload = json.dumps(
+        {
+            "prompt": " ".join(prompt.split()),
+            "model": model,
+            "temperature": round(float(temperature), 4),
+            "max_output_tokens": int(max_output_tokens)
+        },
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SqliteCacheTier:
+    """만료 시각을 가진 key/value sqlite 테이블"""
+
+    # 저장 N회마다 만료 행 정리
+    PRUNE_EVERY = 200
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        self.prune()
+
+    def get(self, key: str) -> Optional[Tuple[Dict, float]]:
+        """(값, 저장 시각) 또는 None"""
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_response_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Dict, ttl: float):
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (key, value, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now + ttl)
+            )
+            self._conn.commit()
+            self._writes += 1
+            prune = self._writes % self.PRUNE_EVERY == 0
+
+        if prune:
+            self.prune()
+
+    def prune(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_response_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+
+
+class LLMResponseCache:
+    """LLM 응답 2단계 캐시 (메모리 LRU + 선택적 sqlite)"""
+
+    def __init__(self, maxsize: int = None, ttl: float = None, sqlite_path: str = None):
+        self.ttl = ttl if ttl is not None else config.GEMINI_CACHE_TTL_SECONDS
+        self.memory = LRUCache(maxsize=maxsize or config.GEMINI_CACHE_SIZE, ttl=self.ttl)
+
+        sqlite_path = config.GEMINI_CACHE_SQLITE_PATH if sqlite_path is None else sqlite_path
+        self.persistent: Optional[SqliteCacheTier] = None
+        if sqlite_path:
+            try:
+                self.persistent = SqliteCacheTier(sqlite_path)
+            except Exception as e:
+                logger.warning(f"LLM 응답 캐시 sqlite 초기화 실패, 메모리 캐시만 사용합니다: {e}")
+
+        self.persistent_hits = 0
+
+        logger.info(
+            f"LLM 응답 캐시 초기화 완료: size={self.memory.maxsize}, ttl={self.ttl}s, "
+            f"sqlite={sqlite_path or '-'}"
+        )
+
+    def get(self, key: str) -> Optional[Tuple[Dict, Dict]]:
+        """
+        캐시 조회
+
+        Returns:
+            (응답 사본, 캐시 상태) 또는 None
+        """
+
+        entry = self.memory.get(key)
+        if entry is not None:
+            return self._hit(key, entry, "memory")
+
+        entry = self._get_persistent(key)
+        if entry is not None:
+            return self._hit(key, entry, "sqlite")
+
+        return None
+
+    async def aget(self, key: str) -> Optional[Tuple[Dict, Dict]]:
+        """비동기 조회 (sqlite 조회만 워커 스레드에서 실행)"""
+
+        entry = self.memory.get(key)
+        if entry is not None:
+            return self._hit(key, entry, "memory")
+
+        if self.persistent is None:
+            return None
+
+        entry = await asyncio.to_thread(self._get_persistent, key)
+        if entry is not None:
+            return self._hit(key, entry, "sqlite")
+
+        return None
+
+    def set(self, key: str, value: Dict):
+        """응답 저장 (호출 측이 이후 값을 변경해도 캐시는 영향 없음)"""
+
+        entry = (copy.deepcopy(value), time.time())
+        self.memory.set(key, entry)
+        self._set_persistent(key, entry[0])
+
+    async def aset(self, key: str, value: Dict):
+        """비동기 저장 (sqlite 기록만 워커 스레드에서 실행)"""
+
+        entry = (copy.deepcopy(value), time.time())
+        self.memory.set(key, entry)
+        if self.persistent is not None:
+            await asyncio.to_thread(self._set_persistent, key, entry[0])
+
+    def _get_persistent(self, key: str) -> Optional[Tuple[Dict, float]]:
+        if self.persistent is None:
+            return None
+
+        try:
+            entry = self.persistent.get(key)
+        except Exception as e:
+            logger.warning(f"LLM 응답 캐시 sqlite 조회 실패: {e}")
+            return None
+
+        if entry is not None:
+            self.persistent_hits += 1
+            # 남은 유효 시간만큼 메모리 캐시로 승격
+            remaining = self.ttl - (time.time() - entry[1])
+            if remaining > 0:
+                self.memory.set(key, entry, ttl=remaining)
+
+        return entry
+
+    def _set_persistent(self, key: str, value: Dict):
+        if self.persistent is None:
+            return
+
+        try:
+            self.persistent.set(key, value, self.ttl)
+        except Exception as e:
+            logger.warning(f"LLM 응답 캐시 sqlite 저장 실패: {e}")
+
+    @staticmethod
+    def _hit(key: str, entry: Tuple[Dict, float], tier: str) -> Tuple[Dict, Dict]:
+        value, created_at = entry
+        status = {
+            "status": "hit",
+            "tier": tier,
+            "key": key[:16],
+            "age_seconds": round(time.time() - created_at, 1)
+        }
+        return copy.deepcopy(value), status
+
+    def clear(self):
+        self.memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {"memory": self.memory.stats()}
+        if self.persistent is not None:
+            stats["sqlite"] = {
+                "path": self.persistent.path,
+                "entries": self.persistent.count(),
+                "hits": self.persistent_hits
+            }
+        return stats
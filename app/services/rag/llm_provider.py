@@ -0,0 +1,290 @@
+"""
+LLM 제공자 (LLM Provider)
+
+GeminiService가 사용하는 LLM 호출부를 제공자 단위로 분리합니다. (LLM_PROVIDER 설정)
+
+- gemini: google-genai SDK (GEMINI_API_KEY 필요)
+- mock  : 외부 호출 없는 결정적 로컬 모의 응답
+          부하 테스트/용량 산정/벤치마크에서 /rag/recommend/gemini 전체 경로(캐시, 격벽, 타임아웃,
+          스트리밍)를 API 키와 과금 없이 실행하기 위한 용도
+          - 첫 토큰 지연: fixed / uniform / lognormal 분포 (LLM_MOCK_LATENCY_*)
+          - 이후 출력은 LLM_MOCK_TOKENS_PER_SECOND 속도로 생성 (스트리밍은 조각 단위로 전송)
+          - 오류 주입: 일반 오류(LLM_MOCK_ERROR_RATE), 요청 제한 429(LLM_MOCK_OVERLOAD_RATE)
+
+제공자 인터페이스:
+    generate(prompt, temperature, max_output_tokens) -> {"text", "prompt_tokens", "output_tokens"}
+        동기 호출 (GeminiService가 전용 스레드 풀에서 실행)
+    stream(prompt, temperature, max_output_tokens) -> 비동기 반복자
+        {"text", "prompt_tokens", "output_tokens"} 조각 (토큰 수는 알 수 있는 조각에만 포함)
+"""
+from typing import Any, AsyncIterator, Dict, Optional
+import asyncio
+import math
+import random
+import re
+import time
+from app.core.config import settings
+from app.services.rag.prompt_builder import estimate_tokens
+from app.utils.logger import get_logger
+
+config = settings
+logger = get_logger(__name__)
+
+
+class LLMProviderError(Exception):
+    """제공자 호출 오류 (code: HTTP 상태 코드, 429/503이면 격벽이 과부하로 처리)"""
+
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
+
+class LLMProvider:
+    """LLM 제공자 인터페이스"""
+
+    name = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def generate(self, prompt: str, temperature: float, max_output_tokens: int) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, temperature: float, max_output_tokens: int) -> AsyncIterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini (google-genai SDK)"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str = None):
+        from google.genai import Client
+
+        super().__init__(model_name or config.GEMINI_MODEL)
+        self.client = Client(api_key=api_key)
+
+    def generate(self, prompt: str, temperature: float, max_output_tokens: int) -> Dict[str, Any]:
+        logger.debug(f"프롬프트 길이: {len(prompt)}자")
+        response = self.client.models.generate_content(
+            model=self.model_name,
+            contents=prompt,
+            config={
+                'temperature': temperature,
+                'max_output_tokens': max_output_tokens
+            }
+        )
+
+        logger.info(f"응답 객체 타입: {type(response)}")
+
+        return {
+            "text": self._extract_text(response),
+            **self._usage(getattr(response, 'usage_metadata', None))
+        }
+
+    async def stream(self, prompt: str, temperature: float, max_output_tokens: int) -> AsyncIterator[Dict[str, Any]]:
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model_name,
+            contents=prompt,
+            config={
+                'temperature': temperature,
+                'max_output_tokens': max_output_tokens
+            }
+        )
+        async for chunk in stream:
+            yield {
+                "text": getattr(chunk, 'text', None) or "",
+                **self._usage(getattr(chunk, 'usage_metadata', None))
+            }
+
+    @staticmethod
+    def _usage(usage: Any) -> Dict[str, Optional[int]]:
+        return {
+            "prompt_tokens": getattr(usage, 'prompt_token_count', None),
+            "output_tokens": getattr(usage, 'candidates_token_count', None)
+        }
+
+    @staticmethod
+    def _extract_text(response: Any) -> str:
+        # 1. response.text 속성 시도 (가장 일반적)
+        try:
+            if hasattr(response, 'text') and response.text:
+                logger.info("response.text에서 텍스트 추출 성공")
+                return response.text
+        except Exception as e:
+            logger.debug(f"response.text 접근 실패: {e}")
+
+        # 2. candidates 구조 순회
+        if hasattr(response, 'candidates') and response.candidates:
+            for i, candidate in enumerate(response.candidates):
+                logger.debug(f"Candidate {i} 확인 중")
+                if hasattr(candidate, 'content') and candidate.content:
+                    # parts 확인
+                    if hasattr(candidate.content, 'parts') and candidate.content.parts:
+                        for part in candidate.content.parts:
+                            if hasattr(part, 'text') and part.text:
+                                logger.info("candidate.content.parts에서 텍스트 추출 성공")
+                                return part.text
+                    # content.text 확인
+                    if hasattr(candidate.content, 'text') and candidate.content.text:
+                        logger.info("candidate.content.text에서 텍스트 추출 성공")
+                        return candidate.content.text
+
+        # 3. 최후의 수단: 문자열 변환
+        logger.warning(f"텍스트 추출 실패. 응답 객체 구조: {dir(response)}")
+        return str(response)
+
+
+class MockLLMProvider(LLMProvider):
+    """결정적 로컬 모의 LLM (응답 내용은 프롬프트로 결정, 지연/오류는 시드 고정 난수)"""
+
+    name = "mock"
+
+    # 스트리밍 조각당 토큰 수
+    CHUNK_TOKENS = 8
+
+    def __init__(
+        self,
+        latency_distribution: str = None,
+        latency_ms: float = None,
+        latency_jitter: float = None,
+        tokens_per_second: float = None,
+        error_rate: float = None,
+        overload_rate: float = None,
+        seed: int = None
+    ):
+        """
+        Args:
+            latency_distribution: 첫 토큰 지연 분포 (fixed | uniform | lognormal)
+            latency_ms: 첫 토큰 지연 (fixed: 고정값, uniform: 중심값, lognormal: 중앙값)
+            latency_jitter: uniform은 ±비율, lognormal은 sigma
+            tokens_per_second: 출력 토큰 생성 속도 (0이면 지연 없음)
+            error_rate: 일반 오류 비율 (첫 토큰 지연 후 실패)
+            overload_rate: 요청 제한(429) 비율 (즉시 실패)
+            seed: 지연/오류 난수 시드
+        """
+        super().__init__("mock")
+
+        self.latency_distribution = latency_distribution or config.LLM_MOCK_LATENCY_DISTRIBUTION
+        self.latency_ms = latency_ms if latency_ms is not None else config.LLM_MOCK_LATENCY_MS
+        self.latency_jitter = latency_jitter if latency_jitter is not None else config.LLM_MOCK_LATENCY_JITTER
+        self.tokens_per_second = (
+            tokens_per_second if tokens_per_second is not None else config.LLM_MOCK_TOKENS_PER_SECOND
+        )
+        self.error_rate = error_rate if error_rate is not None else config.LLM_MOCK_ERROR_RATE
+        self.overload_rate = overload_rate if overload_rate is not None else config.LLM_MOCK_OVERLOAD_RATE
+        self._random = random.Random(seed if seed is not None else config.LLM_MOCK_SEED)
+
+        if self.latency_distribution not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"지원하지 않는 지연 분포입니다: {self.latency_distribution}")
+
+    def generate(self, prompt: str, temperature: float, max_output_tokens: int) -> Dict[str, Any]:
+        first_token, failure = self._draw()
+        text, output_tokens = self._response(prompt, max_output_tokens)
+
+        self._fail_fast(failure)
+        time.sleep(first_token)
+        self._fail_late(failure)
+        time.sleep(self._generation_seconds(output_tokens))
+
+        return {"text": text, "prompt_tokens": estimate_tokens(prompt), "output_tokens": output_tokens}
+
+    async def stream(self, prompt: str, temperature: float, max_output_tokens: int) -> AsyncIterator[Dict[str, Any]]:
+        first_token, failure = self._draw()
+        text, output_tokens = self._response(prompt, max_output_tokens)
+
+        self._fail_fast(failure)
+        await asyncio.sleep(first_token)
+        self._fail_late(failure)
+
+        chunk_count = max(1, math.ceil(output_tokens / self.CHUNK_TOKENS))
+        chunk_size = math.ceil(len(text) / chunk_count)
+
+        for index in range(chunk_count):
+            if index:
+                await asyncio.sleep(self._generation_seconds(self.CHUNK_TOKENS))
+            last = index == chunk_count - 1
+            yield {
+                "text": text[index * chunk_size:(index + 1) * chunk_size],
+                "prompt_tokens": estimate_tokens(prompt) if last else None,
+                "output_tokens": output_tokens if last else None
+            }
+
+    def _draw(self):
+        """(첫 토큰 지연(초), 주입할 오류 - None/'overload'/'error')"""
+
+        if self.latency_distribution == "fixed":
+            latency_ms = self.latency_ms
+        elif self.latency_distribution == "uniform":
+            spread = self.latency_ms * self.latency_jitter
+            latency_ms = self._random.uniform(self.latency_ms - spread, self.latency_ms + spread)
+        else:
+            latency_ms = self._random.lognormvariate(math.log(max(self.latency_ms, 1e-3)), self.latency_jitter)
+
+        roll = self._random.random()
+        if roll < self.overload_rate:
+            failure = "overload"
+        elif roll < self.overload_rate + self.error_rate:
+            failure = "error"
+        else:
+            failure = None
+
+        return max(latency_ms, 0.0) / 1000, failure
+
+    @staticmethod
+    def _fail_fast(failure: Optional[str]):
+        if failure == "overload":
+            raise LLMProviderError("모의 LLM 요청 제한 (429 RESOURCE_EXHAUSTED)", code=429)
+
+    @staticmethod
+    def _fail_late(failure: Optional[str]):
+        if failure == "error":
+            raise LLMProviderError("모의 LLM 오류 (500 INTERNAL)", code=500)
+
+    def _generation_seconds(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    @staticmethod
+    def _response(prompt: str, max_output_tokens: int):
+        """프롬프트의 증상/RAG 제품명/원재료로 만든 고정 형식 응답과 출력 토큰 수"""
+
+        query = re.search(r"\*\*사용자 증상\*\*: (.+)", prompt)
+        rag_section = prompt.split("**RAG 검색 결과**")[-1].split("**SERP 검색 결과**")[0]
+        products = re.findall(r"^\d+\. (.+)$", rag_section, re.MULTILINE)
+        materials = re.findall(r"- 원재료: ([^,\n(]+)", rag_section)
+
+        text = "\n".join([
+            f"'{query.group(1).strip() if query else ''}'에 대한 모의 추천입니다.",
+            "1. 추천 약/영양제 종류: 건강기능식품",
+            f"2. 제품명: {', '.join(products[:3]) or '정보 없음'}",
+            f"3. 주요 원재료: {', '.join(m.strip() for m in materials[:3]) or '정보 없음'}",
+            "4. 복용 시기: 아침 식후",
+            "5. 주의사항: 복용 중인 약이 있으면 전문가와 상담"
+        ])
+
+        return text, min(estimate_tokens(text), max_output_tokens)
+
+
+def get_llm_provider(name: str = None) -> Optional[LLMProvider]:
+    """설정된 LLM 제공자 (gemini는 API 키가 없으면 None)"""
+
+    name = name or config.LLM_PROVIDER
+
+    if name == "mock":
+        provider = MockLLMProvider()
+        logger.info(
+            f"모의 LLM 제공자 사용: latency={provider.latency_distribution}({provider.latency_ms}ms), "
+            f"{provider.tokens_per_second} tokens/s, error={provider.error_rate}, overload={provider.overload_rate}"
+        )
+        return provider
+
+    if name == "gemini":
+        if not config.GEMINI_API_KEY:
+            logger.warning("Gemini API 키가 설정되지 않았습니다.")
+            return None
+        provider = GeminiProvider(config.GEMINI_API_KEY)
+        logger.info(f"Gemini 클라이언트 초기화 완료: {provider.model_name}")
+        return provider
+
+    raise ValueError(f"지원하지 않는 LLM 제공자입니다: {name}")
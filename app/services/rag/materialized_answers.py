@@ -0,0 +1,155 @@
+"""
+카테고리별 지능형 검색 응답 사전 계산 (Materialized Answers)
+
+대부분의 증상 쿼리는 HealthKnowledgeBase.DEFAULT_RECOMMENDATIONS의 고정 카테고리로 귀결됩니다.
+시작 시점과 인덱스 변경 시점에 카테고리/키워드별 지능형 검색 응답을 미리 계산해 두고,
+쿼리 분석 결과가 알려진 카테고리로 매핑되면 검색/Re-ranking/보강 단계를 건너뛰고 바로 응답합니다.
+"""
+from typing import Callable, Dict, List, Optional, TYPE_CHECKING
+from datetime import datetime
+import asyncio
+import threading
+from app.core.config import settings
+from app.utils.knowledge_base import HealthKnowledgeBase
+from app.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from app.search.query_analyzer import QueryAnalysis
+
+config = settings
+logger = get_logger(__name__)
+
+
+class MaterializedAnswerStore:
+    """증상 키워드 → 사전 계산된 지능형 검색 응답 저장소"""
+
+    # 사전 계산 응답을 재사용할 수 있는 라우팅 (결과가 증상 키워드와 top_k에만 의존)
+    SERVABLE_API = "symptom_recommend"
+
+    def __init__(
+        self,
+        build_fn: Callable[[str], Dict],
+        version_fn: Callable[[], Optional[str]],
+        keywords: Optional[List[str]] = None,
+        refresh_interval: float = None
+    ):
+        """
+        Args:
+            build_fn: 키워드 하나의 전체 지능형 검색 응답을 계산하는 동기 함수
+            version_fn: 현재 인덱스 버전 토큰을 반환하는 함수
+            keywords: 사전 계산할 증상 키워드 (기본: 지식 베이스의 모든 카테고리 키워드)
+            refresh_interval: 인덱스 버전 확인 주기(초)
+        """
+        self.build_fn = build_fn
+        self.version_fn = version_fn
+        self.keywords = keywords or sorted(HealthKnowledgeBase().get_all_symptom_keywords())
+        self.refresh_interval = refresh_interval or config.MATERIALIZED_REFRESH_INTERVAL_SECONDS
+
+        self.answers: Dict[str, Dict] = {}
+        self.version: Optional[str] = None
+        self.built_at: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._refresh_lock = asyncio.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.build_errors = 0
+
+    def lookup(self, analysis: "QueryAnalysis") -> Optional[Dict]:
+        """
+        쿼리 분석 결과에 해당하는 사전 계산 응답 조회
+
+        증상 개체명이 정확히 하나이고 성분 개체명이 없을 때만 매핑합니다.
+        (이 경우 라우팅/검색/보강 결과가 증상 키워드에만 의존)
+        """
+
+        symptoms = analysis.symptoms
+
+        if len(symptoms) != 1 or analysis.ingredients:
+            self.misses += 1
+            return None
+
+        with self._lock:
+            answer = self.answers.get(symptoms[0])
+
+        if answer is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return answer
+
+    async def refresh(self, force: bool = False) -> bool:
+        """
+        인덱스 버전이 바뀌었으면 전체 키워드 응답을 다시 계산
+
+        계산은 워커 스레드에서 키워드 단위로 수행하여 이벤트 루프를 막지 않습니다.
+
+        Returns:
+            재계산 여부
+        """
+
+        async with self._refresh_lock:
+            version = await asyncio.to_thread(self.version_fn)
+
+            if not force and self.answers and version == self.version:
+                return False
+
+            logger.info(f"사전 계산 응답 생성 시작: {len(self.keywords)}개 키워드 (index version={version})")
+
+            answers = {}
+            for keyword in self.keywords:
+                try:
+                    response = await asyncio.to_thread(self.build_fn, keyword)
+                except Exception as e:
+                    self.build_errors += 1
+                    logger.error(f"사전 계산 실패 ('{keyword}'): {e}")
+                    continue
+
+                routing_info = response.get("routing_info", {})
+                if (
+                    routing_info.get("selected_api") == self.SERVABLE_API
+                    and routing_info.get("symptom") == keyword
+                    and not response.get("fallback_used")
+                ):
+                    answers[keyword] = response
+
+            with self._lock:
+                self.answers = answers
+                self.version = version
+                self.built_at = datetime.now().isoformat()
+
+            logger.info(f"사전 계산 응답 생성 완료: {len(answers)}/{len(self.keywords)}개")
+
+            return True
+
+    async def run_refresh_loop(self):
+        """시작 시 1회 계산 후, 주기적으로 인덱스 버전을 확인하여 변경 시 재계산"""
+
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"사전 계산 갱신 오류: {e}", exc_info=True)
+
+            await asyncio.sleep(self.refresh_interval)
+
+    def get_stats(self) -> Dict:
+        """저장소 통계"""
+
+        total = self.hits + self.misses
+
+        return {
+            "keywords": len(self.keywords),
+            "materialized": len(self.answers),
+            "index_version": self.version,
+            "built_at": self.built_at,
+            "refresh_interval": self.refresh_interval,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "build_errors": self.build_errors
+        }
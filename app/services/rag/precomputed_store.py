@@ -0,0 +1,254 @@
+"""
+사전 계산 추천 저장소 (Precomputed Recommendations)
+
+트래픽 대부분을 차지하는 증상 질의의 Gemini 추천을 배치 작업
+(scripts/precompute_recommendations.py)으로 미리 생성해 두고, /rag/recommend/gemini 가
+RAG/SERP/Gemini 호출 전에 먼저 조회합니다.
+
+저장 형식 (PRECOMPUTED_DIR):
+    {version}.json : 버전별 전체 추천 (생성 시각, 모델, 요청 파라미터 서명, 질의별 추천)
+    CURRENT        : 현재 서비스 중인 버전 이름 (배치 작업이 새 버전 기록 후 교체)
+
+서버는 PRECOMPUTED_RELOAD_INTERVAL_SECONDS마다 백그라운드 스레드에서 CURRENT를 확인하여
+새 버전을 불러오고, 잠금 안에서 한 번에 교체합니다. (조회 경로에서는 파일을 읽지 않음)
+요청 파라미터(top_k, SERP, 비중, 출력 옵션, 모델)가 배치 생성 시와 같고
+생성 후 PRECOMPUTED_MAX_AGE_SECONDS가 지나지 않은 경우에만 반환합니다.
+"""
+from typing import Any, Dict, Optional, Tuple
+from datetime import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+config = settings
+logger = get_logger(__name__)
+
+CURRENT_FILE = "CURRENT"
+
+
+def normalize_query(query: str) -> str:
+    """저장 키 (공백 정규화 + 소문자)"""
+    return " ".join(query.split()).lower()
+
+
+def request_params(request: Any, model: str) -> Optional[Dict]:
+    """
+    추천 결과에 영향을 주는 요청 파라미터 (GeminiRecommendationRequest 필드)
+
+    사용자 정의 프롬프트를 쓰거나 캐시를 사용하지 않는 요청은 사전 계산 대상이 아니므로 None
+    """
+
+    if (request.custom_prompt and request.custom_prompt != "string") or not request.use_cache:
+        return None
+
+    return {
+        "model": model,
+        "top_k": request.top_k,
+        "enable_serp": request.enable_serp,
+        "serp_max_results": request.serp_max_results if request.enable_serp else 0,
+        "rag_weight": round(request.rag_weight, 4),
+        "max_length": request.max_length,
+        "include_product_name": request.include_product_name,
+        "include_ingredients": request.include_ingredients,
+        "include_timing": request.include_timing,
+        "include_precautions": request.include_precautions
+    }
+
+
+def params_signature(params: Dict) -> str:
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class PrecomputedRecommendationStore:
+    """버전별 사전 계산 추천 조회"""
+
+    def __init__(self, directory: str = None, reload_interval: float = None, max_age: float = None):
+        self.directory = directory or config.PRECOMPUTED_DIR
+        self.reload_interval = (
+            reload_interval if reload_interval is not None else config.PRECOMPUTED_RELOAD_INTERVAL_SECONDS
+        )
+        self.max_age = max_age if max_age is not None else config.PRECOMPUTED_MAX_AGE_SECONDS
+
+        self.version: Optional[str] = None
+        self.signature: Optional[str] = None
+        self.created_ts = 0.0
+        self.entries: Dict[str, Dict] = {}
+
+        self._checked_at = 0.0
+        self._reloading = False
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.load_errors = 0
+
+        self.reload()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def lookup(self, query: str, params: Optional[Dict]) -> Optional[Tuple[Dict, Dict]]:
+        """
+        사전 계산 추천 조회
+
+        Returns:
+            (저장된 항목 - recommendation/sources, 캐시 상태) 또는 None
+        """
+
+        if params is None:
+            return None
+
+        self._maybe_reload()
+
+        # 교체 중인 버전과 섞이지 않도록 한 버전의 값을 함께 읽음
+        with self._lock:
+            entries, signature = self.entries, self.signature
+            version, created_ts = self.version, self.created_ts
+
+        entry = entries.get(normalize_query(query))
+        age = time.time() - created_ts
+
+        if entry is None or params_signature(params) != signature or age > self.max_age:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        status = {
+            "status": "precomputed",
+            "version": version,
+            "age_seconds": round(age, 1)
+        }
+        return entry, status
+
+    def _maybe_reload(self):
+        """확인 주기가 지났으면 백그라운드 스레드에서 새 버전 확인 (이미 확인 중이면 생략)"""
+
+        now = time.monotonic()
+        with self._lock:
+            if self._reloading or now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            self._reloading = True
+
+        threading.Thread(target=self._background_reload, name="precomputed-reload", daemon=True).start()
+
+    def _background_reload(self):
+        try:
+            self.reload()
+        except Exception as e:
+            self.load_errors += 1
+            logger.error(f"사전 계산 추천 확인 실패: {e}")
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    def reload(self) -> bool:
+        """CURRENT가 가리키는 버전 불러오기 (파일은 잠금 밖에서 읽고, 잠금 안에서 교체)"""
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+            current_version = self.version
+
+        version = self._read_current()
+        if version is None or version == current_version:
+            return False
+
+        try:
+            with open(os.path.join(self.directory, f"{version}.json"), encoding="utf-8") as f:
+                payload = json.load(f)
+            entries = payload["entries"]
+            signature = payload["signature"]
+            created_ts = payload["created_ts"]
+        except Exception as e:
+            self.load_errors += 1
+            logger.error(f"사전 계산 추천 로드 실패 ({version}): {e}")
+            return False
+
+        with self._lock:
+            self.entries = entries
+            self.signature = signature
+            self.created_ts = created_ts
+            self.version = version
+
+        logger.info(f"사전 계산 추천 로드 완료: version={version}, {len(entries)}개 질의")
+        return True
+
+    def _read_current(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    # ------------------------------------------------------------------
+    # 기록 (배치 작업)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def write_version(directory: str, params: Dict, entries: Dict[str, Dict], keep: int = 3) -> str:
+        """
+        새 버전 기록 후 CURRENT 교체 (임시 파일 → rename, 서빙 중인 서버는 다음 확인 시 교체)
+
+        Args:
+            directory: 저장 디렉토리
+            params: 생성에 사용한 요청 파라미터 (request_params 형식)
+            entries: 정규화 질의 → {"query", "recommendation", "sources", "generated_at"}
+            keep: 보관할 이전 버전 수 (CURRENT 포함)
+
+        Returns:
+            버전 이름
+        """
+
+        os.makedirs(directory, exist_ok=True)
+
+        now = datetime.now()
+        version = now.strftime("%Y%m%d-%H%M%S")
+        payload = {
+            "version": version,
+            "created_at": now.isoformat(),
+            "created_ts": now.timestamp(),
+            "params": params,
+            "signature": params_signature(params),
+            "entries": entries
+        }
+
+        path = os.path.join(directory, f"{version}.json")
+        _atomic_write(path, json.dumps(payload, ensure_ascii=False, indent=1))
+        _atomic_write(os.path.join(directory, CURRENT_FILE), version + "\n")
+
+        # 오래된 버전 정리 (이름이 생성 시각 순)
+        versions = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+        for name in versions[:-keep] if keep > 0 else []:
+            os.remove(os.path.join(directory, name))
+
+        return version
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+
+        return {
+            "enabled": config.PRECOMPUTED_ENABLED,
+            "directory": self.directory,
+            "version": self.version,
+            "created_at": datetime.fromtimestamp(self.created_ts).isoformat() if self.created_ts else None,
+            "signature": self.signature,
+            "queries": len(self.entries),
+            "max_age_seconds": self.max_age,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "load_errors": self.load_errors
+        }
+
+
+def _atomic_write(path: str, text: str):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
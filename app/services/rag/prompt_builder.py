@@ -0,0 +1,424 @@
+"""
+토큰 예산 기반 프롬프트 구성 (Prompt Builder)
+
+Gemini 입력 토큰 수가 요청마다 크게 달라지지 않도록, 정해진 예산(PROMPT_TOKEN_BUDGET) 안에서
+RAG/SERP 컨텍스트를 골라 프롬프트를 만듭니다.
+
+- 토큰 수: 로컬 추정 (한글 음절/영단어/숫자/기호 단위). 실제 Gemini 응답의
+  usage_metadata.prompt_token_count로 추정 배율을 보정하되, 배율은 기록하는 토큰 통계에만 적용
+  (예산 계산/축약은 보정 전 추정치 기준이므로 같은 입력이면 항상 같은 프롬프트 → 응답 캐시 키 유지)
+- 시스템 프롬프트(고정 접두부): (참조 비중, 출력 옵션, 최대 길이)별로 한 번만 만들고 토큰 수와 함께 재사용
+- 컨텍스트 선택: 출처별로 정규화한 관련도(RAG score / SERP 순위) 순으로 예산이 허락하는 만큼 포함,
+  남은 예산이 부족하면 긴 필드(원재료/기능/내용)를 줄여서 포함
+- 중복 제거: 같은 제품명의 RAG 결과, 이미 포함된 내용과 대부분 겹치는 SERP 결과는 제외
+- 요청별 토큰 수를 로그와 /metrics(yakkobak_prompt_tokens)로 기록
+"""
+from typing import Dict, List, Optional, Set, Tuple
+import math
+import re
+from app.core.config import settings
+from app.utils.cache import LRUCache
+from app.utils.metrics import PROMPT_TOKENS
+from app.utils.logger import get_logger
+
+config = settings
+logger = get_logger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"([가-힣]+)|([A-Za-z]+)|(\d+)|(\S)")
+_NORMALIZE_PATTERN = re.compile(r"[^0-9a-z가-힣]+")
+
+# 한글 음절당 토큰 수 (보정 전 초기값)
+HANGUL_TOKENS_PER_CHAR = 0.8
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    입력 토큰 수 추정
+
+    한글 음절 0.8, 영단어 4글자당 1, 숫자 3자리당 1, 기타 기호 1토큰으로 계산합니다.
+    (Gemini count_tokens API는 요청마다 네트워크 왕복이 필요하므로 사용하지 않음)
+    """
+
+    if not text:
+        return 0
+
+    total = 0.0
+    for hangul, word, digits, _ in _TOKEN_PATTERN.findall(text):
+        if hangul:
+            total += len(hangul) * HANGUL_TOKENS_PER_CHAR
+        elif word:
+            total += math.ceil(len(word) / 4)
+        elif digits:
+            total += math.ceil(len(digits) / 3)
+        else:
+            total += 1
+
+    return int(math.ceil(total))
+
+
+def _bigrams(text: str) -> Set[str]:
+    """공백/기호를 제거한 문자 bigram 집합 (중복 판정용)"""
+
+    normalized = _NORMALIZE_PATTERN.sub("", (text or "").lower())
+    return {normalized[i:i + 2] for i in range(len(normalized) - 1)}
+
+
+class PromptBuilder:
+    """토큰 예산 안에서 Gemini 프롬프트 구성"""
+
+    # 출처별 최대 포함 결과 수
+    MAX_RESULTS = 5
+
+    def __init__(
+        self,
+        token_budget: int = None,
+        field_max_tokens: int = None,
+        min_item_tokens: int = None,
+        dedup_threshold: float = None
+    ):
+        """
+        Args:
+            token_budget: 프롬프트 전체 입력 토큰 예산
+            field_max_tokens: 결과 한 건의 긴 필드(원재료/기능/내용)별 최대 토큰
+            min_item_tokens: 줄여서라도 포함할 결과 한 건의 최소 토큰 (미만이면 제외)
+            dedup_threshold: SERP 결과 내용 중 이미 포함된 내용과 겹치는 비율이 이 값 이상이면 제외
+        """
+        self.token_budget = token_budget or config.PROMPT_TOKEN_BUDGET
+        self.field_max_tokens = field_max_tokens or config.PROMPT_FIELD_MAX_TOKENS
+        self.min_item_tokens = min_item_tokens or config.PROMPT_MIN_ITEM_TOKENS
+        self.dedup_threshold = dedup_threshold if dedup_threshold is not None else config.PROMPT_DEDUP_THRESHOLD
+
+        # 추정치 → 실제 토큰 수 배율 (Gemini usage_metadata로 보정)
+        self.scale = 1.0
+        self._system_prompts = LRUCache(maxsize=64)
+
+    # ------------------------------------------------------------------
+    # 토큰 수
+    # ------------------------------------------------------------------
+
+    def count(self, text: str) -> int:
+        """프롬프트 구성에 쓰는 토큰 수 (보정 전 추정치)"""
+        return estimate_tokens(text)
+
+    def calibrated(self, tokens: int) -> int:
+        """보정 배율을 적용한 토큰 수 (통계 기록용)"""
+        return int(math.ceil(tokens * self.scale))
+
+    def calibrate(self, prompt: str, actual_tokens: Optional[int]):
+        """실제 프롬프트 토큰 수로 추정 배율 보정 (지수 이동 평균)"""
+
+        estimated = estimate_tokens(prompt)
+        if not actual_tokens or not estimated:
+            return
+
+        ratio = min(max(actual_tokens / estimated, 0.5), 2.0)
+        self.scale = round(self.scale * 0.9 + ratio * 0.1, 4)
+
+        logger.debug(f"프롬프트 토큰 보정: 추정 {estimated}, 실제 {actual_tokens}, 배율 {self.scale}")
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """토큰 수가 max_tokens 이하가 되도록 뒤를 잘라 '...' 추가"""
+
+        if self.count(text) <= max_tokens:
+            return text
+        if max_tokens <= 1:
+            return "..."
+
+        # 글자당 평균 토큰으로 자를 위치를 잡은 뒤 넘치면 조금씩 줄임
+        cut = max(1, int(len(text) * max_tokens / self.count(text)))
+        while cut > 1 and self.count(text[:cut] + "...") > max_tokens:
+            cut = int(cut * 0.9)
+
+        return text[:cut].rstrip() + "..."
+
+    # ------------------------------------------------------------------
+    # 프롬프트 구성
+    # ------------------------------------------------------------------
+
+    def build(
+        self,
+        query: str,
+        rag_results: List[Dict],
+        serp_results: List[Dict],
+        rag_weight: float,
+        max_length: int,
+        custom_prompt: Optional[str],
+        output_options: Dict
+    ) -> Tuple[str, Dict]:
+        """
+        프롬프트 구성
+
+        Returns:
+            (프롬프트, 토큰 통계)
+        """
+
+        if custom_prompt and custom_prompt != "string":
+            system_prompt = custom_prompt
+            system_tokens = self.count(system_prompt)
+        else:
+            system_prompt, system_tokens = self._system_prompt(rag_weight, max_length, output_options)
+
+        # 컨텍스트 없이 고정 부분만의 토큰 수로 남은 예산 계산
+        empty = self._user_prompt(query, "", "", rag_weight, max_length)
+        fixed_tokens = system_tokens + self.count(empty)
+        available = self.token_budget - fixed_tokens
+
+        rag_texts, serp_texts, stats = self._select_context(rag_results, serp_results, available)
+
+        user_prompt = self._user_prompt(
+            query,
+            "\n".join(rag_texts) if rag_texts else "검색 결과 없음",
+            "\n".join(serp_texts) if serp_texts else "검색 결과 없음",
+            rag_weight,
+            max_length
+        )
+        prompt = system_prompt + "\n\n" + user_prompt
+
+        total_tokens = system_tokens + self.count(user_prompt)
+        stats.update({
+            'budget': self.token_budget,
+            'total_tokens': self.calibrated(total_tokens),
+            'system_tokens': self.calibrated(system_tokens),
+            'context_tokens': self.calibrated(total_tokens - fixed_tokens),
+            'scale': self.scale,
+            'over_budget': total_tokens > self.token_budget
+        })
+
+        self._record(query, stats)
+        return prompt, stats
+
+    def _system_prompt(self, rag_weight: float, max_length: int, output_options: Dict) -> Tuple[str, int]:
+        """기본 시스템 프롬프트와 토큰 수 (조합별 캐시)"""
+
+        key = (
+            round(rag_weight, 4),
+            max_length,
+            tuple(sorted((name, bool(value)) for name, value in output_options.items()))
+        )
+        cached = self._system_prompts.get(key)
+        if cached is not None:
+            return cached
+
+        gemini_weight = 1 - rag_weight
+        text = f"""
+당신은 건강기능식품 전문가입니다.
+사용자의 증상에 맞는 영양제와 약을 추천해주세요.
+
+**참조 데이터 비중**: {rag_weight * 100:.0f}%
+- RAG 검색 결과 (내부 DB의 실제 제품 정보)
+- SERP 검색 결과 (웹 검색 정보)
+
+**Gemini 지식 비중**: {gemini_weight * 100:.0f}%
+- 의학적 지식
+- 영양학 지식
+- 최신 연구 결과
+
+**출력 형식**:
+{self._format_output_options(output_options)}
+
+**제약 조건**:
+- 최대 {max_length}글자 이내로 작성
+- 명확하고 간결하게
+- 의학적 근거 기반
+- 구체적인 제품명 포함
+"""
+        cached = (text, self.count(text))
+        self._system_prompts.set(key, cached)
+        return cached
+
+    @staticmethod
+    def _user_prompt(query: str, rag_text: str, serp_text: str, rag_weight: float, max_length: int) -> str:
+        gemini_weight = 1 - rag_weight
+
+        return f"""
+**사용자 증상**: {query}
+
+**RAG 검색 결과** (내부 DB, 참조 비중 {rag_weight * 100:.0f}%):
+{rag_text}
+
+**SERP 검색 결과** (웹 검색, 참조 비중 {rag_weight * 100:.0f}%):
+{serp_text}
+
+위 정보를 {rag_weight * 100:.0f}% 참조하고, 당신의 의학 지식을 {gemini_weight * 100:.0f}% 활용하여
+최적의 영양제/약을 추천해주세요.
+
+**중요**: 반드시 {max_length}글자 이내로 작성하세요.
+"""
+
+    @staticmethod
+    def _format_output_options(options: Dict) -> str:
+        """출력 옵션 포맷팅"""
+        requirements = []
+
+        if options.get('include_product_name', True):
+            requirements.append("1. 추천 약/영양제 종류")
+            requirements.append("2. 제품명 (구체적으로 2-3개)")
+
+        if options.get('include_ingredients', True):
+            requirements.append("3. 주요 원재료 (핵심 성분)")
+
+        if options.get('include_timing', True):
+            requirements.append("4. 복용 시기 (아침/점심/저녁/취침 전)")
+
+        if options.get('include_precautions', True):
+            requirements.append("5. 주의사항 (간단히)")
+
+        return "\n".join(requirements)
+
+    # ------------------------------------------------------------------
+    # 컨텍스트 선택
+    # ------------------------------------------------------------------
+
+    def _select_context(
+        self,
+        rag_results: List[Dict],
+        serp_results: List[Dict],
+        available: int
+    ) -> Tuple[List[str], List[str], Dict]:
+        """관련도 순으로 예산 안에서 RAG/SERP 결과 선택 (출력은 출처별 원래 순위 순)"""
+
+        candidates, deduplicated = self._candidates(rag_results, serp_results)
+
+        # 관련도 내림차순, 같으면 RAG 우선
+        candidates.sort(key=lambda c: (-c['relevance'], c['source'] != 'rag', c['rank']))
+
+        selected = []
+        trimmed = 0
+        dropped = 0
+        remaining = available
+
+        for candidate in candidates:
+            text = self._format_item(candidate, self.field_max_tokens)
+            tokens = self.count(text)
+
+            if tokens > remaining:
+                text = self._fit_item(candidate, remaining)
+                if text is None:
+                    dropped += 1
+                    continue
+                tokens = self.count(text)
+                trimmed += 1
+
+            remaining -= tokens
+            selected.append((candidate, text))
+
+        selected.sort(key=lambda item: item[0]['rank'])
+        rag_texts = self._number([text for c, text in selected if c['source'] == 'rag'])
+        serp_texts = self._number([text for c, text in selected if c['source'] == 'serp'])
+
+        stats = {
+            'rag_used': len(rag_texts),
+            'rag_total': len(rag_results),
+            'serp_used': len(serp_texts),
+            'serp_total': len(serp_results),
+            'deduplicated': deduplicated,
+            'trimmed': trimmed,
+            'dropped': dropped
+        }
+        return rag_texts, serp_texts, stats
+
+    def _candidates(self, rag_results: List[Dict], serp_results: List[Dict]) -> Tuple[List[Dict], int]:
+        """중복을 제외한 후보와 관련도 (출처 내 최고 점수 대비 0~1)"""
+
+        candidates = []
+        deduplicated = 0
+        seen_names = set()
+        covered: List[Set[str]] = []
+
+        rag_results = rag_results[:self.MAX_RESULTS]
+        max_score = max((r.get('score') or 0 for r in rag_results), default=0)
+
+        for rank, result in enumerate(rag_results):
+            name = _NORMALIZE_PATTERN.sub("", (result.get('product_name') or "").lower())
+            if name and name in seen_names:
+                deduplicated += 1
+                continue
+            seen_names.add(name)
+
+            fields = {
+                'name': result.get('product_name') or 'N/A',
+                'company': result.get('company_name') or 'N/A',
+                'materials': result.get('raw_materials') or 'N/A',
+                'function': result.get('primary_function') or 'N/A'
+            }
+            covered.append(_bigrams(" ".join(fields.values())))
+
+            score = result.get('score')
+            relevance = score / max_score if score and max_score > 0 else 1.0 / (rank + 1)
+            candidates.append({'source': 'rag', 'rank': rank, 'relevance': relevance, 'fields': fields})
+
+        for rank, result in enumerate(serp_results[:self.MAX_RESULTS]):
+            fields = {
+                'title': result.get('title') or 'N/A',
+                'snippet': result.get('snippet') or 'N/A'
+            }
+
+            grams = _bigrams(fields['title'] + fields['snippet'])
+            if grams and any(len(grams & other) / len(grams) >= self.dedup_threshold for other in covered):
+                deduplicated += 1
+                continue
+            covered.append(grams)
+
+            position = result.get('position') or rank + 1
+            candidates.append({
+                'source': 'serp',
+                'rank': self.MAX_RESULTS + rank,
+                'relevance': 1.0 / position,
+                'fields': fields
+            })
+
+        return candidates, deduplicated
+
+    def _format_item(self, candidate: Dict, field_tokens: int) -> str:
+        """결과 한 건 (번호는 _number에서 추가)"""
+
+        fields = candidate['fields']
+
+        if candidate['source'] == 'rag':
+            return f"""
+{{idx}}. {fields['name']}
+   - 제조사: {fields['company']}
+   - 원재료: {self.truncate(fields['materials'], field_tokens)}
+   - 기능: {self.truncate(fields['function'], field_tokens)}
+"""
+
+        return f"""
+{{idx}}. {fields['title']}
+   - 내용: {self.truncate(fields['snippet'], field_tokens)}
+"""
+
+    def _fit_item(self, candidate: Dict, remaining: int) -> Optional[str]:
+        """남은 예산에 맞게 긴 필드를 줄인 결과 (최소 토큰 미만이면 None)"""
+
+        if remaining < self.min_item_tokens:
+            return None
+
+        overhead = self.count(self._format_item(candidate, 0))
+        long_fields = 2 if candidate['source'] == 'rag' else 1
+        field_tokens = (remaining - overhead) // long_fields
+
+        if field_tokens < 1:
+            return None
+
+        text = self._format_item(candidate, field_tokens)
+        return text if self.count(text) <= remaining else None
+
+    @staticmethod
+    def _number(texts: List[str]) -> List[str]:
+        return [text.replace("{idx}", str(idx), 1) for idx, text in enumerate(texts, 1)]
+
+    def _record(self, query: str, stats: Dict):
+        PROMPT_TOKENS.observe(("system",), stats['system_tokens'])
+        PROMPT_TOKENS.observe(("context",), stats['context_tokens'])
+        PROMPT_TOKENS.observe(("total",), stats['total_tokens'])
+
+        message = (
+            f"프롬프트 토큰: '{query}' 총 {stats['total_tokens']}/{stats['budget']} "
+            f"(system {stats['system_tokens']}, context {stats['context_tokens']}), "
+            f"RAG {stats['rag_used']}/{stats['rag_total']}, SERP {stats['serp_used']}/{stats['serp_total']}, "
+            f"중복 제외 {stats['deduplicated']}, 축약 {stats['trimmed']}, 제외 {stats['dropped']}"
+        )
+        if stats['over_budget']:
+            logger.warning(message + " - 예산 초과 (고정 프롬프트가 예산보다 큼)")
+        else:
+            logger.info(message)
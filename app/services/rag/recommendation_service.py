@@ -1,26 +1,32 @@
-from typing import List, Dict, Optional
-from app.search.rag_search import RAGSearchEngine
+from typing import List, Dict, Optional, TYPE_CHECKING
 from app.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from app.search.rag_search import RAGSearchEngine
+
 logger = get_logger(__name__)
 
 class RecommendationService:
     """추천 서비스"""
     
-    def __init__(self):
-        self.search_engine = RAGSearchEngine()
+    def __init__(self, search_engine: Optional["RAGSearchEngine"] = None):
+        if search_engine is None:
+            from app.search.rag_search import RAGSearchEngine
+            search_engine = RAGSearchEngine()
+        self.search_engine = search_engine
     
     def recommend_by_symptom(
         self, 
         symptom: str, 
-        top_k: int = 3
+        top_k: int = 3,
+        fields: Optional[List[str]] = None
     ) -> Dict:
-        """증상 기반 영양제 추천"""
+        """증상 기반 영양제 추천 (fields: 검색 시 가져올 _source 필드)"""
         
         logger.info(f"증상 기반 추천 시작: '{symptom}'")
         
         # RAG 검색
-        search_results = self.search_engine.search_by_symptom(symptom, top_k=top_k)
+        search_results = self.search_engine.search_by_symptom(symptom, top_k=top_k, fields=fields)
         
         if not search_results:
             return {
@@ -1,12 +1,28 @@
 """
 Google SERP API 서비스
 
-SerpAPI를 사용하여 Google 검색 결과를 가져옵니다.
+SerpAPI(search.json)를 httpx AsyncClient로 직접 호출하여 Google 검색 결과를 가져옵니다.
+
+- keep-alive 연결 풀을 프로세스에서 공유 (SERP_MAX_CONNECTIONS)
+- SERP_TIMEOUT 초과 시 요청 코루틴 자체가 취소되므로 워커 스레드를 점유하지 않음
+- (보강 쿼리, 지역/언어, 결과 수) 기준 TTL 캐시 (SERP_CACHE_SIZE, SERP_CACHE_TTL_SECONDS)
+- 캐시에 없는 같은 키의 동시 요청은 single-flight로 한 번만 호출
+- 동시 호출 수는 "serp" 격벽으로 제한 (거절/서킷 open 시 SERP 없이 RAG 결과만 사용)
+- 요청 시간 예산(app/utils/deadline.py)이 있으면 RAG 검색용 시간(DEADLINE_SEARCH_RESERVE_MS)을
+  남기고 대기하며, 남은 시간이 부족하면 호출 없이 생략 (대기를 멈춰도 진행 중인 호출은 끝까지 실행되어 캐시에 저장)
+- 호출 실패(격벽 거절, 타임아웃, 오류)는 요청 시간 예산에 serp 생략으로 기록
+  (SERP 없이 만든 응답이 시맨틱 캐시에 완전한 응답으로 저장되지 않도록)
+- SERP_API_BASE_URL을 scripts/serp_stub_server.py로 바꾸면 로컬에서 시험 가능
 """
 from typing import List, Dict, Optional
 import asyncio
-from serpapi import GoogleSearch
+import copy
+import httpx
 from app.core.config import settings
+from app.utils.bulkhead import UpstreamUnavailable, get_bulkhead
+from app.utils.cache import LRUCache
+from app.utils.deadline import current_deadline
+from app.utils.single_flight import SingleFlight
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -15,11 +31,27 @@ logger = get_logger(__name__)
 class SerpService:
     """Google SERP API 서비스"""
     
+    # 검색 지역/언어 (캐시 키에 포함)
+    LOCATION = "South Korea"
+    LANGUAGE = "ko"
+    COUNTRY = "kr"
+    
     def __init__(self):
         self.api_key = getattr(settings, 'SERP_API_KEY', None)
         self.enabled = getattr(settings, 'SERP_API_ENABLED', False)
         self.max_results = getattr(settings, 'SERP_MAX_RESULTS', 5)
         self.timeout = getattr(settings, 'SERP_TIMEOUT', 5)
+        self.base_url = settings.SERP_API_BASE_URL.rstrip('/')
+        
+        self.cache = LRUCache(maxsize=settings.SERP_CACHE_SIZE, ttl=settings.SERP_CACHE_TTL_SECONDS)
+        self.flight = SingleFlight("serp", timeout=self.timeout + 1)
+        self.bulkhead = get_bulkhead("serp")
+        
+        # 이벤트 루프 안에서 첫 호출 시 생성
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        self.timeouts = 0
+        self.errors = 0
         
         if self.enabled and not self.api_key:
             logger.warning("SERP API가 활성화되었지만 API 키가 설정되지 않았습니다.")
@@ -40,7 +72,7 @@ class SerpService:
             enabled: SERP 검색 활성화 여부 (API 파라미터로 제어)
         
         Returns:
-            검색 결과 리스트
+            검색 결과 리스트 (캐시 결과도 사본으로 반환)
         """
         # API 파라미터로 비활성화된 경우
         if enabled is False:
@@ -56,74 +88,136 @@ class SerpService:
             logger.warning("SERP API 키가 설정되지 않았습니다.")
             return []
         
+        params = self._build_params(query, max_results or self.max_results)
+        cache_key = (params["q"], params["location"], params["hl"], params["gl"], params["num"])
+        
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"SERP 캐시 적중: '{query}'")
+            return copy.deepcopy(cached)
+        
+        wait_timeout = self._deadline_wait()
+        if wait_timeout == 0:
+            return []
+        
         try:
             logger.info(f"SERP 검색 시작: '{query}'")
             
-            # 비동기 실행
-            results = await asyncio.wait_for(
-                self._call_serpapi(query, max_results or self.max_results),
-                timeout=self.timeout
+            parsed_results = await self.flight.do(
+                cache_key,
+                lambda: self._fetch(params, cache_key),
+                timeout=wait_timeout
             )
-            
-            parsed_results = self._parse_results(results)
             logger.info(f"SERP 검색 완료: {len(parsed_results)}개 결과")
             
-            return parsed_results
+            return copy.deepcopy(parsed_results)
             
+        except UpstreamUnavailable as e:
+            self._degrade()
+            logger.warning(f"SERP 검색 생략: {e}")
+            return []
         except asyncio.TimeoutError:
+            self._degrade()
+            if wait_timeout is not None:
+                # 요청 시간 예산에 맞춘 대기 한도 (SERP_TIMEOUT보다 짧음) - 외부 API 타임아웃이 아님
+                logger.warning(f"SERP 대기 중단: 요청 시간 예산 부족 ({wait_timeout:.2f}초)")
+                return []
+            self.timeouts += 1
             logger.error(f"SERP API 타임아웃 ({self.timeout}초)")
             return []
         except Exception as e:
+            self._degrade()
+            self.errors += 1
             logger.error(f"SERP API 오류: {e}", exc_info=True)
             return []
     
-    async def _call_serpapi(self, query: str, max_results: int) -> Dict:
+    @staticmethod
+    def _degrade():
+        """SERP 결과 없이 진행함을 요청 시간 예산에 기록 (예산이 없는 호출은 무시)"""
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.degrade("serp")
+    
+    def _deadline_wait(self) -> Optional[float]:
         """
-        SerpAPI 호출
-        
-        Args:
-            query: 검색 쿼리
-            max_results: 최대 결과 개수
+        요청 시간 예산 기준 SERP 대기 시간(초)
         
         Returns:
-            SerpAPI 응답
+            None: 예산 없음/충분 (기본 타임아웃 사용), 0: 시간 부족으로 생략
         """
-        # 비동기 실행을 위해 run_in_executor 사용
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._sync_call_serpapi,
-            query,
-            max_results
-        )
+        deadline = current_deadline()
+        if deadline is None:
+            return None
+        
+        reserve_ms = settings.DEADLINE_SEARCH_RESERVE_MS
+        if not deadline.allows("serp", settings.DEADLINE_SERP_MIN_MS + reserve_ms):
+            return 0
+        
+        wait_ms = deadline.remaining_ms() - reserve_ms
+        return wait_ms / 1000 if wait_ms < self.timeout * 1000 else None
     
-    def _sync_call_serpapi(self, query: str, max_results: int) -> Dict:
-        """
-        SerpAPI 동기 호출
+    async def _fetch(self, params: Dict, cache_key: tuple) -> List[Dict]:
+        """SerpAPI 호출 → 파싱 → 캐시 저장"""
         
-        Args:
-            query: 검색 쿼리
-            max_results: 최대 결과 개수
+        # 전체 소요 시간 제한 (초과 시 요청이 취소되고 연결은 풀에서 정리됨)
+        async with self.bulkhead.slot():
+            results = await asyncio.wait_for(
+                self._call_serpapi(params),
+                timeout=self.timeout
+            )
         
-        Returns:
-            SerpAPI 응답
-        """
-        # 쿼리 앞에 프리픽스 추가
+        parsed_results = self._parse_results(results)
+        self.cache.set(cache_key, parsed_results)
+        
+        return parsed_results
+    
+    def _build_params(self, query: str, max_results: int) -> Dict:
+        """SerpAPI 요청 파라미터 (쿼리 앞에 프리픽스 추가)"""
         enhanced_query = f"[증상에 따른 영양제 또는 약 추천] {query}"
         
-        params = {
+        return {
+            "engine": "google",
             "q": enhanced_query,
-            "location": "South Korea",
-            "hl": "ko",
-            "gl": "kr",
+            "location": self.LOCATION,
+            "hl": self.LANGUAGE,
+            "gl": self.COUNTRY,
             "num": max_results,
             "api_key": self.api_key
         }
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=settings.SERP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.SERP_MAX_CONNECTIONS
+                )
+            )
+        return self._client
+    
+    async def _call_serpapi(self, params: Dict) -> Dict:
+        """
+        SerpAPI 호출
+        
+        Args:
+            params: _build_params 결과
         
-        logger.info(f"SERP 검색 쿼리: '{enhanced_query}'")
+        Returns:
+            SerpAPI 응답
+        """
+        logger.info(f"SERP 검색 쿼리: '{params['q']}'")
         
-        search = GoogleSearch(params)
-        return search.get_dict()
+        response = await self._get_client().get("/search.json", params=params)
+        response.raise_for_status()
+        return response.json()
+    
+    async def aclose(self):
+        """연결 풀 종료 (lifespan 종료 시)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     def _parse_results(self, raw_results: Dict) -> List[Dict]:
         """
@@ -172,7 +266,13 @@ class SerpService:
             "enabled": self.enabled,
             "api_key_configured": bool(self.api_key),
             "max_results": self.max_results,
-            "timeout": self.timeout
+            "timeout": self.timeout,
+            "base_url": self.base_url,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "cache": self.cache.stats(),
+            "single_flight": self.flight.get_stats(),
+            "bulkhead": self.bulkhead.get_stats()
         }
 
 
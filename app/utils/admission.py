@@ -0,0 +1,266 @@
+"""
+요청 수용 제어 (Admission Control)
+
+과부하 시 모든 엔드포인트가 함께 느려지지 않도록 엔드포인트 종류별 처리 레인을 나누고,
+레인마다 동시 처리 수와 대기열 크기를 제한합니다.
+
+- cheap    : 메모리 안에서 끝나는 요청 (복용 시간 추천, 캐시/상태 조회)
+- default  : 일반 검색/추천, 제품 조회 (Elasticsearch 검색/조회)
+- expensive: 지능형 검색, Gemini 추천, SERP 검색 (임베딩/외부 API 호출)
+- /api/v1 밖의 경로(/health, /metrics 등)는 제한 없이 통과
+
+레인 한도를 넘는 요청은 레인 대기열에서 순서대로 기다리며,
+대기가 ADMISSION_{LANE}_MAX_WAIT_MS를 넘을 것으로 예상되면(대기 인원 × 평균 처리 시간 / 동시 처리 수)
+기다리지 않고 바로 503 + Retry-After로 거절합니다. 대기열이 가득 찼거나 실제 대기가 한도를 넘어도 거절합니다.
+무거운 요청이 몰려도 cheap 레인 요청은 자기 레인만 기다리므로 지연이 낮게 유지됩니다.
+
+레인별 대기 시간/대기열 길이/처리 중 요청 수/거절 수는 /metrics 와 /health/admission 으로 노출합니다.
+이벤트 루프 안에서만 사용합니다. (스레드 안전하지 않음)
+"""
+from typing import Deque, Dict, Optional
+from collections import deque
+import asyncio
+import math
+import time
+from starlette.responses import JSONResponse
+from app.core.config import settings
+from app.utils.metrics import (
+    ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_QUEUE_WAIT, ADMISSION_SHED, record_stage
+)
+from app.utils.logger import get_logger
+
+config = settings
+logger = get_logger(__name__)
+
+LANES = ("cheap", "default", "expensive")
+
+
+class AdmissionRejected(Exception):
+    """레인이 요청을 거절함 (retry_after: 권장 재시도 대기 초)"""
+
+    def __init__(self, lane: str, reason: str, retry_after: int):
+        super().__init__(f"{lane} 레인 요청 거절: {reason}")
+        self.lane = lane
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionLane:
+    """동시 처리 수 + 크기 고정 대기열 + 예상 대기 기반 조기 거절"""
+
+    # 평균 처리 시간 지수 이동 평균 가중치
+    EMA_ALPHA = 0.1
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, max_wait_ms: float):
+        """
+        Args:
+            name: 레인 이름 (메트릭 라벨)
+            concurrency: 동시 처리 수
+            queue_size: 대기 가능한 요청 수
+            max_wait_ms: 최대 대기 시간(ms), 예상/실제 대기가 넘으면 거절
+        """
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self.max_wait = max_wait_ms / 1000
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        # 요청 하나의 평균 처리 시간(초), 첫 완료 전에는 예상 대기 계산 안 함
+        self.service_time: Optional[float] = None
+
+        self.admitted = 0
+
+    async def acquire(self) -> float:
+        """자리 확보 (대기 시간(초) 반환, 거절 시 AdmissionRejected)"""
+
+        if self.in_flight < self.concurrency and not self._waiters:
+            self._enter()
+            return 0.0
+
+        if len(self._waiters) >= self.queue_size:
+            self._reject("queue_full")
+
+        expected_wait = self.expected_wait()
+        if expected_wait > self.max_wait:
+            self._reject("expected_wait", expected_wait)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        started = time.monotonic()
+
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._remove_waiter(waiter)
+            self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            # 자리를 넘겨받은 직후 연결이 끊긴 경우 다음 대기자에게 반환
+            if not self._remove_waiter(waiter) and waiter.done() and not waiter.cancelled():
+                self.release(None)
+            raise
+
+        self.admitted += 1
+        return time.monotonic() - started
+
+    def release(self, elapsed: Optional[float]):
+        """처리 완료 (elapsed: 처리 시간(초), None이면 평균에 반영하지 않음)"""
+
+        self.in_flight -= 1
+
+        if elapsed is not None:
+            if self.service_time is None:
+                self.service_time = elapsed
+            else:
+                self.service_time += self.EMA_ALPHA * (elapsed - self.service_time)
+
+        while self._waiters and self.in_flight < self.concurrency:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+        self._update_gauges()
+
+    def expected_wait(self) -> float:
+        """지금 대기열 맨 뒤에 들어가면 기다릴 것으로 예상되는 시간(초)"""
+
+        if self.service_time is None:
+            return 0.0
+        return (len(self._waiters) + 1) * self.service_time / self.concurrency
+
+    def _enter(self):
+        self.in_flight += 1
+        self.admitted += 1
+        self._update_gauges()
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> bool:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            return False
+        self._update_gauges()
+        return True
+
+    def _reject(self, reason: str, expected_wait: float = None):
+        ADMISSION_SHED.inc((self.name, reason))
+
+        wait = expected_wait if expected_wait is not None else max(self.expected_wait(), self.max_wait)
+        retry_after = min(max(1, math.ceil(wait)), config.ADMISSION_MAX_RETRY_AFTER_SECONDS)
+
+        logger.warning(
+            f"요청 거절: {self.name} 레인 {reason} "
+            f"(처리 중 {self.in_flight}, 대기 {len(self._waiters)}, Retry-After {retry_after}s)"
+        )
+        raise AdmissionRejected(self.name, reason, retry_after)
+
+    def _update_gauges(self):
+        ADMISSION_IN_FLIGHT.set((self.name,), self.in_flight)
+        ADMISSION_QUEUE_DEPTH.set((self.name,), len(self._waiters))
+
+    def get_stats(self) -> Dict:
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "queue_size": self.queue_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "service_time_ms": round(self.service_time * 1000, 1) if self.service_time is not None else None,
+            "expected_wait_ms": round(self.expected_wait() * 1000, 1),
+            "admitted": self.admitted,
+            "shed": {
+                reason: int(ADMISSION_SHED.value((self.name, reason)))
+                for reason in ("queue_full", "expected_wait", "queue_timeout")
+            }
+        }
+
+
+_lanes: Dict[str, AdmissionLane] = {}
+
+
+def get_lane(name: str) -> AdmissionLane:
+    """레인별 공용 인스턴스 (설정: ADMISSION_{LANE}_CONCURRENCY / _QUEUE_SIZE / _MAX_WAIT_MS)"""
+
+    lane = _lanes.get(name)
+    if lane is None:
+        prefix = f"ADMISSION_{name.upper()}"
+        lane = _lanes[name] = AdmissionLane(
+            name,
+            concurrency=getattr(config, f"{prefix}_CONCURRENCY"),
+            queue_size=getattr(config, f"{prefix}_QUEUE_SIZE"),
+            max_wait_ms=getattr(config, f"{prefix}_MAX_WAIT_MS")
+        )
+    return lane
+
+
+def _matches(path: str, prefixes) -> bool:
+    """path가 prefixes 중 하나와 같거나 그 하위 경로인지 (경로 구간 단위 비교: /rag/product ≠ /rag/products)"""
+
+    for prefix in prefixes:
+        prefix = prefix.rstrip("/")
+        if path == prefix or path.startswith(prefix + "/"):
+            return True
+    return False
+
+
+def classify_path(path: str) -> Optional[str]:
+    """요청 경로의 레인 (/api/v1 밖의 경로는 None - 제한 없음)"""
+
+    if not path.startswith(config.API_V1_STR):
+        return None
+
+    path = path[len(config.API_V1_STR):]
+    if _matches(path, config.ADMISSION_EXPENSIVE_PATHS):
+        return "expensive"
+    if _matches(path, config.ADMISSION_CHEAP_PATHS):
+        return "cheap"
+    return "default"
+
+
+def get_admission_stats() -> Dict:
+    return {
+        "enabled": config.ADMISSION_ENABLED,
+        "lanes": {name: get_lane(name).get_stats() for name in LANES}
+    }
+
+
+class AdmissionControlMiddleware:
+    """경로별 레인에서 자리를 확보한 요청만 처리하고, 거절 시 503 + Retry-After를 반환하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        lane_name = classify_path(scope["path"]) if scope["type"] == "http" else None
+        if lane_name is None or not config.ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        lane = get_lane(lane_name)
+
+        try:
+            waited = await lane.acquire()
+        except AdmissionRejected as e:
+            response = JSONResponse(
+                status_code=503,
+                content={'detail': '요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.'},
+                headers={'Retry-After': str(e.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        if config.METRICS_ENABLED:
+            ADMISSION_QUEUE_WAIT.observe((lane_name,), waited)
+            if waited > 0:
+                record_stage("queue", waited * 1000)
+
+        started = time.monotonic()
+        elapsed = None
+        try:
+            await self.app(scope, receive, send)
+            elapsed = time.monotonic() - started
+        finally:
+            lane.release(elapsed)
@@ -0,0 +1,279 @@
+"""
+외부 API 격벽 (Bulkhead)
+
+Gemini/SERP처럼 느리거나 요청 제한(429)이 있는 외부 API마다 동시 호출 수를 따로 제한하여
+트래픽 급증이 외부 API 장애나 스레드 고갈로 번지지 않게 합니다.
+
+- 동시 호출 한도를 넘는 요청은 크기가 고정된 대기열에서 queue_timeout까지만 대기
+  (대기열이 가득 차거나 시간이 지나면 즉시 UpstreamUnavailable)
+- AIMD 동시성 조절: 목표 지연 이내 성공 시 한도를 조금씩 늘리고,
+  429/타임아웃/목표 지연 초과 시 한도를 곱셈으로 줄임
+- 서킷 브레이커: 연속 실패가 임계값에 도달하면 open_seconds 동안 즉시 거절한 뒤
+  시험 호출 하나(half-open)가 성공하면 다시 정상 상태로 복귀
+
+호출 측은 UpstreamUnavailable을 받으면 외부 API 없이 만들 수 있는 응답(RAG 결과만)으로 대체합니다.
+이벤트 루프 안에서만 사용합니다. (스레드 안전하지 않음)
+"""
+from typing import Deque, Dict
+from collections import deque
+from contextlib import asynccontextmanager
+import asyncio
+import time
+from app.core.config import settings
+from app.utils.metrics import BULKHEAD_REJECTIONS
+from app.utils.logger import get_logger
+
+config = settings
+logger = get_logger(__name__)
+
+
+class UpstreamUnavailable(Exception):
+    """격벽/서킷 브레이커가 외부 API 호출을 거절함"""
+
+    def __init__(self, upstream: str, reason: str):
+        super().__init__(f"{upstream} 호출 거절: {reason}")
+        self.upstream = upstream
+        self.reason = reason
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """요청 제한(429)/과부하(503)/타임아웃 여부"""
+
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return True
+
+    status = getattr(error, "code", None) or getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+
+    return status in (429, 503)
+
+
+class Bulkhead:
+    """외부 API별 동시성 제한 + 대기열 + AIMD + 서킷 브레이커"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        queue_size: int,
+        queue_timeout: float,
+        latency_target: float,
+        failure_threshold: int = None,
+        open_seconds: float = None
+    ):
+        """
+        Args:
+            name: 외부 API 이름 (메트릭 라벨)
+            initial_limit / min_limit / max_limit: 동시 호출 한도 (AIMD 조절 범위)
+            queue_size: 한도 초과 시 대기 가능한 요청 수
+            queue_timeout: 대기열 최대 대기 시간(초)
+            latency_target: 목표 지연(초), 초과 시 한도 감소
+            failure_threshold: 서킷을 여는 연속 실패 수
+            open_seconds: 서킷 open 유지 시간(초)
+        """
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.failure_threshold = failure_threshold or config.BULKHEAD_FAILURE_THRESHOLD
+        self.open_seconds = open_seconds if open_seconds is not None else config.BULKHEAD_OPEN_SECONDS
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+        self.completed = 0
+        self.failures = 0
+        self.overloads = 0
+
+    # ------------------------------------------------------------------
+    # 사용
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def slot(self):
+        """호출 구간: 진입 시 자리 확보(대기/거절), 종료 시 결과로 한도와 서킷 상태 갱신"""
+
+        await self.acquire()
+        started = time.monotonic()
+        outcome = "cancelled"
+
+        try:
+            yield
+            outcome = "success"
+        except Exception as e:
+            outcome = "overload" if is_overload_error(e) else "error"
+            raise
+        finally:
+            self.release(outcome, time.monotonic() - started)
+
+    async def acquire(self):
+        self._check_circuit()
+
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._remove_waiter(waiter)
+            self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            # 자리를 넘겨받은 직후 취소된 경우 다음 대기자에게 반환
+            if not self._remove_waiter(waiter) and waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            raise
+
+    def release(self, outcome: str, elapsed: float):
+        self.in_flight -= 1
+
+        if outcome == "success":
+            self.completed += 1
+            self._on_success(elapsed)
+        elif outcome in ("overload", "error"):
+            self.failures += 1
+            self._on_failure(overload=(outcome == "overload"))
+        else:
+            # 취소된 시험 호출은 결과 없이 다음 시험 호출 허용
+            self._probing = False
+
+        self._wake()
+
+    # ------------------------------------------------------------------
+    # AIMD / 서킷
+    # ------------------------------------------------------------------
+
+    def _on_success(self, elapsed: float):
+        if elapsed > self.latency_target:
+            # 목표 지연 초과: 완만하게 감소
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        else:
+            # 한도 하나를 채울 때마다 약 1 증가
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+        self.consecutive_failures = 0
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self._probing = False
+            logger.info(f"서킷 복구: {self.name}")
+
+    def _on_failure(self, overload: bool):
+        if overload:
+            self.overloads += 1
+            self.limit = max(self.min_limit, self.limit * 0.5)
+
+        self.consecutive_failures += 1
+
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(
+                    f"서킷 open: {self.name} (연속 실패 {self.consecutive_failures}회, "
+                    f"{self.open_seconds}초 동안 즉시 거절)"
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+    def _check_circuit(self):
+        if self.state == self.CLOSED:
+            return
+
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self._reject("circuit_open")
+            self.state = self.HALF_OPEN
+            self._probing = False
+
+        # half-open: 시험 호출 하나만 허용
+        if self._probing:
+            self._reject("circuit_half_open")
+        self._probing = True
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> bool:
+        try:
+            self._waiters.remove(waiter)
+            return True
+        except ValueError:
+            return False
+
+    def _reject(self, reason: str):
+        if self.state == self.HALF_OPEN and reason.startswith("queue"):
+            # 대기열에서 거절된 시험 호출은 다음 요청이 대신 시험
+            self._probing = False
+        BULKHEAD_REJECTIONS.inc((self.name, reason))
+        raise UpstreamUnavailable(self.name, reason)
+
+    def get_stats(self) -> Dict:
+        return {
+            "limit": round(self.limit, 2),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "queue_size": self.queue_size,
+            "circuit": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "completed": self.completed,
+            "failures": self.failures,
+            "overloads": self.overloads,
+            "rejected": {
+                reason: int(BULKHEAD_REJECTIONS.value((self.name, reason)))
+                for reason in ("queue_full", "queue_timeout", "circuit_open", "circuit_half_open")
+            }
+        }
+
+
+_registry: Dict[str, Bulkhead] = {}
+
+
+def get_bulkhead(name: str) -> Bulkhead:
+    """외부 API별 공용 격벽 (설정: {NAME}_CONCURRENCY_* / {NAME}_QUEUE_* / {NAME}_LATENCY_TARGET_SECONDS)"""
+
+    bulkhead = _registry.get(name)
+    if bulkhead is None:
+        prefix = name.upper()
+        bulkhead = _registry[name] = Bulkhead(
+            name,
+            initial_limit=getattr(config, f"{prefix}_CONCURRENCY_INITIAL"),
+            min_limit=getattr(config, f"{prefix}_CONCURRENCY_MIN"),
+            max_limit=getattr(config, f"{prefix}_CONCURRENCY_MAX"),
+            queue_size=getattr(config, f"{prefix}_QUEUE_SIZE"),
+            queue_timeout=getattr(config, f"{prefix}_QUEUE_TIMEOUT_SECONDS"),
+            latency_target=getattr(config, f"{prefix}_LATENCY_TARGET_SECONDS")
+        )
+    return bulkhead
+
+
+def get_bulkhead_stats() -> Dict[str, Dict]:
+    return {name: bulkhead.get_stats() for name, bulkhead in _registry.items()}
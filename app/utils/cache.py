@@ -0,0 +1,115 @@
+"""
+인메모리 캐시 유틸리티
+
+스레드 안전한 LRU 캐시(선택적 TTL)를 제공합니다.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import threading
+import time
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """스레드 안전 LRU 캐시 (선택적 TTL)"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목 제거)
+            ttl: 항목 유효 시간(초). None이면 만료 없음
+        """
+        self.maxsize = max(int(maxsize), 1)
+        self.ttl = ttl
+
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """캐시 조회 (만료된 항목은 제거 후 miss 처리)"""
+
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """캐시 저장 (ttl 미지정 시 캐시 기본 TTL 사용)"""
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = (value, expires_at)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """항목 제거"""
+
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+
+        if entry is _MISSING:
+            return default
+        return entry[0]
+
+    def clear(self):
+        """전체 항목 제거"""
+
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+
+        if entry is _MISSING:
+            return False
+
+        expires_at = entry[1]
+        return expires_at is None or expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        """캐시 통계"""
+
+        total = self.hits + self.misses
+
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
@@ -0,0 +1,145 @@
+"""
+요청 시간 예산 (Deadline)
+
+지능형 검색 요청 하나의 전체 시간 예산을 정하고, 파이프라인 각 단계가 남은 시간을 확인하여
+선택 단계(SERP, 다양성 검색/재정렬, Cross-Encoder, 추가 정보 보강)를 생략하거나
+Elasticsearch 요청에 timeout을 넘겨 응답 지연이 예산을 크게 넘지 않게 합니다.
+
+- deadline_scope(budget_ms): 요청 처리 구간에 예산을 설정 (contextvars로 전달되므로
+  asyncio.to_thread/threadpool에서 실행되는 동기 단계도 같은 예산을 봄)
+- within_deadline(step, min_ms): 남은 시간이 min_ms보다 많으면 True, 아니면 생략 기록 후 False
+- 예산이 설정되지 않은 호출(배치 작업, 사전 계산 등)은 항상 True (기존 동작 유지)
+- 생략된 단계와 ES 부분 결과(es_timeout)는 응답의 deadline.degraded 와 /metrics 의 yakkobak_deadline_degraded_total 로 노출
+- deadline_branch(): 구간 안에서 기록된 생략 단계만 따로 수집 (병합된 호출의 결과와 함께 다른 대기자에게 전달)
+"""
+from typing import Dict, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+from app.core.config import settings
+from app.utils.metrics import DEADLINE_DEGRADED
+from app.utils.logger import get_logger
+
+config = settings
+logger = get_logger(__name__)
+
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar("current_deadline", default=None)
+
+
+class Deadline:
+    """요청별 시간 예산"""
+
+    def __init__(self, budget_ms: float, parent: Optional["Deadline"] = None):
+        """
+        Args:
+            budget_ms: 전체 예산(ms)
+            parent: 상위 예산 (지정 시 시작/만료 시각을 공유하고 생략 기록을 상위에도 반영)
+        """
+        self.budget_ms = budget_ms
+        self.parent = parent
+
+        if parent is None:
+            self.started = time.perf_counter()
+            self.expires_at = self.started + budget_ms / 1000
+        else:
+            self.started = parent.started
+            self.expires_at = parent.expires_at
+
+        # 생략/단축된 단계 (기록 순서 유지)
+        self.degraded: List[str] = []
+
+    def remaining_ms(self) -> float:
+        return max(0.0, (self.expires_at - time.perf_counter()) * 1000)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.expires_at
+
+    def allows(self, step: str, min_ms: float = 0.0) -> bool:
+        """남은 시간이 min_ms보다 많은지 확인 (부족하면 단계 생략 기록)"""
+
+        remaining = self.remaining_ms()
+        if remaining > min_ms:
+            return True
+
+        logger.info(f"시간 예산 부족으로 생략: {step} (잔여 {remaining:.0f}ms, 필요 {min_ms:.0f}ms)")
+        self.degrade(step)
+        return False
+
+    def degrade(self, step: str):
+        if step in self.degraded:
+            return
+
+        self.degraded.append(step)
+        if self.parent is not None:
+            self.parent.degrade(step)
+        else:
+            DEADLINE_DEGRADED.inc((step,))
+
+    def branch(self) -> "Deadline":
+        return Deadline(self.budget_ms, parent=self)
+
+    def summary(self) -> Dict:
+        return {
+            "budget_ms": self.budget_ms,
+            "elapsed_ms": round(self.elapsed_ms(), 1),
+            "degraded": list(self.degraded)
+        }
+
+
+@contextmanager
+def deadline_scope(budget_ms: Optional[float] = None):
+    """요청 처리 구간에 시간 예산 설정 (None이면 DEADLINE_DEFAULT_MS)"""
+
+    deadline = Deadline(budget_ms or config.DEADLINE_DEFAULT_MS)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+@contextmanager
+def deadline_branch():
+    """구간 안에서 생략/단축된 단계만 따로 수집 (예산이 없으면 None)"""
+
+    parent = _current_deadline.get()
+    if parent is None:
+        yield None
+        return
+
+    branch = parent.branch()
+    token = _current_deadline.set(branch)
+    try:
+        yield branch
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def within_deadline(step: str, min_ms: float = 0.0) -> bool:
+    """진행 중인 요청의 예산 안에서 step을 실행할 수 있는지 여부 (예산이 없으면 True)"""
+
+    deadline = _current_deadline.get()
+    return deadline is None or deadline.allows(step, min_ms)
+
+
+def deadline_timeout_ms(cap_ms: float, floor_ms: float = 0.0) -> Optional[float]:
+    """
+    외부 호출에 넘길 제한 시간(ms)
+
+    남은 시간이 cap_ms(호출 측 기본 제한) 이상이거나 예산이 없으면 None (기본 제한 사용),
+    부족하면 남은 시간(최소 floor_ms)
+    """
+
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+
+    remaining = deadline.remaining_ms()
+    return None if remaining >= cap_ms else max(remaining, floor_ms)
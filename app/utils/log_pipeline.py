@@ -0,0 +1,342 @@
+"""
+비동기 로그 파이프라인 (Log Pipeline)
+
+모든 모듈 로거는 하나의 QueueHandler를 공유하고, 로그 레코드는 큐에 넣는 즉시 반환됩니다.
+단일 백그라운드 리스너 스레드가 큐에서 레코드를 묶음으로 꺼내
+콘솔/파일에는 배치 단위로 쓰고, Elasticsearch(LOG_ES_INDEX) 전송 버퍼에 넣습니다.
+ES bulk 전송은 별도 전송 스레드가 담당하므로 ES가 느려도 콘솔/파일 기록은 지연되지 않습니다.
+
+- 큐와 ES 전송 버퍼는 크기가 고정되어 있으며, 가득 차면 레코드를 버리고 카운터를 올립니다.
+  (로깅 때문에 요청 처리가 막히지 않도록 절대 대기하지 않음)
+- ES 전송은 LOG_ES_REQUEST_TIMEOUT_SECONDS로 제한하며,
+  실패 시 배치를 버퍼로 되돌리고 LOG_ES_RETRY_SECONDS 후 재시도합니다.
+"""
+from typing import Dict, List, Optional
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, TimedRotatingFileHandler
+import atexit
+import logging
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from app.core.config import settings
+
+config = settings
+
+LOG_FORMAT = '[%(asctime)s] %(levelname)s in %(name)s: %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class DroppingQueueHandler(QueueHandler):
+    """큐가 가득 차면 대기하지 않고 레코드를 버리는 QueueHandler"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지 인자만 미리 합치고, 포맷팅은 리스너 스레드에서 수행
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchFileSink:
+    """일자별 로테이션 파일에 배치 단위로 기록 (배치당 flush 1회)"""
+
+    def __init__(self, path: str, formatter: logging.Formatter):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # 매일 자정에 로테이션, 최근 30일 보관 (로테이션된 파일명 형식: app.log.2025-11-26)
+        self.handler = TimedRotatingFileHandler(
+            path,
+            when='midnight',
+            interval=1,
+            backupCount=30,
+            encoding='utf-8',
+            utc=False
+        )
+        self.handler.suffix = "%Y-%m-%d"
+        self.formatter = formatter
+
+    def write(self, records: List[logging.LogRecord]):
+        handler = self.handler
+
+        if handler.shouldRollover(records[0]):
+            handler.doRollover()
+        if handler.stream is None:
+            handler.stream = handler._open()
+
+        handler.stream.write(
+            "".join(self.formatter.format(record) + "\n" for record in records)
+        )
+        handler.stream.flush()
+
+    def close(self):
+        self.handler.close()
+
+
+class ElasticsearchSink:
+    """LOG_ES_INDEX로 bulk 전송하는 제한 크기 버퍼 (전용 전송 스레드)"""
+
+    def __init__(self, index_prefix: str, buffer_size: int, batch_size: int):
+        self.index_prefix = index_prefix
+        self.buffer = deque()
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+
+        self.host = socket.gethostname()
+        self.retry_at = 0.0
+
+        self.shipped = 0
+        self.dropped = 0
+        self.failures = 0
+
+        # 리스너 스레드(add)와 전송 스레드(ship)가 버퍼를 공유
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-pipeline-es", daemon=True)
+        self._thread.start()
+
+    def add(self, records: List[logging.LogRecord]):
+        documents = [self._to_document(record) for record in records]
+
+        with self._lock:
+            for document in documents:
+                if len(self.buffer) >= self.buffer_size:
+                    # 가장 오래된 로그부터 버림
+                    self.buffer.popleft()
+                    self.dropped += 1
+                self.buffer.append(document)
+            full = len(self.buffer) >= self.batch_size
+
+        if full:
+            self._wakeup.set()
+
+    def _run(self):
+        """배치 크기가 차거나 LOG_FLUSH_INTERVAL_SECONDS마다 전송, 종료 시 남은 버퍼 전송"""
+
+        while True:
+            woken = self._wakeup.wait(config.LOG_FLUSH_INTERVAL_SECONDS)
+            self._wakeup.clear()
+
+            stopping = self._stop.is_set()
+            self.ship(force=not woken or stopping)
+            if stopping:
+                return
+
+    def ship(self, force: bool = False):
+        """버퍼가 배치 크기 이상이거나 force일 때 전송 (실패 시 재시도 대기)"""
+
+        if time.monotonic() < self.retry_at:
+            return
+
+        from elasticsearch import helpers
+        from app.core.elasticsearch_config import get_elasticsearch_client
+
+        client = get_elasticsearch_client("bulk").options(
+            request_timeout=config.LOG_ES_REQUEST_TIMEOUT_SECONDS,
+            max_retries=0
+        )
+
+        while True:
+            with self._lock:
+                if not self.buffer or (not force and len(self.buffer) < self.batch_size):
+                    return
+                batch = [self.buffer.popleft() for _ in range(min(self.batch_size, len(self.buffer)))]
+
+            try:
+                success, errors = helpers.bulk(
+                    client,
+                    batch,
+                    raise_on_error=False,
+                    stats_only=True
+                )
+            except Exception as e:
+                self._requeue(batch)
+                self.failures += 1
+                self.retry_at = time.monotonic() + config.LOG_ES_RETRY_SECONDS
+                print(f"[log-pipeline] Elasticsearch 로그 전송 실패: {e}", file=sys.stderr)
+                return
+
+            self.shipped += success
+            self.dropped += errors
+
+    def _requeue(self, batch: List[Dict]):
+        """전송 실패한 배치를 버퍼 앞쪽으로 되돌림 (전송 중 쌓인 로그로 자리가 부족하면 오래된 것부터 버림)"""
+
+        with self._lock:
+            room = self.buffer_size - len(self.buffer)
+            if room < len(batch):
+                self.dropped += len(batch) - room
+                batch = batch[len(batch) - room:]
+            self.buffer.extendleft(reversed(batch))
+
+    def stop(self, timeout: float = 5.0):
+        """남은 버퍼 전송 후 전송 스레드 종료"""
+
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+    def _to_document(self, record: logging.LogRecord) -> Dict:
+        timestamp = datetime.fromtimestamp(record.created, tz=timezone.utc)
+
+        document = {
+            "timestamp": timestamp.isoformat(),
+            "name": record.name,
+            "levelname": record.levelname,
+            "message": record.msg,
+            "module": record.module,
+            "funcName": record.funcName,
+            "lineno": record.lineno,
+            "host": self.host,
+            "app": config.PROJECT_NAME,
+            "environment": "development"
+        }
+        if record.exc_text:
+            document["exc_text"] = record.exc_text
+
+        # 일자별 인덱스 (예: yakkobak-logs-2025.11.26)
+        return {
+            "_index": f"{self.index_prefix}-{timestamp.strftime('%Y.%m.%d')}",
+            "_source": document
+        }
+
+
+class LogPipeline:
+    """QueueHandler + 단일 리스너 스레드"""
+
+    def __init__(self):
+        self.formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+
+        self.queue: queue.Queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+        self.handler = DroppingQueueHandler(self.queue)
+
+        self.console = sys.stderr
+        self.file_sink = BatchFileSink(config.LOG_FILE, self.formatter) if config.LOG_FILE else None
+        self.es_sink = None
+        if config.LOG_TO_ELASTICSEARCH:
+            self.es_sink = ElasticsearchSink(
+                config.LOG_ES_INDEX,
+                buffer_size=config.LOG_ES_BUFFER_SIZE,
+                batch_size=config.LOG_BATCH_SIZE
+            )
+
+        self.batches = 0
+        self.sink_errors = 0
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-pipeline", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not (self._stop.is_set() and self.queue.empty()):
+            records = self._drain(timeout=config.LOG_FLUSH_INTERVAL_SECONDS)
+
+            if records:
+                self._write(records)
+
+    def _drain(self, timeout: float) -> List[logging.LogRecord]:
+        """첫 레코드는 timeout까지 대기, 이후는 배치 크기까지 대기 없이 꺼냄"""
+
+        try:
+            records = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+        while len(records) < config.LOG_BATCH_SIZE:
+            try:
+                records.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return records
+
+    def _write(self, records: List[logging.LogRecord]):
+        self.batches += 1
+
+        try:
+            self.console.write("".join(self.formatter.format(record) + "\n" for record in records))
+            self.console.flush()
+        except Exception:
+            self.sink_errors += 1
+
+        if self.file_sink:
+            try:
+                self.file_sink.write(records)
+            except Exception as e:
+                self.sink_errors += 1
+                print(f"[log-pipeline] 로그 파일 기록 실패: {e}", file=sys.stderr)
+
+        if self.es_sink:
+            self.es_sink.add(records)
+
+    def stop(self, timeout: float = 5.0):
+        """남은 레코드를 기록/전송한 뒤 리스너 종료"""
+
+        self._stop.set()
+        self._thread.join(timeout)
+        if self.es_sink:
+            self.es_sink.stop(timeout)
+        if self.file_sink:
+            self.file_sink.close()
+
+    def get_stats(self) -> Dict:
+        stats = {
+            "queue_size": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "enqueued": self.handler.enqueued,
+            "dropped": self.handler.dropped,
+            "batches": self.batches,
+            "sink_errors": self.sink_errors
+        }
+        if self.es_sink:
+            stats["elasticsearch"] = {
+                "buffered": len(self.es_sink.buffer),
+                "buffer_capacity": self.es_sink.buffer_size,
+                "shipped": self.es_sink.shipped,
+                "dropped": self.es_sink.dropped,
+                "failures": self.es_sink.failures
+            }
+        return stats
+
+
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_log_pipeline() -> LogPipeline:
+    """프로세스 공용 로그 파이프라인 (최초 호출 시 리스너 시작)"""
+    global _pipeline
+
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = LogPipeline()
+                atexit.register(_pipeline.stop)
+
+    return _pipeline
+
+
+def get_log_stats() -> Dict:
+    """로그 파이프라인 통계 (큐 적재/버림 카운터, ES 전송 현황)"""
+    if _pipeline is None:
+        return {"initialized": False}
+    return _pipeline.get_stats()
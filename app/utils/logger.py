@@ -1,84 +1,25 @@
 import logging
-import os
-from logging.handlers import TimedRotatingFileHandler
-
-# 선택적 import - Elasticsearch 로깅 라이브러리
-try:
-    from pythonjsonlogger import jsonlogger
-    from cmreslogging.handlers import CMRESHandler
-    ES_LOGGING_AVAILABLE = True
-except ImportError:
-    ES_LOGGING_AVAILABLE = False
 
 from app.core.config import settings
+from app.utils.log_pipeline import get_log_pipeline
 
 config = settings
 
 def get_logger(name: str) -> logging.Logger:
-    """로거 생성"""
-    
+    """로거 생성
+
+    모든 로거는 공용 QueueHandler 하나만 가지며,
+    콘솔/파일(일자별 로테이션)/Elasticsearch(Kibana 대시보드용) 기록은
+    app.utils.log_pipeline의 백그라운드 리스너가 배치로 처리합니다.
+    """
+
     logger = logging.getLogger(name)
-    
+
     # 이미 핸들러가 설정되어 있으면 반환
     if logger.handlers:
         return logger
-    
+
     logger.setLevel(getattr(logging, config.LOG_LEVEL))
-    
-    # 기본 포맷 설정
-    formatter = logging.Formatter(
-        '[%(asctime)s] %(levelname)s in %(name)s: %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # 콘솔 핸들러
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # 파일 핸들러 (일자별 로테이션)
-    if config.LOG_FILE:
-        os.makedirs(os.path.dirname(config.LOG_FILE), exist_ok=True)
-        
-        # TimedRotatingFileHandler: 매일 자정에 로그 파일 로테이션
-        file_handler = TimedRotatingFileHandler(
-            config.LOG_FILE,
-            when='midnight',        # 자정에 로테이션
-            interval=1,             # 1일마다
-            backupCount=30,         # 최근 30일 보관
-            encoding='utf-8',
-            utc=False               # 로컬 시간 사용
-        )
-        
-        # 로테이션된 파일명 형식: app.log.2025-11-26
-        file_handler.suffix = "%Y-%m-%d"
-        
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-    
-    # Elasticsearch 핸들러 (Kibana 대시보드용)
-    if ES_LOGGING_AVAILABLE and config.LOG_TO_ELASTICSEARCH:
-        try:
-            # JSON 포맷 설정 (Elasticsearch용)
-            json_formatter = jsonlogger.JsonFormatter(
-                '%(asctime)s %(name)s %(levelname)s %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            
-            es_handler = CMRESHandler(
-                hosts=[{'host': config.ES_HOST, 'port': config.ES_PORT}],
-                auth_type=CMRESHandler.AuthType.NO_AUTH,
-                es_index_name=config.LOG_ES_INDEX,
-                es_additional_fields={
-                    'app': config.PROJECT_NAME,
-                    'environment': 'development'
-                },
-                raise_on_indexing_exceptions=False  # 인덱싱 실패해도 앱은 계속 실행
-            )
-            es_handler.setFormatter(json_formatter)
-            logger.addHandler(es_handler)
-        except Exception as e:
-            # Elasticsearch 연결 실패 시 경고만 출력하고 계속 진행
-            logger.warning(f"Failed to connect to Elasticsearch for logging: {e}")
-    
-    return logger
\ No newline at end of file
+    logger.addHandler(get_log_pipeline().handler)
+
+    return logger
@@ -0,0 +1,328 @@
+"""
+단계별 지연 시간 계측 (Metrics)
+
+- stage("es"): 파이프라인 단계 타이머 (컨텍스트 매니저 / timed 데코레이터)
+- 단계별 히스토그램은 /metrics 에서 Prometheus 텍스트 형식으로 노출
+- ServerTimingMiddleware: 요청 중 기록된 단계 시간을 Server-Timing 응답 헤더로 반환
+  (헤더는 응답 시작 시점에 보내므로 스트리밍 응답은 본문에서 get_request_timings()로 전달)
+
+계측 비용은 perf_counter 두 번과 히스토그램 버킷 갱신 정도라 운영 환경에서도 켜 둡니다.
+요청별 단계 기록은 contextvars로 전달되므로 asyncio.to_thread/threadpool에서 실행되는
+동기 단계도 같은 요청에 기록됩니다.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import threading
+import time
+from app.core.config import settings
+
+config = settings
+
+# 히스토그램 버킷 상한 (초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 요청별 (단계명, 소요 시간 ms) 기록
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+
+class Histogram:
+    """라벨별 누적 히스토그램 (Prometheus histogram 형식)"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+
+        # labels → [버킷별 개수..., +Inf 개수], 합계
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], seconds: float):
+        index = bisect_left(self.buckets, seconds)
+
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+                self._sums[labels] = 0.0
+            counts[index] += 1
+            self._sums[labels] += seconds
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            snapshot = [(labels, list(counts), self._sums[labels]) for labels, counts in self._counts.items()]
+
+        for labels, counts, total in sorted(snapshot):
+            label_text = ",".join(f'{key}="{value}"' for key, value in zip(self.label_names, labels))
+            prefix = f"{label_text}," if label_text else ""
+
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+
+        return lines
+
+
+class Counter:
+    """라벨별 누적 카운터 (Prometheus counter 형식)"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Tuple[str, ...]) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+
+        with self._lock:
+            snapshot = sorted(self._values.items())
+
+        for labels, value in snapshot:
+            label_text = ",".join(f'{key}="{value}"' for key, value in zip(self.label_names, labels))
+            lines.append(f"{self.name}{{{label_text}}} {value:g}")
+
+        return lines
+
+
+class Gauge:
+    """라벨별 현재 값 (Prometheus gauge 형식)"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, labels: Tuple[str, ...], value: float):
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, labels: Tuple[str, ...]) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+
+        with self._lock:
+            snapshot = sorted(self._values.items())
+
+        for labels, value in snapshot:
+            label_text = ",".join(f'{key}="{value}"' for key, value in zip(self.label_names, labels))
+            lines.append(f"{self.name}{{{label_text}}} {value:g}")
+
+        return lines
+
+
+STAGE_DURATION = Histogram(
+    "yakkobak_stage_duration_seconds",
+    "Pipeline stage latency",
+    ("stage",)
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "yakkobak_http_request_duration_seconds",
+    "HTTP request latency",
+    ("method", "route", "status")
+)
+
+# LLM 프롬프트 토큰 수 추정치 (part: system/context/total)
+PROMPT_TOKENS = Histogram(
+    "yakkobak_prompt_tokens",
+    "Estimated LLM prompt tokens",
+    ("part",),
+    buckets=(128, 256, 512, 768, 1024, 1536, 2048, 4096, 8192)
+)
+
+# 동일 요청 병합 결과 (executed: 실제 호출, coalesced: 진행 중 호출 공유, error, timeout)
+SINGLE_FLIGHT_CALLS = Counter(
+    "yakkobak_single_flight_calls_total",
+    "Single-flight calls by outcome",
+    ("flight", "outcome")
+)
+
+# 격벽/서킷 브레이커 거절 (queue_full, queue_timeout, circuit_open, circuit_half_open)
+BULKHEAD_REJECTIONS = Counter(
+    "yakkobak_bulkhead_rejections_total",
+    "Upstream calls rejected by bulkhead",
+    ("upstream", "reason")
+)
+
+# 요청 시간 예산 부족으로 생략/단축된 단계 (serp, diversity_search, es_timeout, enhance 등)
+DEADLINE_DEGRADED = Counter(
+    "yakkobak_deadline_degraded_total",
+    "Pipeline steps skipped or shortened by request deadline",
+    ("step",)
+)
+
+# 요청 수용 제어 레인별 대기 시간/대기열 길이/처리 중 요청 수/거절 (app/utils/admission.py)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "yakkobak_admission_queue_wait_seconds",
+    "Time requests waited in admission lane queue",
+    ("lane",)
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "yakkobak_admission_queue_depth",
+    "Requests waiting in admission lane queue",
+    ("lane",)
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "yakkobak_admission_in_flight",
+    "Requests being processed per admission lane",
+    ("lane",)
+)
+
+# 거절 사유: queue_full, expected_wait(예상 대기 초과로 조기 거절), queue_timeout
+ADMISSION_SHED = Counter(
+    "yakkobak_admission_shed_total",
+    "Requests shed by admission control",
+    ("lane", "reason")
+)
+
+
+def record_stage(name: str, elapsed_ms: float):
+    """단계 소요 시간 기록 (히스토그램 + 진행 중인 요청의 Server-Timing)"""
+
+    STAGE_DURATION.observe((name,), elapsed_ms / 1000)
+
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, elapsed_ms))
+
+
+@contextmanager
+def stage(name: str):
+    """파이프라인 단계 타이머"""
+
+    if not config.METRICS_ENABLED:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, (time.perf_counter() - started) * 1000)
+
+
+def timed(name: str) -> Callable:
+    """함수 전체를 하나의 단계로 계측하는 데코레이터"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def render_prometheus() -> str:
+    """/metrics 응답 본문"""
+
+    lines = (
+        STAGE_DURATION.render()
+        + HTTP_REQUEST_DURATION.render()
+        + PROMPT_TOKENS.render()
+        + SINGLE_FLIGHT_CALLS.render()
+        + BULKHEAD_REJECTIONS.render()
+        + DEADLINE_DEGRADED.render()
+        + ADMISSION_QUEUE_WAIT.render()
+        + ADMISSION_QUEUE_DEPTH.render()
+        + ADMISSION_IN_FLIGHT.render()
+        + ADMISSION_SHED.render()
+    )
+    return "\n".join(lines) + "\n"
+
+
+def _merge_timings(timings: List[Tuple[str, float]]) -> Dict[str, float]:
+    """같은 단계는 합산 (기록 순서 유지)"""
+
+    merged: Dict[str, float] = {}
+    for name, elapsed_ms in timings:
+        merged[name] = merged.get(name, 0.0) + elapsed_ms
+    return merged
+
+
+def get_request_timings() -> Dict[str, float]:
+    """진행 중인 요청의 단계별 소요 시간(ms) - 응답 시작 후 기록된 단계 포함"""
+
+    timings = _request_timings.get()
+    if timings is None:
+        return {}
+    return {name: round(elapsed_ms, 1) for name, elapsed_ms in _merge_timings(timings).items()}
+
+
+def _server_timing_header(timings: List[Tuple[str, float]], total_ms: float) -> bytes:
+    """같은 단계는 합산하여 Server-Timing 헤더 값 구성 (기록 순서 유지)"""
+
+    parts = [f"{name};dur={elapsed_ms:.1f}" for name, elapsed_ms in _merge_timings(timings).items()]
+    parts.append(f"total;dur={total_ms:.1f}")
+
+    return ", ".join(parts).encode("latin-1")
+
+
+class ServerTimingMiddleware:
+    """요청별 단계 기록 컨텍스트를 열고 Server-Timing 헤더/요청 히스토그램을 기록하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if config.SERVER_TIMING_ENABLED:
+                    total_ms = (time.perf_counter() - started) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing_header(timings, total_ms)))
+                    message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_timings.reset(token)
+
+            # 경로 파라미터별로 라벨이 늘어나지 않도록 라우트 템플릿 사용
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(
+                (scope["method"], route_path, str(status["code"])),
+                time.perf_counter() - started
+            )
@@ -0,0 +1,16 @@
+"""
+응답 클래스
+
+FastAPI의 ORJSONResponse는 최근 버전에서 deprecated 되었으므로(응답 모델 직렬화로 대체),
+FastAPI 버전과 관계없이 같은 방식으로 동작하도록 starlette Response 위에 orjson 렌더링만 구현합니다.
+"""
+from typing import Any
+import orjson
+from starlette.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """orjson으로 직렬화하는 JSON 응답 (response_model 검증/exclude_none 처리 후 렌더링)"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
@@ -0,0 +1,274 @@
+"""
+동일 요청 병합 (Single-flight)
+
+같은 키로 동시에 들어온 호출은 진행 중인 첫 호출 하나의 결과를 함께 기다립니다.
+(인기 증상 쿼리가 몰려도 SERP/Gemini/ES 호출은 키당 한 번)
+
+- do(): 코루틴용. 실제 호출은 별도 Task로 실행되어 대기 중인 요청 하나가 끊겨도
+  나머지 대기자와 호출 자체는 취소되지 않음
+- do_sync(): 워커 스레드용 (threading.Event 대기)
+- 예외는 모든 대기자에게 그대로 전달, 대기 시간 초과 시 해당 대기자만 TimeoutError
+- 결과를 여러 호출자가 공유한 경우 각자 사본을 받음 (호출 측 결과 수정이 서로 영향 없음)
+- 호출 결과별 카운터는 /metrics 의 yakkobak_single_flight_calls_total 로 노출
+- coalesce(): 요청 시간 예산(deadline)이 있는 호출은 남은 예산 구간(SINGLE_FLIGHT_DEADLINE_BUCKET_MS)을 키에
+  포함하고, 대기는 남은 예산까지만 하며, 실제 호출 중 생략/단축된 단계(es_timeout 등)를 결과와 함께
+  모든 대기자의 예산에 기록
+"""
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from functools import wraps
+import asyncio
+import copy
+import inspect
+import threading
+from app.core.config import settings
+from app.utils.deadline import Deadline, current_deadline, deadline_branch
+from app.utils.metrics import SINGLE_FLIGHT_CALLS
+
+config = settings
+
+
+class SingleFlightTimeout(TimeoutError):
+    """진행 중인 호출 대기 시간 초과"""
+
+
+class _Call:
+    """진행 중인 동기 호출"""
+
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class _Flight:
+    """진행 중인 비동기 호출"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 1
+
+
+class SingleFlight:
+    """키 단위 동시 호출 병합"""
+
+    def __init__(self, name: str, timeout: float = None):
+        """
+        Args:
+            name: 메트릭 라벨
+            timeout: 기본 대기 제한(초). None이면 SINGLE_FLIGHT_TIMEOUT_SECONDS
+        """
+        self.name = name
+        self.timeout = timeout if timeout is not None else config.SINGLE_FLIGHT_TIMEOUT_SECONDS
+
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+        _registry[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable], timeout: float = None) -> Any:
+        """같은 키의 진행 중인 호출이 있으면 그 결과를, 없으면 fn()을 실행하여 반환"""
+
+        if not config.SINGLE_FLIGHT_ENABLED:
+            return await fn()
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.waiters += 1
+            self._count("coalesced")
+        else:
+            task = asyncio.ensure_future(fn())
+            flight = self._flights[key] = _Flight(task)
+            task.add_done_callback(lambda _: self._finish(key, flight))
+            self._count("executed")
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(flight.task), self._timeout(timeout))
+        except asyncio.TimeoutError:
+            self._count("timeout")
+            raise
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._count("error")
+            raise
+
+        # 대기자가 여럿이면 원본은 그대로 두고 각자 사본 사용
+        return copy.deepcopy(result) if flight.waiters > 1 else result
+
+    def do_sync(self, key: Hashable, fn: Callable[[], Any], timeout: float = None) -> Any:
+        """do()의 동기 버전 (워커 스레드에서 호출)"""
+
+        if not config.SINGLE_FLIGHT_ENABLED:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if leader:
+            self._count("executed")
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                    shared = call.waiters > 0
+                call.event.set()
+
+            if call.error is not None:
+                self._count("error")
+                raise call.error
+            return copy.deepcopy(call.result) if shared else call.result
+
+        self._count("coalesced")
+        if not call.event.wait(self._timeout(timeout)):
+            self._count("timeout")
+            raise SingleFlightTimeout(f"single-flight 대기 시간 초과: {self.name}")
+
+        if call.error is not None:
+            self._count("error")
+            raise call.error
+        return copy.deepcopy(call.result)
+
+    def in_flight(self) -> int:
+        return len(self._flights) + len(self._calls)
+
+    def _finish(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+        # 모든 대기자가 먼저 시간 초과된 경우에도 예외 미조회 경고가 남지 않도록 조회
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def _timeout(self, timeout: Optional[float]) -> Optional[float]:
+        timeout = self.timeout if timeout is None else timeout
+        return timeout if timeout and timeout > 0 else None
+
+    def _count(self, outcome: str):
+        SINGLE_FLIGHT_CALLS.inc((self.name, outcome))
+
+    def get_stats(self) -> Dict:
+        outcomes = ("executed", "coalesced", "error", "timeout")
+        stats = {outcome: int(SINGLE_FLIGHT_CALLS.value((self.name, outcome))) for outcome in outcomes}
+        stats["in_flight"] = self.in_flight()
+        stats["timeout_seconds"] = self.timeout
+        return stats
+
+
+_registry: Dict[str, SingleFlight] = {}
+
+
+def _freeze(value: Any) -> Hashable:
+    """인자를 키로 쓸 수 있게 변환 (list/dict → tuple)"""
+
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _deadline_bucket(deadline: Deadline) -> int:
+    """남은 예산 구간 (예산이 크게 다른 요청끼리는 병합하지 않음)"""
+    return int(deadline.remaining_ms() // max(config.SINGLE_FLIGHT_DEADLINE_BUCKET_MS, 1))
+
+
+def _deadline_wait(flight: SingleFlight, deadline: Deadline, timeout: Optional[float]) -> float:
+    """대기 제한(초): 기본 제한과 남은 예산 중 작은 값"""
+
+    wait = max(deadline.remaining_ms() / 1000, 1e-3)
+    limit = flight._timeout(timeout)
+    return min(wait, limit) if limit else wait
+
+
+def coalesce(flight: SingleFlight, timeout: float = None, deadline_fallback: Callable[[], Any] = None) -> Callable:
+    """
+    메서드 단위 single-flight 데코레이터 (키: 함수명 + 전체 인자, self는 인스턴스 기준)
+
+    동기 함수는 do_sync, 코루틴 함수는 do로 병합합니다.
+    요청 시간 예산이 있으면 남은 예산 구간을 키에 포함하고, 실제 호출 중 기록된 생략 단계를
+    결과와 함께 공유하여 대기자 각자의 예산에도 기록합니다.
+    남은 예산 안에 결과를 받지 못한 대기자는 coalesced_wait로 기록하고
+    deadline_fallback()을 반환합니다. (None이면 SingleFlightTimeout)
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (func.__qualname__,) + tuple(_freeze(value) for value in bound.arguments.values())
+
+        def record(deadline: Deadline, degraded: tuple):
+            for step in degraded:
+                deadline.degrade(step)
+
+        def expired(deadline: Deadline):
+            deadline.degrade("coalesced_wait")
+            if deadline_fallback is None:
+                raise SingleFlightTimeout(f"single-flight 대기 시간 초과 (요청 시간 예산): {flight.name}")
+            return deadline_fallback()
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                deadline = current_deadline()
+                if deadline is None:
+                    return await flight.do(make_key(args, kwargs), lambda: func(*args, **kwargs), timeout)
+
+                async def call():
+                    with deadline_branch() as branch:
+                        result = await func(*args, **kwargs)
+                    return result, tuple(branch.degraded)
+
+                key = make_key(args, kwargs) + (_deadline_bucket(deadline),)
+                try:
+                    result, degraded = await flight.do(key, call, _deadline_wait(flight, deadline, timeout))
+                except asyncio.TimeoutError:
+                    return expired(deadline)
+
+                record(deadline, degraded)
+                return result
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            deadline = current_deadline()
+            if deadline is None:
+                return flight.do_sync(make_key(args, kwargs), lambda: func(*args, **kwargs), timeout)
+
+            def call():
+                with deadline_branch() as branch:
+                    result = func(*args, **kwargs)
+                return result, tuple(branch.degraded)
+
+            key = make_key(args, kwargs) + (_deadline_bucket(deadline),)
+            try:
+                result, degraded = flight.do_sync(key, call, _deadline_wait(flight, deadline, timeout))
+            except SingleFlightTimeout:
+                return expired(deadline)
+
+            record(deadline, degraded)
+            return result
+        return wrapper
+
+    return decorator
+
+
+def get_single_flight_stats() -> Dict[str, Dict]:
+    """병합 통계 (flight별 실제 호출/병합/오류/시간 초과 수)"""
+    return {name: flight.get_stats() for name, flight in _registry.items()}
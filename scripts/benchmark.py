@@ -0,0 +1,475 @@
+"""
+벤치마크 / 부하 재현 스크립트
+
+1) load : 실행 중인 API 서버에 요청을 지정한 동시성으로 재현하여 지연 시간/처리량 측정
+          - --replay: JSONL 요청 로그 ({"method", "path", "json"} 한 줄에 하나)
+          - --faq   : FAQ 데이터셋 질문 300개를 지능형 검색 요청으로 변환
+          - 응답의 Server-Timing 헤더를 모아 단계별 지연 시간도 집계
+2) micro: 컴포넌트 마이크로벤치마크 (서버 불필요)
+          EntityExtractor.extract, EmbeddingGenerator.generate_single,
+          ResultReRanker.rerank, TimingService.recommend_multiple_timing
+
+결과는 p50/p95/p99, 처리량, 메모리를 담은 JSON 리포트로 저장하며,
+--baseline을 주면 기준 리포트와 비교하여 회귀가 있으면 종료 코드 1을 반환합니다.
+
+사용 예:
+    # FAQ 질문 + 요청 로그를 동시성 8로 재현
+    python scripts/benchmark.py load --replay data/benchmark_requests.jsonl --faq --concurrency 8
+
+    # 컴포넌트 마이크로벤치마크 (임베딩 모델 제외)
+    python scripts/benchmark.py micro --skip-embedding
+
+    # 기준 리포트와 비교 (p95 15% 이상 증가 / 처리량 15% 이상 감소 시 실패)
+    python scripts/benchmark.py micro --output bench_report.json --baseline benchmarks/baseline.json
+"""
+import sys
+import os
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# 측정 중 콘솔 로그 출력 최소화 (LOG_LEVEL 환경 변수로 변경 가능)
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import argparse
+import csv
+import itertools
+import json
+import platform
+import resource
+import subprocess
+import threading
+import time
+import tracemalloc
+import numpy as np
+
+DEFAULT_FAQ_PATH = 'data/faq_dataset_300.csv'
+DEFAULT_INTELLIGENT_PATH = '/api/v1/rag/search/intelligent'
+
+
+# ============================================================
+# 통계
+# ============================================================
+
+def summarize(latencies_ms: list, wall_seconds: float = None) -> dict:
+    """지연 시간 목록 요약 (ms)"""
+
+    if not latencies_ms:
+        return {'count': 0}
+
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+
+    summary = {
+        'count': len(values),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'max_ms': round(float(values.max()), 3)
+    }
+
+    total_seconds = wall_seconds if wall_seconds else values.sum() / 1000
+    summary['throughput_per_s'] = round(len(values) / total_seconds, 2) if total_seconds > 0 else 0.0
+
+    return summary
+
+
+def peak_rss_mb() -> float:
+    """프로세스 최대 RSS (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+# ============================================================
+# 부하 재현 (load)
+# ============================================================
+
+def load_replay(path: str) -> list:
+    """JSONL 요청 로그 로드"""
+
+    requests_list = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            item = json.loads(line)
+            requests_list.append({
+                'method': item.get('method', 'POST').upper(),
+                'path': item['path'],
+                'json': item.get('json')
+            })
+
+    return requests_list
+
+
+def load_faq_requests(path: str, endpoint: str) -> list:
+    """FAQ 질문 → 지능형 검색 요청"""
+
+    with open(path, encoding='utf-8') as f:
+        return [
+            {'method': 'POST', 'path': endpoint, 'json': {'query': row['question']}}
+            for row in csv.DictReader(f)
+            if row.get('question')
+        ]
+
+
+def parse_server_timing(header: str) -> dict:
+    """Server-Timing 헤더 → {단계: ms}"""
+
+    timings = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'dur' and name:
+                timings[name] = timings.get(name, 0.0) + float(value)
+
+    return timings
+
+
+def run_load(args) -> dict:
+    import requests
+
+    workload = []
+    if args.replay:
+        workload.extend(load_replay(args.replay))
+    if args.faq:
+        workload.extend(load_faq_requests(args.faq_path, args.endpoint))
+
+    if not workload:
+        raise SystemExit("재현할 요청이 없습니다. --replay 또는 --faq를 지정하세요.")
+
+    total = args.requests or len(workload)
+    workload = list(itertools.islice(itertools.cycle(workload), total))
+
+    print(f"부하 재현: {total}개 요청, 동시성 {args.concurrency}, 대상 {args.base_url}")
+
+    latencies = defaultdict(list)
+    stage_timings = defaultdict(list)
+    status_counts = defaultdict(int)
+    errors = []
+    lock = threading.Lock()
+
+    sessions = threading.local()
+
+    def send(item):
+        session = getattr(sessions, 'session', None)
+        if session is None:
+            session = sessions.session = requests.Session()
+
+        started = time.perf_counter()
+        try:
+            response = session.request(
+                item['method'],
+                args.base_url.rstrip('/') + item['path'],
+                json=item['json'],
+                timeout=args.timeout
+            )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            status = str(response.status_code)
+            server_timing = parse_server_timing(response.headers.get('server-timing', ''))
+        except Exception as e:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            status = 'error'
+            server_timing = {}
+            with lock:
+                errors.append(str(e))
+
+        with lock:
+            status_counts[status] += 1
+            if status.startswith('2'):
+                latencies[item['path']].append(elapsed_ms)
+                latencies['__all__'].append(elapsed_ms)
+            for name, value in server_timing.items():
+                stage_timings[name].append(value)
+
+    # 워밍업 (모델 로드/캐시 준비 영향 제외)
+    for item in workload[:args.warmup]:
+        send(item)
+    latencies.clear()
+    stage_timings.clear()
+    status_counts.clear()
+    errors.clear()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(send, workload))
+    wall_seconds = time.perf_counter() - started
+
+    overall = latencies.pop('__all__', [])
+
+    return {
+        'requests': total,
+        'concurrency': args.concurrency,
+        'wall_seconds': round(wall_seconds, 3),
+        'status_counts': dict(status_counts),
+        'error_samples': errors[:5],
+        'overall': summarize(overall, wall_seconds),
+        'endpoints': {path: summarize(values, wall_seconds) for path, values in latencies.items()},
+        'server_stages': {name: summarize(values) for name, values in stage_timings.items()},
+        'client_peak_rss_mb': peak_rss_mb()
+    }
+
+
+# ============================================================
+# 마이크로벤치마크 (micro)
+# ============================================================
+
+def bench(fn, inputs: list, iterations: int, warmup: int = 10) -> dict:
+    """입력을 순환하며 fn 호출 지연 시간/할당 메모리 측정"""
+
+    for item in inputs[:warmup]:
+        fn(item)
+
+    calls = list(itertools.islice(itertools.cycle(inputs), iterations))
+
+    latencies = []
+    started = time.perf_counter()
+    for item in calls:
+        call_started = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    wall_seconds = time.perf_counter() - started
+
+    summary = summarize(latencies, wall_seconds)
+
+    # 할당 메모리는 별도 패스에서 측정 (tracemalloc 오버헤드가 지연 시간에 섞이지 않도록)
+    tracemalloc.start()
+    for item in calls[:min(len(calls), 100)]:
+        fn(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    summary['peak_alloc_kb'] = round(peak / 1024, 1)
+
+    return summary
+
+
+def run_micro(args) -> dict:
+    from app.search.query_analyzer import EntityExtractor
+    from app.search.reranker import ResultReRanker
+    from app.services.rag.timing_service import TimingService
+    from app.utils.knowledge_base import HealthKnowledgeBase
+
+    questions = [item['json']['query'] for item in load_faq_requests(args.faq_path, DEFAULT_INTELLIGENT_PATH)]
+    results = {}
+
+    # 1. 개체명 추출
+    extractor = EntityExtractor(HealthKnowledgeBase())
+    results['entity_extractor.extract'] = bench(extractor.extract, questions, args.iterations)
+
+    # 2. 검색 결과 재정렬 (합성 결과 20개)
+    reranker = ResultReRanker()
+    synthetic = [
+        {
+            'score': 1.0 + (i % 7) / 10,
+            'product_id': str(i),
+            'product_name': f'종합비타민 {i}',
+            'company_name': ['종근당건강', '고려은단', '뉴트리원', '한국야쿠르트'][i % 4],
+            'primary_function': '피로 개선에 도움',
+            'raw_materials': '비타민B1, 비타민B2, 비타민C'
+        }
+        for i in range(20)
+    ]
+    results['result_reranker.rerank'] = bench(
+        lambda query: reranker.rerank([dict(item) for item in synthetic], query),
+        questions,
+        args.iterations
+    )
+
+    # 3. 다중 성분 복용 시간 추천
+    timing_service = TimingService()
+    ingredient_sets = [
+        ['철분', '칼슘'],
+        ['비타민D', '오메가3', '마그네슘'],
+        ['비타민C', '철분', '아연', '비타민B12'],
+        ['프로바이오틱스', '유산균', '비타민C']
+    ]
+    results['timing_service.recommend_multiple_timing'] = bench(
+        timing_service.recommend_multiple_timing,
+        ingredient_sets,
+        args.iterations
+    )
+
+    # 4. 쿼리 임베딩 (모델 로드 필요)
+    if not args.skip_embedding:
+        from app.search.embeddings import EmbeddingGenerator
+
+        generator = EmbeddingGenerator()
+        embedding_iterations = min(args.iterations, len(questions))
+
+        # 캐시 미적중: 매번 다른 질문 (모델 추론 비용)
+        generator.query_cache.clear()
+        results['embedding.generate_single.cold'] = bench(
+            generator.generate_single,
+            [f"{question} #{i}" for i, question in enumerate(questions)],
+            embedding_iterations,
+            warmup=0
+        )
+
+        # 캐시 적중: 같은 질문 반복
+        results['embedding.generate_single.cached'] = bench(
+            generator.generate_single,
+            questions[:10],
+            args.iterations
+        )
+
+    return {
+        'iterations': args.iterations,
+        'benchmarks': results,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+# ============================================================
+# 리포트 / 회귀 비교
+# ============================================================
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def flatten_metrics(report: dict) -> dict:
+    """비교 대상 지표 추출: {이름: {'p95_ms', 'throughput_per_s'}}"""
+
+    metrics = {}
+    section = report.get('result', {})
+
+    if report.get('mode') == 'micro':
+        for name, summary in section.get('benchmarks', {}).items():
+            metrics[name] = summary
+    else:
+        metrics['overall'] = section.get('overall', {})
+        for path, summary in section.get('endpoints', {}).items():
+            metrics[path] = summary
+
+    return metrics
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """기준 대비 p95 증가/처리량 감소가 tolerance를 넘는 항목"""
+
+    regressions = []
+    current = flatten_metrics(report)
+
+    for name, base in flatten_metrics(baseline).items():
+        now = current.get(name)
+        if not now or not base.get('count'):
+            continue
+
+        if base.get('p95_ms') and now.get('p95_ms', 0) > base['p95_ms'] * (1 + tolerance):
+            regressions.append({
+                'metric': name,
+                'field': 'p95_ms',
+                'baseline': base['p95_ms'],
+                'current': now['p95_ms'],
+                'change': round(now['p95_ms'] / base['p95_ms'] - 1, 4)
+            })
+
+        if base.get('throughput_per_s') and now.get('throughput_per_s', 0) < base['throughput_per_s'] * (1 - tolerance):
+            regressions.append({
+                'metric': name,
+                'field': 'throughput_per_s',
+                'baseline': base['throughput_per_s'],
+                'current': now['throughput_per_s'],
+                'change': round(now['throughput_per_s'] / base['throughput_per_s'] - 1, 4)
+            })
+
+    return regressions
+
+
+def print_summary(report: dict):
+    print("\n" + "=" * 80)
+    print(f"벤치마크 결과 ({report['mode']})")
+    print("=" * 80)
+    print(f"{'항목':<50} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>9}")
+
+    for name, summary in flatten_metrics(report).items():
+        if not summary.get('count'):
+            continue
+        print(
+            f"{name:<50} {summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} "
+            f"{summary['p99_ms']:>8.2f} {summary['throughput_per_s']:>9.1f}"
+        )
+
+    print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API 부하 재현 및 컴포넌트 벤치마크')
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+
+    load_parser = subparsers.add_parser('load', help='API 서버 부하 재현')
+    load_parser.add_argument('--base-url', type=str, default='http://localhost:8000')
+    load_parser.add_argument('--replay', type=str, help='JSONL 요청 로그 ({"method", "path", "json"})')
+    load_parser.add_argument('--faq', action='store_true', help='FAQ 질문을 지능형 검색 요청으로 재현')
+    load_parser.add_argument('--endpoint', type=str, default=DEFAULT_INTELLIGENT_PATH,
+                             help='FAQ 질문을 보낼 엔드포인트')
+    load_parser.add_argument('--concurrency', type=int, default=8)
+    load_parser.add_argument('--requests', type=int, default=None,
+                             help='총 요청 수 (기본: 워크로드 1회)')
+    load_parser.add_argument('--warmup', type=int, default=10)
+    load_parser.add_argument('--timeout', type=float, default=30.0)
+
+    micro_parser = subparsers.add_parser('micro', help='컴포넌트 마이크로벤치마크')
+    micro_parser.add_argument('--iterations', type=int, default=1000)
+    micro_parser.add_argument('--skip-embedding', action='store_true', help='임베딩 모델 벤치마크 제외')
+
+    for sub in (load_parser, micro_parser):
+        sub.add_argument('--faq-path', type=str, default=DEFAULT_FAQ_PATH)
+        sub.add_argument('--output', type=str, default='bench_report.json', help='JSON 리포트 경로')
+        sub.add_argument('--baseline', type=str, help='비교할 기준 리포트')
+        sub.add_argument('--tolerance', type=float, default=0.15, help='회귀 판정 허용 비율')
+
+    args = parser.parse_args()
+
+    result = run_load(args) if args.mode == 'load' else run_micro(args)
+
+    report = {
+        'mode': args.mode,
+        'created_at': datetime.now().isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'args': {key: value for key, value in vars(args).items() if key not in ('baseline',)},
+        'result': result
+    }
+
+    print_summary(report)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        regressions = compare(report, baseline, args.tolerance)
+        report['regressions'] = regressions
+        report['baseline'] = {'path': args.baseline, 'git_commit': baseline.get('git_commit')}
+
+        if regressions:
+            exit_code = 1
+            print(f"\n⚠ 성능 회귀 {len(regressions)}건 (허용 {args.tolerance:.0%})")
+            for item in regressions:
+                print(f"  - {item['metric']} {item['field']}: {item['baseline']} → {item['current']} ({item['change']:+.1%})")
+        else:
+            print(f"\n✓ 기준 대비 회귀 없음 (허용 {args.tolerance:.0%})")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n리포트 저장: {args.output}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+인메모리 검색 색인 생성 스크립트
+
+Elasticsearch 인덱스 또는 JSON 덤프에서 문서를 읽어
+SEARCH_BACKEND=memory 용 색인 디렉터리(documents.jsonl, vectors.npy, meta.json)를 만듭니다.
+
+사용 예:
+    # 실행 중인 Elasticsearch에서 문서와 벡터를 그대로 내보내기
+    python scripts/build_memory_index.py --from-es
+
+    # JSON 덤프(검색 응답/문서 리스트/JSONL)에서 생성 (벡터가 없으면 임베딩 계산)
+    python scripts/build_memory_index.py --from-json data/backup_index_sample_20251126.json
+"""
+import sys
+import os
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.search.memory_backend import InMemorySearchBackend
+from app.utils.logger import get_logger
+import argparse
+import json
+import numpy as np
+
+logger = get_logger(__name__)
+
+
+def load_from_es(index_name: str) -> list:
+    """Elasticsearch 인덱스 전체 문서 조회 (embedding_vector 포함)"""
+    from elasticsearch import helpers
+    from app.core.elasticsearch_config import get_elasticsearch_client
+
+    es = get_elasticsearch_client("bulk")
+
+    logger.info(f"Elasticsearch 문서 조회 중: {index_name}")
+
+    documents = []
+    for hit in helpers.scan(es, index=index_name, query={"query": {"match_all": {}}}):
+        documents.append(hit['_source'])
+
+    logger.info(f"✓ {len(documents)}개 문서 조회 완료")
+
+    return documents
+
+
+def load_from_json(path: str) -> list:
+    """JSON 덤프 로드 (ES 검색 응답, 문서 리스트, JSONL 모두 지원)"""
+
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    if isinstance(data, dict) and 'hits' in data:
+        data = data['hits']['hits']
+
+    documents = [item.get('_source', item) for item in data]
+
+    logger.info(f"✓ {len(documents)}개 문서 로드 완료: {path}")
+
+    return documents
+
+
+def build_vectors(documents: list, model_name: str) -> np.ndarray:
+    """문서 벡터 구성 (저장된 embedding_vector가 없으면 embedding_text로 계산)"""
+
+    if all(doc.get('embedding_vector') for doc in documents):
+        return np.asarray([doc['embedding_vector'] for doc in documents], dtype=np.float32)
+
+    from app.search.embeddings import EmbeddingGenerator
+
+    logger.info("embedding_vector가 없는 문서가 있어 임베딩을 계산합니다.")
+
+    generator = EmbeddingGenerator(model_name)
+    texts = [
+        doc.get('embedding_text') or f"{doc.get('product_name', '')} {doc.get('primary_function', '')}"
+        for doc in documents
+    ]
+    return generator.generate(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='인메모리 검색 색인 생성')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--from-es', action='store_true', help='Elasticsearch 인덱스에서 생성')
+    source.add_argument('--from-json', type=str, help='JSON 덤프 파일에서 생성')
+    parser.add_argument('--output-dir', type=str, default=settings.MEMORY_INDEX_DIR,
+                        help='색인 출력 디렉터리')
+    parser.add_argument('--model', type=str, default=settings.EMBEDDING_MODEL,
+                        help='벡터가 없을 때 사용할 임베딩 모델')
+
+    args = parser.parse_args()
+
+    if args.from_es:
+        documents = load_from_es(settings.ES_INDEX_NAME)
+    else:
+        documents = load_from_json(args.from_json)
+
+    if not documents:
+        logger.error("색인할 문서가 없습니다.")
+        sys.exit(1)
+
+    vectors = build_vectors(documents, args.model)
+
+    meta = InMemorySearchBackend.build(documents, vectors, args.output_dir, model_name=args.model)
+
+    print("\n" + "=" * 60)
+    print("인메모리 색인 생성 완료")
+    print("=" * 60)
+    print(f"출력 디렉터리: {args.output_dir}")
+    print(f"문서 수: {meta['count']}")
+    print(f"벡터 차원: {meta['dim']}")
+    print("=" * 60)
+    print(f"\n사용: SEARCH_BACKEND=memory MEMORY_INDEX_DIR={args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
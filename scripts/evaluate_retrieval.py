@@ -0,0 +1,338 @@
+"""
+검색 품질 vs 지연 시간 평가 스크립트
+
+FAQ 데이터셋 질문(+ 선택적 정답 라벨)으로 검색 구성 조합을 모두 실행하여
+recall@k / nDCG@k 와 지연 시간(p50/p95), CPU 사용 시간을 나란히 비교합니다.
+
+구성 축:
+    - vector_mode : script_score(전수 코사인) / knn(HNSW 근사 검색)
+    - expansion   : QueryAnalyzer 쿼리 확장 사용 여부
+    - rerank      : ResultReRanker 재정렬 사용 여부 (재정렬 시 top_k * --candidate-factor 후보 검색)
+    - model       : 기본은 현재 설정(SEARCH_BACKEND/EMBEDDING_MODEL) 그대로,
+                    --models 를 주면 코퍼스를 해당 모델로 다시 인코딩한 인메모리 색인으로 평가
+                    (모델명 뒤에 ':int8'을 붙이면 동적 int8 양자화 모델)
+
+정답 라벨:
+    - 기본(silver): FAQ의 recommend_supplement 성분이 원재료/제품명에 포함된 제품
+    - --labels   : {"query": ..., "relevant_product_ids": [...]} JSONL (gold, FAQ 라벨 대신 사용)
+
+CPU 시간은 이 프로세스 기준이므로 Elasticsearch 서버 측 비용은 포함되지 않습니다.
+(서버 비용까지 비교하려면 SEARCH_BACKEND=memory 로 실행)
+
+사용 예:
+    # 현재 설정으로 전체 조합 평가
+    python scripts/evaluate_retrieval.py --k 5
+
+    # 인메모리 색인에서 기본 모델과 int8 양자화 모델 비교
+    SEARCH_BACKEND=memory python scripts/evaluate_retrieval.py \\
+        --models jhgan/ko-sroberta-multitask,jhgan/ko-sroberta-multitask:int8 --rerank off
+
+    # 정답 라벨 파일 사용, 결과 저장
+    python scripts/evaluate_retrieval.py --labels data/retrieval_labels.jsonl --output eval_report.json
+"""
+import sys
+import os
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# 측정 중 콘솔 로그 출력 최소화 (LOG_LEVEL 환경 변수로 변경 가능)
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from datetime import datetime
+import argparse
+import csv
+import itertools
+import json
+import re
+import time
+import numpy as np
+
+from app.core.config import settings
+
+DEFAULT_FAQ_PATH = 'data/faq_dataset_300.csv'
+CONFIGURED_MODEL = 'configured'
+
+
+# ============================================================
+# 데이터 로드
+# ============================================================
+
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', '', str(text or '')).lower()
+
+
+def load_corpus(corpus_path: str = None) -> list:
+    """평가 대상 문서 (--corpus 덤프 > 인메모리 색인 > Elasticsearch 순)"""
+    from scripts.build_memory_index import load_from_es, load_from_json
+
+    if corpus_path:
+        return load_from_json(corpus_path)
+
+    if settings.SEARCH_BACKEND == 'memory':
+        from app.search.memory_backend import InMemorySearchBackend
+        return InMemorySearchBackend.load(settings.MEMORY_INDEX_DIR).documents
+
+    return load_from_es(settings.ES_INDEX_NAME)
+
+
+def silver_labels(faq_path: str, corpus: list, limit: int = None) -> list:
+    """FAQ 추천 성분이 원재료/제품명에 포함된 제품을 정답으로 사용"""
+
+    product_texts = [
+        (str(doc.get('product_id')), _normalize(doc.get('raw_materials')) + _normalize(doc.get('product_name')))
+        for doc in corpus
+    ]
+
+    labels = []
+    with open(faq_path, encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            ingredients = [_normalize(item) for item in row['recommend_supplement'].split(',') if item.strip()]
+
+            relevant = [
+                product_id for product_id, text in product_texts
+                if any(ingredient in text for ingredient in ingredients)
+            ]
+            if relevant:
+                labels.append({'query': row['question'], 'relevant_product_ids': relevant})
+
+            if limit and len(labels) >= limit:
+                break
+
+    return labels
+
+
+def gold_labels(path: str, limit: int = None) -> list:
+    """JSONL 정답 라벨 로드"""
+
+    labels = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            labels.append({
+                'query': item['query'],
+                'relevant_product_ids': [str(product_id) for product_id in item['relevant_product_ids']]
+            })
+            if limit and len(labels) >= limit:
+                break
+
+    return labels
+
+
+# ============================================================
+# 지표
+# ============================================================
+
+def recall_at_k(ranked_ids: list, relevant: set, k: int) -> float:
+    """정답 수가 k보다 많으면 k 기준 (capped recall)"""
+    if not relevant:
+        return 0.0
+    hits = sum(1 for product_id in ranked_ids[:k] if product_id in relevant)
+    return hits / min(len(relevant), k)
+
+
+def ndcg_at_k(ranked_ids: list, relevant: set, k: int) -> float:
+    """이진 관련도 nDCG"""
+    dcg = sum(
+        1.0 / np.log2(rank + 2)
+        for rank, product_id in enumerate(ranked_ids[:k])
+        if product_id in relevant
+    )
+    ideal = sum(1.0 / np.log2(rank + 2) for rank in range(min(len(relevant), k)))
+    return dcg / ideal if ideal else 0.0
+
+
+# ============================================================
+# 검색 엔진 구성
+# ============================================================
+
+def build_engine(model_spec: str, corpus: list):
+    """
+    모델별 검색 엔진 생성
+
+    configured: 현재 설정의 백엔드/모델 그대로 사용
+    그 외     : 코퍼스를 해당 모델로 인코딩한 인메모리 색인 사용
+    """
+    from app.search.rag_search import RAGSearchEngine
+
+    if model_spec == CONFIGURED_MODEL:
+        return RAGSearchEngine(), 0.0
+
+    from app.search.embeddings import EmbeddingGenerator
+    from app.search.memory_backend import InMemorySearchBackend
+
+    model_name, _, variant = model_spec.partition(':')
+    generator = EmbeddingGenerator(model_name, quantize=(variant == 'int8'))
+
+    documents = [
+        {key: value for key, value in doc.items() if key != 'embedding_vector'}
+        for doc in corpus
+    ]
+    texts = [
+        doc.get('embedding_text') or f"{doc.get('product_name', '')} {doc.get('primary_function', '')}"
+        for doc in documents
+    ]
+
+    started = time.perf_counter()
+    vectors = generator.generate(texts, show_progress=False).astype(np.float32)
+    encode_seconds = time.perf_counter() - started
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    backend = InMemorySearchBackend(documents, vectors / norms, {'model': model_spec})
+
+    return RAGSearchEngine(backend=backend, embedding_generator=generator), encode_seconds
+
+
+# ============================================================
+# 평가 실행
+# ============================================================
+
+def evaluate_config(engine, analyzer, reranker, labels: list, k: int, vector_mode: str,
+                    expansion: bool, rerank: bool, candidate_factor: int) -> dict:
+    """한 구성에 대해 전체 질의 실행"""
+
+    # 구성 간 쿼리 임베딩 캐시 공유 방지 (인코딩 비용도 측정에 포함)
+    engine.embedding_generator.query_cache.clear()
+
+    fetch_k = k * candidate_factor if rerank else k
+    recalls, ndcgs, latencies_ms, cpu_ms = [], [], [], []
+
+    for label in labels:
+        query = label['query']
+        relevant = set(label['relevant_product_ids'])
+
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+
+        search_query = analyzer.analyze(query).expanded_query if expansion else query
+        results = engine.hybrid_search(
+            search_query,
+            top_k=fetch_k,
+            fields=engine.COMPACT_FIELDS,
+            vector_mode=vector_mode
+        )
+        if rerank:
+            results = reranker.rerank(results, query)
+        ranked_ids = [str(result.get('product_id')) for result in results[:k]]
+
+        cpu_ms.append((time.process_time() - cpu_started) * 1000)
+        latencies_ms.append((time.perf_counter() - wall_started) * 1000)
+
+        recalls.append(recall_at_k(ranked_ids, relevant, k))
+        ndcgs.append(ndcg_at_k(ranked_ids, relevant, k))
+
+    p50, p95 = np.percentile(latencies_ms, [50, 95])
+
+    return {
+        f'recall@{k}': round(float(np.mean(recalls)), 4),
+        f'ndcg@{k}': round(float(np.mean(ndcgs)), 4),
+        'latency_p50_ms': round(float(p50), 2),
+        'latency_p95_ms': round(float(p95), 2),
+        'cpu_ms_per_query': round(float(np.mean(cpu_ms)), 2),
+        'queries': len(labels)
+    }
+
+
+def print_table(rows: list, k: int):
+    headers = ['model', 'vector_mode', 'expansion', 'rerank',
+               f'recall@{k}', f'ndcg@{k}', 'latency_p50_ms', 'latency_p95_ms', 'cpu_ms_per_query']
+    widths = [max(len(h), *(len(str(row[h])) for row in rows)) for h in headers]
+
+    print("\n" + "  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(row[h]).ljust(w) for h, w in zip(headers, widths)))
+
+
+def _parse_switch(value: str) -> list:
+    return [item.strip() == 'on' for item in value.split(',') if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='검색 품질 vs 지연 시간 평가')
+    parser.add_argument('--faq', default=DEFAULT_FAQ_PATH, help='FAQ 데이터셋 경로 (silver 라벨)')
+    parser.add_argument('--labels', help='정답 라벨 JSONL (query, relevant_product_ids)')
+    parser.add_argument('--corpus', help='코퍼스 JSON 덤프 (기본: 인메모리 색인 또는 Elasticsearch)')
+    parser.add_argument('--limit', type=int, help='평가할 질의 수')
+    parser.add_argument('--k', type=int, default=settings.DEFAULT_TOP_K)
+    parser.add_argument('--candidate-factor', type=int, default=3, help='재정렬 시 후보 배수')
+    parser.add_argument('--modes', default='script_score,knn', help='vector_mode 목록')
+    parser.add_argument('--expansion', default='off,on', help='쿼리 확장 (on/off 목록)')
+    parser.add_argument('--rerank', default='off,on', help='재정렬 (on/off 목록)')
+    parser.add_argument('--models', default=CONFIGURED_MODEL,
+                        help="비교할 모델 목록 (예: 'configured,jhgan/ko-sroberta-multitask:int8')")
+    parser.add_argument('--output', help='JSON 리포트 저장 경로')
+
+    args = parser.parse_args()
+
+    from app.search.query_analyzer import QueryAnalyzer
+    from app.search.reranker import ResultReRanker
+
+    model_specs = [item.strip() for item in args.models.split(',') if item.strip()]
+    needs_corpus = not args.labels or any(spec != CONFIGURED_MODEL for spec in model_specs)
+    corpus = load_corpus(args.corpus) if needs_corpus else []
+
+    if args.labels:
+        labels = gold_labels(args.labels, args.limit)
+    else:
+        labels = silver_labels(args.faq, corpus, args.limit)
+
+    if not labels:
+        print("평가할 라벨이 없습니다.")
+        sys.exit(1)
+
+    print(f"평가 질의: {len(labels)}개, k={args.k}, 코퍼스: {len(corpus) or '-'}개 문서")
+
+    analyzer = QueryAnalyzer()
+    reranker = ResultReRanker()
+
+    rows = []
+    model_info = {}
+    for spec in model_specs:
+        engine, encode_seconds = build_engine(spec, corpus)
+        model_info[spec] = {
+            'embedding_model': engine.embedding_generator.model_name,
+            'quantized': engine.embedding_generator.quantize,
+            'backend': engine.backend.name,
+            'corpus_encode_seconds': round(encode_seconds, 2)
+        }
+
+        for vector_mode, expansion, rerank in itertools.product(
+            [mode.strip() for mode in args.modes.split(',') if mode.strip()],
+            _parse_switch(args.expansion),
+            _parse_switch(args.rerank)
+        ):
+            result = evaluate_config(
+                engine, analyzer, reranker, labels, args.k,
+                vector_mode, expansion, rerank, args.candidate_factor
+            )
+            row = {
+                'model': spec,
+                'vector_mode': vector_mode,
+                'expansion': 'on' if expansion else 'off',
+                'rerank': 'on' if rerank else 'off',
+                **result
+            }
+            rows.append(row)
+            print(f"  ✓ {spec} / {vector_mode} / expansion={row['expansion']} / rerank={row['rerank']}")
+
+    print_table(rows, args.k)
+
+    if args.output:
+        report = {
+            'created_at': datetime.now().isoformat(),
+            'label_source': args.labels or f'silver:{args.faq}',
+            'k': args.k,
+            'models': model_info,
+            'results': rows
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n리포트 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
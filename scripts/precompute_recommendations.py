@@ -0,0 +1,264 @@
+"""
+Gemini 추천 사전 계산 배치 작업
+
+로그에서 많이 요청된 증상 질의 상위 N개와 지식 베이스(DEFAULT_RECOMMENDATIONS) 카테고리 키워드로
+/rag/recommend/gemini 와 같은 과정(RAG 검색 → SERP → Gemini)을 미리 실행하고,
+결과를 버전별 저장소(PRECOMPUTED_DIR)에 기록합니다. API 서버는 CURRENT 버전을 먼저 조회합니다.
+
+- RAG 검색: 전체 질의 임베딩을 한 번에 배치 인코딩한 뒤 검색을 병렬 실행
+- Gemini 생성: --concurrency 만큼만 동시에 호출, 실패(또는 격벽 거절로 RAG 대체 응답) 시 지수 백오프 재시도
+- 요청 파라미터(top_k, SERP, 비중, 출력 옵션, 모델)를 함께 기록하여 같은 파라미터의 요청에만 반환
+- --mock-llm: 실제 Gemini 대신 모의 LLM 제공자(LLM_PROVIDER=mock, LLM_MOCK_* 설정) 사용
+  (API 키/과금 없이 작업 전체 확인, 모델명이 'mock'으로 기록되므로 실제 모델을 쓰는 서버에서는 반환되지 않음)
+
+사용 예:
+    # 로그 상위 50개 + 카테고리 키워드
+    python scripts/precompute_recommendations.py --top-n 50
+
+    # API 키 없이 모의 LLM + 인메모리 색인으로 확인
+    SEARCH_BACKEND=memory python scripts/precompute_recommendations.py --mock-llm --no-serp
+
+    # 대상 질의만 확인
+    python scripts/precompute_recommendations.py --dry-run
+"""
+import sys
+import os
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import argparse
+import asyncio
+import glob
+import re
+import time
+
+from app.core.config import settings
+from app.services.rag.precomputed_store import (
+    PrecomputedRecommendationStore, normalize_query, request_params
+)
+
+# Gemini 추천 요청 로그 (routes.py: "Gemini 추천 요청: '...'", "Gemini 스트리밍 추천 요청: '...'")
+LOG_QUERY_PATTERN = re.compile(r"Gemini (?:스트리밍 )?추천 요청: '(.+)'\s*$")
+
+
+# ============================================================
+# 대상 질의
+# ============================================================
+
+def mine_log_queries(patterns: list, top_n: int, min_count: int) -> list:
+    """로그 파일에서 요청 수 상위 질의 (정규화 기준 집계, 가장 많이 쓰인 원문 표기 사용)"""
+
+    counts = Counter()
+    surface = {}
+
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    for path in paths:
+        with open(path, encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                match = LOG_QUERY_PATTERN.search(line)
+                if not match:
+                    continue
+                query = match.group(1).strip()
+                key = normalize_query(query)
+                counts[key] += 1
+                surface.setdefault(key, Counter())[query] += 1
+
+    print(f"로그 파일 {len(paths)}개에서 질의 {len(counts)}종 ({sum(counts.values())}건) 집계")
+
+    return [
+        surface[key].most_common(1)[0][0]
+        for key, count in counts.most_common(top_n)
+        if count >= min_count
+    ]
+
+
+def category_queries() -> list:
+    from app.utils.knowledge_base import HealthKnowledgeBase
+    return sorted(HealthKnowledgeBase().get_all_symptom_keywords())
+
+
+def collect_queries(args) -> list:
+    queries = mine_log_queries(args.log_files, args.top_n, args.min_count) if args.top_n > 0 else []
+    if not args.no_categories:
+        queries += category_queries()
+
+    # 정규화 기준 중복 제거 (로그 질의 우선)
+    unique = {}
+    for query in queries:
+        unique.setdefault(normalize_query(query), query)
+    return list(unique.values())
+
+
+# ============================================================
+# 실행
+# ============================================================
+
+def retrieve_all(queries: list, top_k: int, workers: int) -> list:
+    """전체 질의 배치 인코딩 후 RAG 검색 병렬 실행"""
+
+    from app.search.rag_search import RAGSearchEngine
+
+    engine = RAGSearchEngine()
+    vectors = engine.embedding_generator.generate(queries, show_progress=False)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(
+            lambda item: engine.hybrid_search(query=item[0], top_k=top_k, query_vector=item[1].tolist()),
+            zip(queries, vectors)
+        ))
+
+
+async def generate_all(queries: list, rag_results: list, request_template, args) -> tuple:
+    """질의별 SERP + Gemini 생성 (동시 실행 수 제한, 재시도)"""
+
+    from app.services.rag.gemini_service import gemini_service
+    from app.services.rag.serp_service import serp_service
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    entries = {}
+    failures = []
+
+    async def run(query: str, rag: list):
+        async with semaphore:
+            for attempt in range(args.retries + 1):
+                try:
+                    serp = []
+                    if request_template.enable_serp:
+                        serp = await serp_service.search(
+                            query=query,
+                            max_results=request_template.serp_max_results,
+                            enabled=True
+                        )
+
+                    recommendation = await gemini_service.generate_recommendation(
+                        query=query,
+                        rag_results=rag,
+                        serp_results=serp,
+                        rag_weight=request_template.rag_weight,
+                        max_length=request_template.max_length,
+                        output_options={
+                            'include_product_name': request_template.include_product_name,
+                            'include_ingredients': request_template.include_ingredients,
+                            'include_timing': request_template.include_timing,
+                            'include_precautions': request_template.include_precautions
+                        }
+                    )
+                    if recommendation.get('fallback'):
+                        raise RuntimeError(f"Gemini 호출 거절 ({recommendation['fallback']['reason']})")
+
+                    recommendation.pop('cache', None)
+                    recommendation.pop('prompt', None)
+                    entries[normalize_query(query)] = {
+                        'query': query,
+                        'recommendation': recommendation,
+                        'sources': {
+                            'rag_count': len(rag),
+                            'serp_count': len(serp),
+                            'rag_weight': request_template.rag_weight,
+                            'gemini_weight': 1 - request_template.rag_weight
+                        },
+                        'generated_at': datetime.now().isoformat()
+                    }
+                    print(f"  ✓ {query}")
+                    return
+
+                except Exception as e:
+                    if attempt == args.retries:
+                        failures.append((query, str(e)))
+                        print(f"  ✗ {query}: {e}")
+                        return
+                    await asyncio.sleep(args.retry_backoff * (2 ** attempt))
+
+    try:
+        await asyncio.gather(*(run(query, rag) for query, rag in zip(queries, rag_results)))
+    finally:
+        await serp_service.aclose()
+
+    return entries, failures
+
+
+def main():
+    from app.schemas.rag.schemas import GeminiRecommendationRequest
+
+    defaults = GeminiRecommendationRequest(query='-')
+
+    parser = argparse.ArgumentParser(description='Gemini 추천 사전 계산')
+    parser.add_argument('--log-files', nargs='+', default=[f'{settings.LOG_FILE}*'],
+                        help='요청 로그 파일 glob (일자별 로테이션 포함)')
+    parser.add_argument('--top-n', type=int, default=50, help='로그 상위 질의 수 (0이면 로그 미사용)')
+    parser.add_argument('--min-count', type=int, default=2, help='로그 질의 최소 요청 수')
+    parser.add_argument('--no-categories', action='store_true', help='지식 베이스 카테고리 키워드 제외')
+    parser.add_argument('--top-k', type=int, default=defaults.top_k)
+    parser.add_argument('--no-serp', action='store_true', help='SERP 검색 없이 생성')
+    parser.add_argument('--serp-max-results', type=int, default=defaults.serp_max_results)
+    parser.add_argument('--rag-weight', type=float, default=defaults.rag_weight)
+    parser.add_argument('--max-length', type=int, default=defaults.max_length)
+    parser.add_argument('--concurrency', type=int, default=4, help='동시 검색/생성 수')
+    parser.add_argument('--retries', type=int, default=2, help='질의별 재시도 횟수')
+    parser.add_argument('--retry-backoff', type=float, default=1.0, help='재시도 대기 기본값(초, 지수 증가)')
+    parser.add_argument('--mock-llm', action='store_true', help='모의 LLM 제공자 사용 (LLM_PROVIDER=mock)')
+    parser.add_argument('--output-dir', default=settings.PRECOMPUTED_DIR)
+    parser.add_argument('--keep', type=int, default=3, help='보관할 버전 수')
+    parser.add_argument('--dry-run', action='store_true', help='대상 질의만 출력')
+
+    args = parser.parse_args()
+
+    queries = collect_queries(args)
+    print(f"사전 계산 대상: {len(queries)}개 질의")
+
+    if args.dry_run:
+        for query in queries:
+            print(f"  - {query}")
+        return
+
+    if not queries:
+        print("사전 계산할 질의가 없습니다.")
+        sys.exit(1)
+
+    request_template = GeminiRecommendationRequest(
+        query='-',
+        top_k=args.top_k,
+        enable_serp=not args.no_serp,
+        serp_max_results=args.serp_max_results,
+        rag_weight=args.rag_weight,
+        max_length=args.max_length
+    )
+
+    if args.mock_llm:
+        settings.LLM_PROVIDER = 'mock'
+
+    from app.services.rag.gemini_service import gemini_service
+
+    if not gemini_service.provider:
+        print("GEMINI_API_KEY가 설정되지 않았습니다. (--mock-llm 으로 모의 실행 가능)")
+        sys.exit(1)
+
+    started = time.perf_counter()
+
+    rag_results = retrieve_all(queries, request_template.top_k, args.concurrency)
+    print(f"RAG 검색 완료: {len(queries)}개 질의 ({time.perf_counter() - started:.1f}s)")
+
+    entries, failures = asyncio.run(generate_all(queries, rag_results, request_template, args))
+
+    print("\n" + "=" * 60)
+    print(f"생성 완료: {len(entries)}/{len(queries)}개 ({time.perf_counter() - started:.1f}s)")
+
+    if not entries:
+        print("생성된 추천이 없어 저장하지 않습니다.")
+        sys.exit(1)
+
+    params = request_params(request_template, gemini_service.model_name)
+    version = PrecomputedRecommendationStore.write_version(args.output_dir, params, entries, keep=args.keep)
+
+    print(f"저장: {args.output_dir}/{version}.json (CURRENT 갱신)")
+    if failures:
+        print(f"실패 {len(failures)}개: {', '.join(query for query, _ in failures)}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
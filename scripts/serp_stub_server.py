@@ -0,0 +1,104 @@
+"""
+SerpAPI 스텁 서버
+
+SerpAPI의 /search.json 응답 형식(organic_results)을 흉내 내는 로컬 HTTP 서버입니다.
+실제 API 키/과금 없이 SERP 보강 경로의 지연, 타임아웃, 캐시 동작을 확인할 때 사용합니다.
+
+사용 예:
+    # 응답마다 200ms 지연
+    python scripts/serp_stub_server.py --port 8765 --delay 0.2
+
+    # API 서버를 스텁에 연결
+    SERP_API_ENABLED=true SERP_API_KEY=stub SERP_API_BASE_URL=http://localhost:8765 \\
+        uvicorn app.main:app
+
+    # SERP_TIMEOUT보다 긴 지연으로 타임아웃 취소 확인
+    python scripts/serp_stub_server.py --delay 10
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import json
+import time
+
+
+def build_response(query: str, num: int) -> dict:
+    """SerpAPI Google 검색 응답과 같은 구조의 가짜 결과"""
+
+    return {
+        "search_metadata": {"status": "Success", "engine": "google"},
+        "search_parameters": {"q": query, "num": num},
+        "organic_results": [
+            {
+                "position": idx + 1,
+                "title": f"{query} 관련 정보 {idx + 1}",
+                "link": f"https://example.com/health/{idx + 1}",
+                "displayed_link": f"example.com › health › {idx + 1}",
+                "snippet": f"'{query}'에 대한 스텁 검색 결과입니다. 영양제 복용 전 전문가와 상담하세요."
+            }
+            for idx in range(num)
+        ]
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    requests_served = 0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+
+        if url.path != "/search.json":
+            self.send_error(404)
+            return
+
+        params = parse_qs(url.query)
+        if not params.get("api_key"):
+            self._send_json(401, {"error": "Invalid API key."})
+            return
+
+        if self.delay:
+            time.sleep(self.delay)
+
+        StubHandler.requests_served += 1
+
+        query = params.get("q", [""])[0]
+        num = int(params.get("num", ["5"])[0])
+        self._send_json(200, build_response(query, num))
+
+    def _send_json(self, status: int, body: dict):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        print(f"[serp-stub] #{StubHandler.requests_served} {format % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SerpAPI 스텁 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help='응답 지연(초)')
+
+    args = parser.parse_args()
+
+    StubHandler.delay = args.delay
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+
+    print(f"SerpAPI 스텁 서버 실행: http://{args.host}:{args.port}/search.json (delay={args.delay}s)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
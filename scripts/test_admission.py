@@ -0,0 +1,283 @@
+"""
+요청 수용 제어(Admission Control) 검증 스크립트
+
+서버/외부 서비스 없이 AdmissionLane 상태 전이와 ASGI 미들웨어를 결정적으로 실행하여 확인합니다.
+
+- 레인 동시 처리 수 + 대기열: 순서대로 자리 넘김, 대기열 가득 참(queue_full), 대기 시간 초과(queue_timeout)
+- 예상 대기(대기 인원 × 평균 처리 시간 / 동시 처리 수) 기반 조기 거절과 Retry-After 값
+- 대기 중/자리를 넘겨받은 직후 취소된 요청의 자리 반환 (동시 처리 수 누수 없음)
+- 경로별 레인 분류 (경로 구간 단위 비교)
+- 미들웨어: 포화된 레인은 503 + Retry-After, 다른 레인(cheap)과 /api/v1 밖의 경로는 영향 없음
+
+사용 예:
+    python scripts/test_admission.py
+"""
+import sys
+import os
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+
+from app.core.config import settings
+from app.utils import admission
+from app.utils.admission import (
+    AdmissionControlMiddleware, AdmissionLane, AdmissionRejected, classify_path
+)
+
+
+def section(title: str):
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+
+
+async def expect_rejection(coro, reason: str) -> AdmissionRejected:
+    try:
+        await coro
+    except AdmissionRejected as e:
+        assert e.reason == reason, f"거절 사유 {e.reason} (기대 {reason})"
+        return e
+    raise AssertionError(f"{reason} 거절이 발생하지 않음")
+
+
+async def settle():
+    """대기 중인 태스크가 한 단계씩 진행되도록 이벤트 루프 양보"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+# ============================================================
+# 레인
+# ============================================================
+
+async def check_lane_queue():
+    section("레인 동시 처리 수 + 대기열")
+
+    lane = AdmissionLane("test_queue", concurrency=1, queue_size=2, max_wait_ms=5000)
+    order = []
+
+    assert await lane.acquire() == 0.0, "여유가 있으면 대기 없이 진입해야 함"
+
+    async def queued(name: str):
+        await lane.acquire()
+        order.append(name)
+
+    first = asyncio.ensure_future(queued("first"))
+    second = asyncio.ensure_future(queued("second"))
+    await settle()
+    assert lane.get_stats()["queued"] == 2
+
+    rejected = await expect_rejection(lane.acquire(), "queue_full")
+    assert rejected.retry_after >= 1
+    print(f"  ✓ 대기열이 가득 차면 즉시 queue_full (Retry-After {rejected.retry_after}s)")
+
+    lane.release(None)
+    await settle()
+    assert order == ["first"], order
+
+    lane.release(None)
+    await settle()
+    assert order == ["first", "second"], order
+    await asyncio.gather(first, second)
+
+    lane.release(None)
+    assert lane.in_flight == 0 and lane.get_stats()["queued"] == 0
+    assert lane.admitted == 3
+    print("  ✓ 대기 순서대로 자리 넘김")
+
+    timeout_lane = AdmissionLane("test_queue_timeout", concurrency=1, queue_size=2, max_wait_ms=10)
+    await timeout_lane.acquire()
+    await expect_rejection(timeout_lane.acquire(), "queue_timeout")
+    assert timeout_lane.get_stats()["queued"] == 0 and timeout_lane.in_flight == 1
+    assert timeout_lane.get_stats()["shed"]["queue_timeout"] == 1
+    print("  ✓ 대기 시간 초과 시 queue_timeout, 대기열에서 제거")
+
+
+async def check_expected_wait():
+    section("예상 대기 기반 조기 거절")
+
+    lane = AdmissionLane("test_expected", concurrency=2, queue_size=10, max_wait_ms=1000)
+
+    # 평균 처리 시간: 첫 완료값으로 시작해 지수 이동 평균
+    await lane.acquire()
+    lane.release(3.0)
+    await lane.acquire()
+    lane.release(1.0)
+    assert abs(lane.service_time - 2.8) < 1e-9, lane.service_time
+    print(f"  ✓ 평균 처리 시간 EMA: {lane.service_time:.1f}s")
+
+    await lane.acquire()
+    await lane.acquire()
+
+    # 대기 1명째 예상 대기 = 1 × 2.8 / 2 = 1.4초 > 1초 → 기다리지 않고 거절
+    assert abs(lane.expected_wait() - 1.4) < 1e-9
+    rejected = await expect_rejection(lane.acquire(), "expected_wait")
+    assert rejected.retry_after == 2, rejected.retry_after
+    assert lane.get_stats()["queued"] == 0, "조기 거절된 요청이 대기열에 남음"
+    print(f"  ✓ 예상 대기 1.4s > 한도 1s: expected_wait 거절 (Retry-After {rejected.retry_after}s)")
+
+    lane.service_time = 1000.0
+    rejected = await expect_rejection(lane.acquire(), "expected_wait")
+    assert rejected.retry_after == settings.ADMISSION_MAX_RETRY_AFTER_SECONDS
+    print(f"  ✓ Retry-After는 ADMISSION_MAX_RETRY_AFTER_SECONDS({rejected.retry_after}s) 이하")
+
+    lane.release(None)
+    lane.release(None)
+    assert lane.in_flight == 0
+
+
+async def check_cancellation():
+    section("취소된 요청의 자리 반환")
+
+    lane = AdmissionLane("test_cancel", concurrency=1, queue_size=4, max_wait_ms=5000)
+    await lane.acquire()
+
+    # 1. 대기 중 취소: 대기열에서 제거
+    waiting = asyncio.ensure_future(lane.acquire())
+    await settle()
+    waiting.cancel()
+    await settle()
+    assert waiting.cancelled() and lane.get_stats()["queued"] == 0
+    print("  ✓ 대기 중 취소된 요청은 대기열에서 제거")
+
+    # 2. 자리를 넘겨받은 직후(재개 전) 취소
+    #    파이썬 버전에 따라 취소가 무시되어 그대로 자리를 쓰거나, 취소되면서 다음 대기자에게 자리를 넘김
+    handed = asyncio.ensure_future(lane.acquire())
+    following = asyncio.ensure_future(lane.acquire())
+    await settle()
+
+    lane.release(None)
+    handed.cancel()
+    await settle()
+
+    if not handed.cancelled():
+        assert not following.done() and lane.in_flight == 1, lane.get_stats()
+        lane.release(None)
+        await settle()
+
+    assert following.done() and not following.cancelled(), "다음 대기자가 자리를 받지 못함"
+    assert lane.in_flight == 1, f"동시 처리 수 누수: in_flight={lane.in_flight}"
+
+    lane.release(None)
+    assert lane.in_flight == 0 and lane.get_stats()["queued"] == 0, lane.get_stats()
+    print("  ✓ 자리를 넘겨받은 직후 취소되어도 동시 처리 수 누수 없음")
+
+
+# ============================================================
+# 경로 분류 / 미들웨어
+# ============================================================
+
+def check_classify_path():
+    section("경로별 레인 분류")
+
+    prefix = settings.API_V1_STR
+    expected = {
+        f"{prefix}/rag/search/intelligent": "expensive",
+        f"{prefix}/rag/recommend/gemini/stream": "expensive",
+        f"{prefix}/rag/recommend/timing": "cheap",
+        f"{prefix}/rag/cache/semantic": "cheap",
+        f"{prefix}/rag/product/P001": "default",
+        f"{prefix}/rag/products": "default",
+        f"{prefix}/rag/search/hybrid": "default",
+        "/health": None,
+        "/metrics": None
+    }
+    for path, lane in expected.items():
+        assert classify_path(path) == lane, f"{path}: {classify_path(path)} (기대 {lane})"
+        print(f"  ✓ {path} → {lane}")
+
+
+async def call_middleware(middleware, path: str) -> dict:
+    """ASGI 요청 하나 실행 후 (상태 코드, 헤더, 본문) 반환"""
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""}
+    await middleware(scope, receive, send)
+
+    start = next(message for message in messages if message["type"] == "http.response.start")
+    body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+    return {
+        "status": start["status"],
+        "headers": {key.decode(): value.decode() for key, value in start["headers"]},
+        "body": body
+    }
+
+
+async def check_middleware():
+    section("미들웨어: 레인 격리 / 503 + Retry-After")
+
+    gate = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if "/search/intelligent" in scope["path"]:
+            await gate.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    # 테스트용 레인 (expensive: 동시 1, 대기열 없음)
+    saved_lanes = dict(admission._lanes)
+    admission._lanes["expensive"] = AdmissionLane("expensive", concurrency=1, queue_size=0, max_wait_ms=1000)
+    admission._lanes["cheap"] = AdmissionLane("cheap", concurrency=4, queue_size=4, max_wait_ms=100)
+
+    try:
+        middleware = AdmissionControlMiddleware(app)
+        prefix = settings.API_V1_STR
+
+        holding = asyncio.ensure_future(call_middleware(middleware, f"{prefix}/rag/search/intelligent"))
+        await settle()
+        assert admission._lanes["expensive"].in_flight == 1
+
+        shed = await call_middleware(middleware, f"{prefix}/rag/search/intelligent")
+        assert shed["status"] == 503, shed
+        assert int(shed["headers"]["retry-after"]) >= 1, shed["headers"]
+        print(f"  ✓ 포화된 expensive 레인: 503 (Retry-After {shed['headers']['retry-after']}s)")
+
+        cheap = await call_middleware(middleware, f"{prefix}/rag/recommend/timing")
+        assert cheap["status"] == 200, cheap
+        print("  ✓ expensive 레인 포화 중에도 cheap 레인은 바로 처리")
+
+        health = await call_middleware(middleware, "/health")
+        assert health["status"] == 200, health
+        print("  ✓ /api/v1 밖의 경로는 제한 없이 통과")
+
+        gate.set()
+        assert (await holding)["status"] == 200
+        assert admission._lanes["expensive"].in_flight == 0
+        assert admission._lanes["expensive"].service_time is not None
+        print("  ✓ 처리 완료 후 자리 반환, 평균 처리 시간 갱신")
+
+    finally:
+        admission._lanes.clear()
+        admission._lanes.update(saved_lanes)
+
+
+async def main():
+    await check_lane_queue()
+    await check_expected_wait()
+    await check_cancellation()
+    check_classify_path()
+    await check_middleware()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+
+        print("\n" + "=" * 60)
+        print("✓ 모든 테스트 완료!")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"\n✗ 테스트 실패: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,263 @@
+"""
+외부 API 격벽(Bulkhead) 검증 스크립트
+
+외부 API 호출 없이 Bulkhead 상태 전이를 결정적으로 실행하여 확인합니다.
+
+- 동시 호출 한도 + 대기열: 순서대로 자리 넘김, 대기열 가득 참(queue_full), 대기 시간 초과(queue_timeout)
+- 대기 중/자리를 넘겨받은 직후 취소된 요청의 자리 반환 (한도 누수 없음)
+- AIMD: 성공 시 증가(max_limit 이하), 과부하 시 절반(min_limit 이상), 목표 지연 초과 시 완만한 감소
+- 서킷 브레이커: closed → open → half-open(시험 호출 1개) → closed / 시험 실패 시 다시 open
+
+사용 예:
+    python scripts/test_bulkhead.py
+"""
+import sys
+import os
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+
+from app.services.rag.llm_provider import LLMProviderError
+from app.utils.bulkhead import Bulkhead, UpstreamUnavailable
+
+
+def section(title: str):
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+
+
+def make_bulkhead(name: str, **overrides) -> Bulkhead:
+    options = dict(
+        initial_limit=1,
+        min_limit=1,
+        max_limit=1,
+        queue_size=2,
+        queue_timeout=5.0,
+        latency_target=10.0,
+        failure_threshold=3,
+        open_seconds=30.0
+    )
+    options.update(overrides)
+    return Bulkhead(name, **options)
+
+
+async def expect_rejection(coro, reason: str):
+    try:
+        await coro
+    except UpstreamUnavailable as e:
+        assert e.reason == reason, f"거절 사유 {e.reason} (기대 {reason})"
+        return
+    raise AssertionError(f"{reason} 거절이 발생하지 않음")
+
+
+async def settle():
+    """대기 중인 태스크가 한 단계씩 진행되도록 이벤트 루프 양보"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+# ============================================================
+# 한도 / 대기열
+# ============================================================
+
+async def check_queue():
+    section("동시 호출 한도 + 대기열")
+
+    bulkhead = make_bulkhead("test_queue")
+    order = []
+
+    await bulkhead.acquire()
+
+    async def queued(name: str):
+        await bulkhead.acquire()
+        order.append(name)
+
+    first = asyncio.ensure_future(queued("first"))
+    second = asyncio.ensure_future(queued("second"))
+    await settle()
+    assert len(bulkhead._waiters) == 2
+
+    await expect_rejection(bulkhead.acquire(), "queue_full")
+    print("  ✓ 대기열이 가득 차면 즉시 queue_full")
+
+    bulkhead.release("success", 0.0)
+    await settle()
+    assert order == ["first"], order
+
+    bulkhead.release("success", 0.0)
+    await settle()
+    assert order == ["first", "second"], order
+    await asyncio.gather(first, second)
+
+    bulkhead.release("success", 0.0)
+    assert bulkhead.in_flight == 0 and not bulkhead._waiters
+    print("  ✓ 대기 순서대로 자리 넘김")
+
+    timeout_bulkhead = make_bulkhead("test_queue_timeout", queue_timeout=0.01)
+    await timeout_bulkhead.acquire()
+    await expect_rejection(timeout_bulkhead.acquire(), "queue_timeout")
+    assert not timeout_bulkhead._waiters and timeout_bulkhead.in_flight == 1
+    print("  ✓ 대기 시간 초과 시 queue_timeout, 대기열에서 제거")
+
+
+async def check_cancellation():
+    section("취소된 요청의 자리 반환")
+
+    bulkhead = make_bulkhead("test_cancel")
+    await bulkhead.acquire()
+
+    # 1. 대기 중 취소: 대기열에서 제거
+    waiting = asyncio.ensure_future(bulkhead.acquire())
+    await settle()
+    waiting.cancel()
+    await settle()
+    assert waiting.cancelled() and not bulkhead._waiters
+    print("  ✓ 대기 중 취소된 요청은 대기열에서 제거")
+
+    # 2. 자리를 넘겨받은 직후(재개 전) 취소
+    #    파이썬 버전에 따라 취소가 무시되어 그대로 자리를 쓰거나, 취소되면서 다음 대기자에게 자리를 넘김
+    handed = asyncio.ensure_future(bulkhead.acquire())
+    following = asyncio.ensure_future(bulkhead.acquire())
+    await settle()
+
+    bulkhead.release("success", 0.0)
+    handed.cancel()
+    await settle()
+
+    if not handed.cancelled():
+        assert not following.done() and bulkhead.in_flight == 1, bulkhead.get_stats()
+        bulkhead.release("success", 0.0)
+        await settle()
+
+    assert following.done() and not following.cancelled(), "다음 대기자가 자리를 받지 못함"
+    assert bulkhead.in_flight == 1, f"한도 누수: in_flight={bulkhead.in_flight}"
+
+    bulkhead.release("success", 0.0)
+    assert bulkhead.in_flight == 0 and not bulkhead._waiters, bulkhead.get_stats()
+    print("  ✓ 자리를 넘겨받은 직후 취소되어도 한도 누수 없음")
+
+
+# ============================================================
+# AIMD
+# ============================================================
+
+def check_aimd():
+    section("AIMD 동시성 조절")
+
+    bulkhead = make_bulkhead("test_aimd", initial_limit=2, min_limit=1, max_limit=3, latency_target=1.0)
+
+    for _ in range(50):
+        bulkhead.in_flight += 1
+        bulkhead.release("success", 0.1)
+    assert bulkhead.limit == 3, f"최대 한도 초과/미달: {bulkhead.limit}"
+    print(f"  ✓ 목표 지연 이내 성공 시 증가, max_limit({bulkhead.max_limit}) 이하 유지")
+
+    bulkhead.in_flight += 1
+    bulkhead.release("success", 2.0)
+    assert abs(bulkhead.limit - 2.7) < 1e-9, bulkhead.limit
+    print("  ✓ 목표 지연 초과 시 0.9배")
+
+    for _ in range(10):
+        bulkhead.in_flight += 1
+        bulkhead.release("overload", 0.1)
+        bulkhead.state = Bulkhead.CLOSED
+    assert bulkhead.limit == 1, f"최소 한도 미달/초과: {bulkhead.limit}"
+    assert bulkhead.overloads == 10
+    print(f"  ✓ 과부하(429/타임아웃) 시 절반, min_limit({bulkhead.min_limit}) 이상 유지")
+
+
+# ============================================================
+# 서킷 브레이커
+# ============================================================
+
+async def call(bulkhead: Bulkhead, error: Exception = None):
+    async with bulkhead.slot():
+        if error is not None:
+            raise error
+
+
+async def check_circuit():
+    section("서킷 브레이커")
+
+    bulkhead = make_bulkhead("test_circuit", failure_threshold=2)
+
+    for _ in range(2):
+        try:
+            await call(bulkhead, LLMProviderError("모의 오류", code=500))
+        except LLMProviderError:
+            pass
+    assert bulkhead.state == Bulkhead.OPEN, bulkhead.state
+    await expect_rejection(call(bulkhead), "circuit_open")
+    print("  ✓ 연속 실패 임계값 도달 시 open, 즉시 circuit_open")
+
+    # open 유지 시간 경과 (시각 조작으로 대기 없이 진행)
+    bulkhead.opened_at -= bulkhead.open_seconds
+
+    release = asyncio.Event()
+
+    async def probe():
+        async with bulkhead.slot():
+            await release.wait()
+
+    probing = asyncio.ensure_future(probe())
+    await settle()
+    assert bulkhead.state == Bulkhead.HALF_OPEN and bulkhead._probing
+    await expect_rejection(call(bulkhead), "circuit_half_open")
+    print("  ✓ half-open에서는 시험 호출 1개만 허용")
+
+    release.set()
+    await probing
+    assert bulkhead.state == Bulkhead.CLOSED and bulkhead.consecutive_failures == 0
+    await call(bulkhead)
+    print("  ✓ 시험 호출 성공 시 closed 복귀")
+
+    # 시험 호출 실패 → 다시 open
+    for _ in range(2):
+        try:
+            await call(bulkhead, LLMProviderError("모의 오류", code=500))
+        except LLMProviderError:
+            pass
+    bulkhead.opened_at -= bulkhead.open_seconds
+    try:
+        await call(bulkhead, LLMProviderError("모의 요청 제한", code=429))
+    except LLMProviderError:
+        pass
+    assert bulkhead.state == Bulkhead.OPEN, bulkhead.state
+    print("  ✓ 시험 호출 실패 시 다시 open")
+
+    # 시험 호출이 취소되면 다음 요청이 시험 호출
+    bulkhead.opened_at -= bulkhead.open_seconds
+    release.clear()
+    probing = asyncio.ensure_future(probe())
+    await settle()
+    probing.cancel()
+    await settle()
+    assert not bulkhead._probing and bulkhead.in_flight == 0
+    await call(bulkhead)
+    assert bulkhead.state == Bulkhead.CLOSED
+    print("  ✓ 취소된 시험 호출은 다음 요청이 대신 시험")
+
+
+async def main():
+    await check_queue()
+    await check_cancellation()
+    check_aimd()
+    await check_circuit()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+
+        print("\n" + "=" * 60)
+        print("✓ 모든 테스트 완료!")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"\n✗ 테스트 실패: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
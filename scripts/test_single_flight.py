@@ -0,0 +1,302 @@
+"""
+동일 요청 병합(Single-flight) 검증 스크립트
+
+외부 서비스 없이 SingleFlight/coalesce 상태 전이를 결정적으로 실행하여 확인합니다.
+
+- 동시 대기자 병합 (실제 호출 1회), 대기자별 결과 사본
+- 대기자 하나의 취소/시간 초과가 다른 대기자와 실제 호출에 영향 없음
+- 예외 전달
+- 워커 스레드(do_sync) 병합
+- 요청 시간 예산: 남은 예산 구간별 키, 대기 제한, 생략 단계(es_timeout) 공유
+
+사용 예:
+    python scripts/test_single_flight.py
+"""
+import sys
+import os
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import threading
+import time
+
+from app.utils.deadline import current_deadline, deadline_scope
+from app.utils.single_flight import SingleFlight, SingleFlightTimeout, coalesce
+
+
+def section(title: str):
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+
+
+def wait_for_waiters(flight: SingleFlight, key, count: int):
+    """do_sync 대기자가 count명이 될 때까지 대기 (스레드 시작 순서와 무관하게 결정적으로 진행)"""
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with flight._lock:
+            call = flight._calls.get(key)
+            if call is not None and call.waiters >= count:
+                return
+        time.sleep(0.001)
+    raise AssertionError(f"대기자 {count}명이 모이지 않음")
+
+
+# ============================================================
+# 비동기 (do)
+# ============================================================
+
+async def check_async_coalescing():
+    section("비동기 병합: 실제 호출 1회 + 대기자별 사본")
+
+    flight = SingleFlight("test_async", timeout=5)
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return {"items": [1, 2, 3]}
+
+    tasks = [asyncio.ensure_future(flight.do("key", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert flight.in_flight() == 1, "진행 중인 호출은 1개여야 함"
+
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert len(calls) == 1, f"실제 호출 {len(calls)}회 (기대 1회)"
+    assert all(result == {"items": [1, 2, 3]} for result in results)
+
+    results[0]["items"].append(4)
+    assert results[1]["items"] == [1, 2, 3], "대기자 결과가 서로 공유됨"
+    assert flight.in_flight() == 0
+    print("  ✓ 대기자 5명, 실제 호출 1회, 결과 사본 분리")
+
+
+async def check_async_cancellation():
+    section("비동기 병합: 대기자 취소/시간 초과")
+
+    flight = SingleFlight("test_async_cancel", timeout=5)
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("key", fetch))
+    second = asyncio.ensure_future(flight.do("key", fetch))
+    impatient = asyncio.ensure_future(flight.do("key", fetch, timeout=0.01))
+    await asyncio.sleep(0)
+
+    # 첫 호출자(호출을 시작한 요청)가 끊겨도 실제 호출은 계속됨
+    first.cancel()
+    try:
+        await impatient
+        raise AssertionError("시간 초과가 발생하지 않음")
+    except asyncio.TimeoutError:
+        pass
+
+    release.set()
+    assert await second == "done", "남은 대기자가 결과를 받지 못함"
+    assert first.cancelled()
+    assert len(calls) == 1
+    print("  ✓ 시작한 요청 취소 후에도 호출 유지, 시간 초과는 해당 대기자만")
+
+
+async def check_async_error():
+    section("비동기 병합: 예외 전달")
+
+    flight = SingleFlight("test_async_error", timeout=5)
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("upstream")
+
+    results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results), results
+    assert flight.in_flight() == 0
+    print("  ✓ 모든 대기자가 같은 예외를 받음")
+
+
+# ============================================================
+# 동기 (do_sync)
+# ============================================================
+
+def check_sync_coalescing():
+    section("동기 병합: 워커 스레드")
+
+    flight = SingleFlight("test_sync", timeout=5)
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return [{"id": 1}]
+
+    def worker():
+        results.append(flight.do_sync("key", fetch))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+
+    wait_for_waiters(flight, "key", 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1, f"실제 호출 {len(calls)}회 (기대 1회)"
+    assert len(results) == 4 and all(result == [{"id": 1}] for result in results)
+
+    results[0][0]["id"] = 99
+    assert all(result[0]["id"] == 1 for result in results[1:]), "대기자 결과가 서로 공유됨"
+    print("  ✓ 스레드 4개, 실제 호출 1회, 결과 사본 분리")
+
+
+def check_sync_timeout():
+    section("동기 병합: 대기 시간 초과")
+
+    flight = SingleFlight("test_sync_timeout", timeout=5)
+    release = threading.Event()
+    errors = []
+
+    def fetch():
+        release.wait(5)
+        return "done"
+
+    leader = threading.Thread(target=lambda: flight.do_sync("key", fetch))
+    leader.start()
+    while "key" not in flight._calls:
+        time.sleep(0.001)
+
+    try:
+        flight.do_sync("key", fetch, timeout=0.01)
+    except SingleFlightTimeout as e:
+        errors.append(e)
+
+    release.set()
+    leader.join()
+
+    assert len(errors) == 1, "대기 시간 초과가 발생하지 않음"
+    assert isinstance(errors[0], TimeoutError), "SingleFlightTimeout은 TimeoutError여야 함"
+    print("  ✓ 대기자만 SingleFlightTimeout, 실제 호출은 정상 완료")
+
+
+# ============================================================
+# 요청 시간 예산 (coalesce)
+# ============================================================
+
+def check_deadline_coalescing():
+    section("요청 시간 예산: 생략 단계 공유 / 대기 제한 / 예산 구간")
+
+    flight = SingleFlight("test_deadline", timeout=5)
+    release = threading.Event()
+    calls = []
+
+    class Engine:
+        @coalesce(flight, deadline_fallback=list)
+        def search(self, query):
+            calls.append(query)
+            release.wait(5)
+            # ES 부분 결과 (rag_search._search 와 같은 방식으로 기록)
+            deadline = current_deadline()
+            if deadline is not None:
+                deadline.degrade("es_timeout")
+            return [query]
+
+    engine = Engine()
+    outcomes = {}
+
+    def request(name: str, budget_ms: float):
+        with deadline_scope(budget_ms) as deadline:
+            outcomes[name] = (engine.search("두통"), list(deadline.degraded))
+
+    # 1. 같은 예산 구간: 실제 호출 1회, 대기자도 es_timeout 기록
+    threads = [threading.Thread(target=request, args=(name, 5000)) for name in ("leader", "follower")]
+    for thread in threads:
+        thread.start()
+    while not flight._calls:
+        time.sleep(0.001)
+    key = next(iter(flight._calls))
+    wait_for_waiters(flight, key, 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["두통"], f"실제 호출 {calls}"
+    for name in ("leader", "follower"):
+        results, degraded = outcomes[name]
+        assert results == ["두통"], (name, results)
+        assert degraded == ["es_timeout"], f"{name}: es_timeout 미기록 ({degraded})"
+    print("  ✓ 공유 결과의 es_timeout이 대기자 예산에도 기록됨")
+
+    # 2. 대기자는 자기 남은 예산까지만 대기 후 대체 결과 반환 (같은 예산 구간이 되도록 둘 다 200ms)
+    release.clear()
+    calls.clear()
+    outcomes.clear()
+
+    leader = threading.Thread(target=request, args=("leader", 200))
+    leader.start()
+    while not flight._calls:
+        time.sleep(0.001)
+
+    started = time.monotonic()
+    with deadline_scope(200) as deadline:
+        results = engine.search("두통")
+        waited = time.monotonic() - started
+        degraded = list(deadline.degraded)
+
+    release.set()
+    leader.join()
+
+    assert calls == ["두통"], "대기자가 별도로 호출함 (예산 구간 불일치)"
+    assert results == [], f"대체 결과가 아님: {results}"
+    assert degraded == ["coalesced_wait"], degraded
+    assert waited < 1.0, f"남은 예산보다 오래 대기 ({waited:.2f}s)"
+    print(f"  ✓ 예산 부족 대기자는 {waited * 1000:.0f}ms 후 대체 결과 반환 (coalesced_wait)")
+
+    # 3. 예산 구간이 다르면 병합하지 않음
+    release.set()
+    calls.clear()
+    with deadline_scope(5000):
+        engine.search("피로")
+    with deadline_scope(100):
+        engine.search("피로")
+    assert len(calls) == 2, "예산이 크게 다른 요청이 병합됨"
+
+    # 4. 예산이 없으면 기존 키 (예산 있는 호출과 별도)
+    calls.clear()
+    assert engine.search("피로") == ["피로"] and len(calls) == 1
+    print("  ✓ 남은 예산 구간/예산 유무가 다르면 별도 호출")
+
+
+def main():
+    asyncio.run(check_async_coalescing())
+    asyncio.run(check_async_cancellation())
+    asyncio.run(check_async_error())
+    check_sync_coalescing()
+    check_sync_timeout()
+    check_deadline_coalescing()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+
+        print("\n" + "=" * 60)
+        print("✓ 모든 테스트 완료!")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"\n✗ 테스트 실패: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)